@@ -0,0 +1 @@
+"""Synthetic-database benchmarks for TaskMaster (run with ``python -m benchmarks``)."""
@@ -0,0 +1,198 @@
+"""Benchmark runner.
+
+Usage:
+  python -m benchmarks run [--sizes 10k,100k] [--out FILE] [--baseline FILE]
+  python -m benchmarks generate --size 100k PATH
+  python -m benchmarks memory [--sizes 100k]
+  python -m benchmarks migrate [--sizes 100k] [--from 1] [--chunk-rows N]
+  python -m benchmarks keys [--sizes 100k] [--repeat 3]
+  python -m benchmarks compare BASELINE CURRENT
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.compare import DEFAULT_MIN_DELTA_MS, DEFAULT_THRESHOLD, Comparison, compare
+from benchmarks.memory import measure
+from benchmarks.migrations import compare_keys, time_migrations
+from benchmarks.suite import run_suite
+from benchmarks.synthetic import cached_db, generate
+from taskmaster.constants import MIGRATION_CHUNK_ROWS
+
+DEFAULT_CACHE_DIR = Path(tempfile.gettempdir()) / "taskmaster-bench"
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().lower()
+    for suffix, factor in (("k", 1_000), ("m", 1_000_000)):
+        if text.endswith(suffix):
+            return int(float(text[:-1]) * factor)
+    return int(text)
+
+
+def _size_label(tasks: int) -> str:
+    if tasks % 1_000_000 == 0:
+        return f"{tasks // 1_000_000}M"
+    if tasks % 1_000 == 0:
+        return f"{tasks // 1_000}k"
+    return str(tasks)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="time the suite on synthetic DBs")
+    run.add_argument("--sizes", default="10k,100k", help="comma separated, e.g. 10k,100k,1M")
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--repeat", type=int, default=5)
+    run.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR)
+    run.add_argument("--out", type=Path, help="write results JSON here")
+    _add_compare_args(run, baseline_flag=True)
+
+    gen = sub.add_parser("generate", help="write one synthetic DB")
+    gen.add_argument("path", type=Path)
+    gen.add_argument("--size", default="10k")
+    gen.add_argument("--seed", type=int, default=0)
+
+    mem = sub.add_parser("memory", help="bytes per loaded task row")
+    mem.add_argument("--sizes", default="100k")
+    mem.add_argument("--seed", type=int, default=0)
+    mem.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR)
+
+    mig = sub.add_parser("migrate", help="time each schema migration step (on copies)")
+    mig.add_argument("--sizes", default="100k")
+    mig.add_argument("--seed", type=int, default=0)
+    mig.add_argument("--from", dest="from_version", type=int, default=1, help="schema version to start from")
+    mig.add_argument("--chunk-rows", type=int, default=MIGRATION_CHUNK_ROWS)
+    mig.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR)
+
+    keys = sub.add_parser("keys", help="size and join times with UUID vs integer keys (schema 6 vs 7)")
+    keys.add_argument("--sizes", default="100k")
+    keys.add_argument("--seed", type=int, default=0)
+    keys.add_argument("--repeat", type=int, default=3)
+    keys.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR)
+
+    cmp_ = sub.add_parser("compare", help="compare two results files")
+    cmp_.add_argument("baseline", type=Path)
+    cmp_.add_argument("current", type=Path)
+    _add_compare_args(cmp_, baseline_flag=False)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        generate(args.path, tasks=parse_size(args.size), seed=args.seed, log=True)
+        return 0
+
+    if args.command == "memory":
+        for tasks in (parse_size(s) for s in args.sizes.split(",") if s.strip()):
+            path = cached_db(args.cache_dir, tasks=tasks, seed=args.seed, log=True)
+            m = measure(path)
+            print(
+                f"[{_size_label(tasks)}] {m['rows']} rows: {m['bytes_per_row']:.0f} B/row, "
+                f"load {m['load_ms']:.0f} ms; reference {m['reference_bytes_per_row']:.0f} B/row, "
+                f"load {m['reference_load_ms']:.0f} ms; id index {m['id_index_bytes_per_row']:.0f} B/row"
+            )
+        return 0
+
+    if args.command == "migrate":
+        for tasks in (parse_size(s) for s in args.sizes.split(",") if s.strip()):
+            label = _size_label(tasks)
+            path = cached_db(args.cache_dir, tasks=tasks, seed=args.seed, log=True)
+            steps = time_migrations(
+                path, args.cache_dir, from_version=args.from_version, chunk_rows=args.chunk_rows
+            )
+            for t in steps:
+                print(
+                    f"[{label}] v{t.version} {t.description:<32} schema {t.schema_ms:8.1f} ms   "
+                    f"backfill {t.backfill_ms:9.1f} ms ({t.rows} rows, {t.chunks} chunks)"
+                )
+        return 0
+
+    if args.command == "keys":
+        for tasks in (parse_size(s) for s in args.sizes.split(",") if s.strip()):
+            label = _size_label(tasks)
+            path = cached_db(args.cache_dir, tasks=tasks, seed=args.seed, log=True)
+            k = compare_keys(path, args.cache_dir, repeat=args.repeat)
+            print(f"[{label}] migrate v6 -> v7 {k.migrate_ms:.0f} ms")
+            for name, (v6, v7) in sorted(k.sizes.items(), key=lambda item: -max(item[1])):
+                if max(v6, v7) >= 1024 * 1024:
+                    print(f"[{label}] {name:<36} {v6 / 2**20:9.1f} -> {v7 / 2**20:9.1f} MiB")
+            for name, (v6, v7) in k.timings.items():
+                print(f"[{label}] {name:<36} {v6:9.1f} -> {v7:9.1f} ms  x{v7 / v6:5.2f}")
+        return 0
+
+    if args.command == "compare":
+        baseline = json.loads(args.baseline.read_text())
+        current = json.loads(args.current.read_text())
+        return _report_comparison(compare(baseline, current, threshold=args.threshold, min_delta_ms=args.min_delta_ms))
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": {},
+    }
+    for tasks in (parse_size(s) for s in args.sizes.split(",") if s.strip()):
+        label = _size_label(tasks)
+        path = cached_db(args.cache_dir, tasks=tasks, seed=args.seed, log=True)
+        print(f"[{label}] {path}", file=sys.stderr)
+        results = run_suite(path, repeat=args.repeat, seed=args.seed)
+        report["results"][label] = results
+        for name, stats in results.items():
+            print(f"[{label}] {name:<36} p50 {stats['p50_ms']:10.3f} ms   p95 {stats['p95_ms']:10.3f} ms")
+
+    if args.out:
+        args.out.write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        return _report_comparison(compare(baseline, report, threshold=args.threshold, min_delta_ms=args.min_delta_ms))
+    return 0
+
+
+def _add_compare_args(parser: argparse.ArgumentParser, *, baseline_flag: bool) -> None:
+    if baseline_flag:
+        parser.add_argument("--baseline", type=Path, help="results JSON to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"p50 ratio that counts as a regression (default {DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=DEFAULT_MIN_DELTA_MS,
+        help=f"ignore differences smaller than this (default {DEFAULT_MIN_DELTA_MS})",
+    )
+
+
+def _report_comparison(comparisons: list[Comparison]) -> int:
+    """Print the comparison; returns 1 if anything regressed."""
+    regressed = [c for c in comparisons if c.regressed]
+    for c in comparisons:
+        flag = "REGRESSION" if c.regressed else ""
+        print(
+            f"[{c.size}] {c.name:<36} {c.baseline_ms:10.3f} -> {c.current_ms:10.3f} ms"
+            f"  x{c.ratio:5.2f} {flag}"
+        )
+    print(f"{len(regressed)} regression(s) in {len(comparisons)} benchmark(s)")
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,47 @@
+"""Regression check of a benchmark run against a stored baseline."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+DEFAULT_THRESHOLD = 1.25
+# Differences below this are timer noise whatever the ratio.
+DEFAULT_MIN_DELTA_MS = 0.5
+
+
+@dataclass(frozen=True)
+class Comparison:
+    size: str
+    name: str
+    baseline_ms: float
+    current_ms: float
+    regressed: bool
+
+    @property
+    def ratio(self) -> float:
+        return self.current_ms / self.baseline_ms if self.baseline_ms > 0 else float("inf")
+
+
+def compare(
+    baseline: dict,
+    current: dict,
+    *,
+    threshold: float = DEFAULT_THRESHOLD,
+    min_delta_ms: float = DEFAULT_MIN_DELTA_MS,
+) -> list[Comparison]:
+    """Compare p50 of every benchmark present in both result files.
+
+    A benchmark regressed when its p50 grew by more than ``threshold`` times
+    and by at least ``min_delta_ms``.
+    """
+    out: list[Comparison] = []
+    for size, benches in current["results"].items():
+        base_benches = baseline["results"].get(size, {})
+        for name, stats in benches.items():
+            if name not in base_benches:
+                continue
+            base_ms = float(base_benches[name]["p50_ms"])
+            cur_ms = float(stats["p50_ms"])
+            regressed = cur_ms > base_ms * threshold and cur_ms - base_ms >= min_delta_ms
+            out.append(Comparison(size, name, base_ms, cur_ms, regressed))
+    return out
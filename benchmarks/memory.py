@@ -0,0 +1,106 @@
+"""Memory held by loaded task rows (``python -m benchmarks memory``).
+
+Loads every listed task of a synthetic DB the way the table models hold
+them and reports traced bytes per row. The same load through sqlite3.Row
+into a dict-backed dataclass (how TaskRow used to be built) is measured
+next to it as the reference.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from taskmaster import db
+from taskmaster.constants import LIST_VIEWS
+from taskmaster.repository import list_tasks
+from taskmaster.timeutil import to_epoch_seconds
+
+from benchmarks.synthetic import ANCHOR
+
+_REFERENCE_SQL = """
+SELECT id, title, note, status, created_at, updated_at, next_review_at,
+       deleted_at, purged_at, tags_text, last_completed_at, review_count
+FROM tasks
+WHERE purged_at IS NULL
+"""
+
+
+@dataclass(frozen=True)
+class _DictTaskRow:
+    id: int
+    title: str
+    note: str
+    status: str
+    created_at: int
+    updated_at: int
+    next_review_at: int | None
+    deleted_at: int | None
+    purged_at: int | None
+    tags: str
+    last_completed_at: int | None
+    review_count: int
+
+
+def measure(db_path: Path) -> dict[str, float]:
+    conn = db.connect(db_path)
+    now_epoch = to_epoch_seconds(ANCHOR)
+
+    def load_rows() -> list:
+        rows: list = []
+        for view in LIST_VIEWS:
+            rows.extend(list_tasks(conn, view=view, text=None, tags=[], now_epoch=now_epoch))
+        return rows
+
+    def load_reference() -> list:
+        return [
+            _DictTaskRow(
+                id=r["id"],
+                title=r["title"],
+                note=r["note"],
+                status=r["status"],
+                created_at=r["created_at"],
+                updated_at=r["updated_at"],
+                next_review_at=r["next_review_at"],
+                deleted_at=r["deleted_at"],
+                purged_at=r["purged_at"],
+                tags=r["tags_text"],
+                last_completed_at=r["last_completed_at"],
+                review_count=int(r["review_count"]),
+            )
+            for r in conn.execute(_REFERENCE_SQL)
+        ]
+
+    rows, rows_bytes, rows_s = _traced(load_rows)
+    ref, ref_bytes, ref_s = _traced(load_reference)
+    index, index_bytes, _ = _traced(lambda: {r.id: i for i, r in enumerate(rows)})
+    conn.close()
+
+    n = len(rows)
+    return {
+        "rows": n,
+        "bytes_per_row": rows_bytes / n,
+        "load_ms": rows_s * 1000.0,
+        "reference_bytes_per_row": ref_bytes / len(ref),
+        "reference_load_ms": ref_s * 1000.0,
+        "id_index_bytes_per_row": index_bytes / len(index),
+    }
+
+
+def _traced(fn: Callable[[], object]) -> tuple:
+    """(result, bytes still allocated by fn, untraced wall time in seconds)."""
+    fn()  # warm the page cache
+    start = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn()
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return result, allocated, seconds
@@ -0,0 +1,169 @@
+"""Migration timings on synthetic DBs (``python -m benchmarks migrate``,
+``python -m benchmarks keys``).
+
+The synthetic DBs are generated at the current schema. downgraded_copy
+rebuilds one at an older version by creating that schema with
+db.migrate(target=...) and copying the rows over, so every step from that
+version on can be timed through db.dry_run on realistic data.
+compare_keys puts the UUID-keyed schema 6 next to the same rows migrated to
+the integer keys of schema 7.
+"""
+
+from __future__ import annotations
+
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from taskmaster import db
+
+# Copied in this order (parents first).
+_TABLES = ("tasks", "task_tags", "task_tag_map", "completion_events")
+# Kept by triggers at the versions that have them; copying them too would
+# count every event and tag twice.
+_TRIGGER_MAINTAINED = {"last_completed_at", "review_count", "tags_text", "task_count"}
+# Before schema 7 every key is a UUID string: tasks get theirs from
+# public_id, events and tags stable made-up ones.
+_TASK_UUID = "(SELECT uuid_text(t.public_id) FROM src.tasks t WHERE t.id = s.task_id)"
+_UUID_KEYS = {
+    ("tasks", "id"): "uuid_text(s.public_id)",
+    ("task_tags", "id"): "made_up_uuid('tag', s.id)",
+    ("task_tag_map", "task_id"): _TASK_UUID,
+    ("task_tag_map", "tag_id"): "made_up_uuid('tag', s.tag_id)",
+    ("completion_events", "id"): "made_up_uuid('event', s.id)",
+    ("completion_events", "task_id"): _TASK_UUID,
+}
+
+# Joins timed by compare_keys; each runs unchanged on both schemas.
+_JOINS = {
+    "history scan (events x tasks)": """
+        SELECT ce.task_id, ce.completed_at, ce.grade
+        FROM completion_events ce
+        JOIN tasks t ON t.id = ce.task_id
+        WHERE t.deleted_at IS NULL AND t.purged_at IS NULL AND t.status IN ('due', 'waiting')
+        ORDER BY ce.task_id, ce.completed_at
+    """,
+    "events per task (group by)": """
+        SELECT t.id, COUNT(*), MAX(ce.completed_at)
+        FROM tasks t
+        JOIN completion_events ce ON ce.task_id = t.id
+        GROUP BY t.id
+    """,
+    "tag filter (tags x map x tasks)": """
+        SELECT t.id, t.title
+        FROM task_tags g
+        JOIN task_tag_map m ON m.tag_id = g.id
+        JOIN tasks t ON t.id = m.task_id
+        WHERE g.name IN ('tag000', 'tag001', 'tag002')
+    """,
+}
+_LOOKUP_SAMPLE = 2000
+_LOOKUP_SQL = "SELECT completed_at, grade FROM completion_events WHERE task_id = ? ORDER BY completed_at"
+
+
+@dataclass(frozen=True)
+class KeyComparison:
+    migrate_ms: float
+    # name -> (schema 6, schema 7); bytes in use per table/index, and the
+    # median ms of each join.
+    sizes: dict[str, tuple[int, int]]
+    timings: dict[str, tuple[float, float]]
+
+
+def downgraded_copy(source: Path, cache_dir: Path, *, version: int, log: bool = False) -> Path:
+    """Path of a copy of ``source`` at schema ``version``, creating it on first use."""
+    path = cache_dir / f"{source.stem}-as-v{version}.db"
+    if path.exists():
+        return path
+    partial = path.with_suffix(".partial")
+    for leftover in (partial, Path(f"{partial}-wal"), Path(f"{partial}-shm")):
+        leftover.unlink(missing_ok=True)
+    if log:
+        print(f"building {path.name}", file=sys.stderr)
+
+    conn = db.connect(partial)
+    db.migrate(conn, target=version)
+    conn.execute("ATTACH DATABASE ? AS src", (str(source),))
+    conn.create_function("uuid_text", 1, lambda b: str(uuid.UUID(bytes=b)), deterministic=True)
+    conn.create_function(
+        "made_up_uuid", 2, lambda kind, n: str(uuid.uuid5(uuid.NAMESPACE_OID, f"{kind}-{n}")), deterministic=True
+    )
+    uuid_keys = version < 7 and "public_id" in _columns(conn, "src", "tasks")
+    with conn:
+        for table in _TABLES:
+            have = _columns(conn, "src", table)
+            columns = [c for c in _columns(conn, "main", table) if c in have and c not in _TRIGGER_MAINTAINED]
+            values = [_UUID_KEYS.get((table, c), f"s.{c}") if uuid_keys else f"s.{c}" for c in columns]
+            conn.execute(
+                f"INSERT INTO main.{table}({', '.join(columns)}) SELECT {', '.join(values)} FROM src.{table} s"
+            )
+    conn.execute("DETACH DATABASE src")
+    conn.close()
+    partial.rename(path)
+    return path
+
+
+def _columns(conn: sqlite3.Connection, schema: str, table: str) -> list[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})")]
+
+
+def time_migrations(source: Path, cache_dir: Path, *, from_version: int, chunk_rows: int) -> list[db.StepTiming]:
+    copy = downgraded_copy(source, cache_dir, version=from_version, log=True)
+    return db.dry_run(copy, chunk_rows=chunk_rows)
+
+
+def compare_keys(source: Path, cache_dir: Path, *, repeat: int) -> KeyComparison:
+    """Sizes and join timings of ``source`` at schema 6 and migrated to 7."""
+    before = downgraded_copy(source, cache_dir, version=6, log=True)
+    after = cache_dir / f"{before.stem}-to-v7.db"
+    for stale in (after, Path(f"{after}-wal"), Path(f"{after}-shm")):
+        stale.unlink(missing_ok=True)
+    shutil.copyfile(before, after)
+    conn = db.connect(after)
+    start = time.perf_counter()
+    db.migrate(conn)
+    migrate_ms = (time.perf_counter() - start) * 1000.0
+    conn.close()
+
+    measured = [_measure(path, repeat=repeat) for path in (before, after)]
+    after.unlink()
+    (sizes6, timings6), (sizes7, timings7) = measured
+    return KeyComparison(
+        migrate_ms=migrate_ms,
+        sizes={name: (sizes6.get(name, 0), sizes7.get(name, 0)) for name in {**sizes6, **sizes7}},
+        timings={name: (timings6[name], timings7[name]) for name in timings6},
+    )
+
+
+def _measure(path: Path, *, repeat: int) -> tuple[dict[str, int], dict[str, float]]:
+    conn = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+    # Pages in use; the migrated copy's freed pages are left out. The change
+    # log is too: the upgrade to 7 empties it.
+    sizes = {name: int(size) for name, size in conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name")}
+    sizes["(total without change_log)"] = sum(size for name, size in sizes.items() if name != "change_log")
+
+    timings = {name: _median_ms(lambda: conn.execute(sql).fetchall(), repeat) for name, sql in _JOINS.items()}
+    task_ids = [row[0] for row in conn.execute("SELECT id FROM tasks ORDER BY rowid")]
+    sample = random.Random(0).sample(task_ids, min(_LOOKUP_SAMPLE, len(task_ids)))
+    timings[f"{len(sample)} history lookups by task"] = _median_ms(
+        lambda: [conn.execute(_LOOKUP_SQL, (task_id,)).fetchall() for task_id in sample], repeat
+    )
+    conn.close()
+    return sizes, timings
+
+
+def _median_ms(fn: Callable[[], object], repeat: int) -> float:
+    fn()  # warm the page cache
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000.0
@@ -0,0 +1,167 @@
+"""Timed operations against a synthetic DB (see benchmarks.synthetic)."""
+
+from __future__ import annotations
+
+import math
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable
+
+from taskmaster import db
+from taskmaster.constants import (
+    DEFAULT_DECAY_D,
+    DEFAULT_HORIZON_DAYS,
+    DEFAULT_NOISE_S,
+    DEFAULT_TAU,
+    LIST_PAGE_SIZE,
+    LIST_VIEWS,
+)
+from taskmaster.repository import due_waiting_counts, list_tasks, load_history_batch
+from taskmaster.scheduler import find_next_review, solve_next_review
+from taskmaster.service import complete_task, recalculate_all
+from taskmaster.timeutil import from_epoch_seconds, to_epoch_seconds
+
+from benchmarks.synthetic import ANCHOR, WORDS, tag_name
+
+# (label, text, tags): a short text takes the LIKE path, a longer one FTS.
+LIST_FILTERS: tuple[tuple[str, str | None, list[str]], ...] = (
+    ("plain", None, []),
+    ("text_like", WORDS[0][:2], []),
+    ("text_fts", WORDS[7], []),
+    ("tag_common", None, [tag_name(0)]),
+    ("tag_rare", None, [tag_name(150)]),
+    ("text_fts+tag", WORDS[7], [tag_name(0)]),
+    ("tag_pair", None, [tag_name(0), tag_name(1)]),
+    ("tag_common+rare", None, [tag_name(0), tag_name(150)]),
+)
+
+SCHEDULER_SAMPLE = 200
+COMPLETE_SAMPLE = 100
+
+
+def run_suite(db_path: Path, *, repeat: int = 5, seed: int = 0) -> dict[str, dict[str, float]]:
+    """Time every benchmark on ``db_path``; returns name -> stats in ms.
+
+    Read-only benchmarks run on the DB itself; completeTask and
+    recalculateAll run on a scratch copy.
+    """
+    results: dict[str, dict[str, float]] = {}
+    now_epoch = to_epoch_seconds(ANCHOR)
+
+    conn = db.connect(db_path)
+    for view in LIST_VIEWS:
+        for label, text, tags in LIST_FILTERS:
+            results[f"list_tasks.{view}.{label}"] = _stats(
+                _repeat(
+                    lambda: list_tasks(
+                        conn,
+                        view=view,
+                        text=text,
+                        tags=tags,
+                        limit=LIST_PAGE_SIZE + 1,
+                        now_epoch=now_epoch,
+                    ),
+                    repeat,
+                )
+            )
+    results["due_waiting_counts"] = _stats(
+        _repeat(lambda: due_waiting_counts(conn, now_epoch=now_epoch), repeat)
+    )
+
+    histories = _sample_histories(conn, seed=seed)
+    params = dict(
+        d=DEFAULT_DECAY_D,
+        tau=DEFAULT_TAU,
+        s=DEFAULT_NOISE_S,
+        p_target=0.9,
+        horizon_days=DEFAULT_HORIZON_DAYS,
+    )
+    results["find_next_review"] = _stats(
+        [_time(lambda: find_next_review(h, h[-1], **params)) for h in histories]
+    )
+    results["solve_next_review"] = _stats(
+        [_time(lambda: solve_next_review(h, h[-1], **params)) for h in histories]
+    )
+    conn.close()
+
+    with tempfile.TemporaryDirectory(prefix="taskmaster-bench-") as tmp:
+        scratch = Path(tmp) / db_path.name
+        shutil.copyfile(db_path, scratch)
+        conn = db.connect(scratch)
+        results["complete_task"] = _stats(_complete_sample(conn, seed=seed))
+        results["recalculate_all"] = _stats(
+            _repeat(lambda: _in_transaction(conn, _recalculate), max(1, repeat // 2))
+        )
+        conn.close()
+
+    return results
+
+
+def _recalculate(conn: sqlite3.Connection) -> None:
+    recalculate_all(conn, now=ANCHOR, horizon_days=DEFAULT_HORIZON_DAYS)
+
+
+def _in_transaction(conn: sqlite3.Connection, fn: Callable[[sqlite3.Connection], object]) -> None:
+    with conn:
+        fn(conn)
+
+
+def _complete_sample(conn: sqlite3.Connection, *, seed: int) -> list[float]:
+    # The controller's completeTask: one transaction per complete, committed.
+    due_ids = [
+        r[0]
+        for r in conn.execute(
+            "SELECT id FROM tasks WHERE status = 'due' AND deleted_at IS NULL ORDER BY id"
+        )
+    ]
+    sample = random.Random(seed).sample(due_ids, min(COMPLETE_SAMPLE, len(due_ids)))
+    now = ANCHOR + timedelta(minutes=1)
+    return [
+        _time(
+            lambda: _in_transaction(
+                conn,
+                lambda c: complete_task(
+                    c, task_id=task_id, grade="good", now=now, horizon_days=DEFAULT_HORIZON_DAYS
+                ),
+            )
+        )
+        for task_id in sample
+    ]
+
+
+def _sample_histories(conn: sqlite3.Connection, *, seed: int) -> list[list]:
+    batch = load_history_batch(conn)
+    spans = [
+        (batch.offsets[i], batch.offsets[i + 1])
+        for i in range(len(batch.task_ids))
+    ]
+    picked = random.Random(seed).sample(spans, min(SCHEDULER_SAMPLE, len(spans)))
+    return [[from_epoch_seconds(ep) for ep in batch.event_epochs[a:b]] for a, b in picked]
+
+
+def _time(fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def _repeat(fn: Callable[[], object], repeat: int) -> list[float]:
+    fn()  # warm the page cache and statement cache
+    return [_time(fn) for _ in range(repeat)]
+
+
+def _stats(samples: list[float]) -> dict[str, float]:
+    ms = sorted(s * 1000.0 for s in samples)
+    return {
+        "n": len(ms),
+        "min_ms": ms[0],
+        "p50_ms": statistics.median(ms),
+        "p95_ms": ms[math.ceil(0.95 * len(ms)) - 1],
+        "mean_ms": statistics.fmean(ms),
+    }
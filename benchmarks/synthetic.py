@@ -0,0 +1,134 @@
+"""Deterministic synthetic TaskMaster databases.
+
+Everything is written through db.migrate and the repository/service
+functions, so the generated files have exactly the layout the app produces.
+The same (tasks, seed) always yields the same content, ids included.
+"""
+
+from __future__ import annotations
+
+import random
+import sqlite3
+import sys
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator
+
+from taskmaster import db, repository
+from taskmaster.constants import DEFAULT_HORIZON_DAYS, SCHEMA_VERSION, VALID_GRADES
+from taskmaster.service import recalculate_all
+from taskmaster.timeutil import to_epoch_seconds
+
+# Fixed "now" of every generated DB; benchmarks evaluate against it too.
+ANCHOR = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+TAG_POOL_SIZE = 300
+MAX_EVENTS_PER_TASK = 400
+ARCHIVED_RATIO = 0.05
+COMMIT_EVERY = 10_000
+
+WORDS = (
+    "alpha", "beta", "gamma", "delta", "verb", "noun", "phrase", "grammar",
+    "kanji", "vocab", "reading", "listening", "chapter", "exercise", "review",
+    "英単語", "漢字", "文法", "例文", "読解",
+)
+GRADE_WEIGHTS = (0.10, 0.20, 0.55, 0.15)  # again, hard, good, easy
+
+
+def tag_name(rank: int) -> str:
+    """Tag of popularity ``rank`` (0 is the most common)."""
+    return f"tag{rank:03d}"
+
+
+def generate(db_path: Path, *, tasks: int, seed: int = 0, log: bool = False) -> None:
+    """Create a new DB at ``db_path`` with ``tasks`` tasks.
+
+    Completion histories are power-law sized (most tasks have a handful of
+    events, a few have hundreds) with growing review gaps; tag popularity is
+    Zipf-like over TAG_POOL_SIZE tags, at most 5 per task. Statuses come from
+    a batch recalculation at ANCHOR plus ARCHIVED_RATIO archived tasks.
+    """
+    if db_path.exists():
+        raise FileExistsError(db_path)
+
+    rnd = random.Random(seed)
+    tag_weights = [1.0 / (rank + 1) for rank in range(TAG_POOL_SIZE)]
+    anchor_epoch = to_epoch_seconds(ANCHOR)
+
+    conn = db.connect(db_path)
+    db.migrate(conn)
+    with _seeded_ids(rnd):
+        archived: list[int] = []
+        for start in range(0, tasks, COMMIT_EVERY):
+            with conn:
+                for i in range(start, min(start + COMMIT_EVERY, tasks)):
+                    task_id = _add_task(conn, rnd, i, tag_weights, anchor_epoch)
+                    if rnd.random() < ARCHIVED_RATIO:
+                        archived.append(task_id)
+            if log:
+                print(f"  {min(start + COMMIT_EVERY, tasks):,}/{tasks:,} tasks", file=sys.stderr)
+
+        with conn:
+            recalculate_all(conn, now=ANCHOR, horizon_days=DEFAULT_HORIZON_DAYS)
+            for task_id in archived:
+                repository.archive_task(conn, task_id=task_id, now_epoch=anchor_epoch)
+
+    conn.execute("PRAGMA optimize")
+    conn.close()
+
+
+def cached_db(cache_dir: Path, *, tasks: int, seed: int = 0, log: bool = False) -> Path:
+    """Path of a generated DB, creating it on first use."""
+    path = cache_dir / f"synthetic-{tasks}-s{seed}-v{SCHEMA_VERSION}.db"
+    if not path.exists():
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        partial = path.with_suffix(".partial")
+        for leftover in (partial, Path(f"{partial}-wal"), Path(f"{partial}-shm")):
+            leftover.unlink(missing_ok=True)
+        if log:
+            print(f"generating {path.name}", file=sys.stderr)
+        generate(partial, tasks=tasks, seed=seed, log=log)
+        partial.rename(path)
+    return path
+
+
+def _add_task(
+    conn: sqlite3.Connection,
+    rnd: random.Random,
+    i: int,
+    tag_weights: list[float],
+    anchor_epoch: int,
+) -> int:
+    created = ANCHOR - timedelta(days=rnd.uniform(1, 3 * 365))
+    title = f"{rnd.choice(WORDS)} {i} {rnd.choice(WORDS)}"
+    note = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(0, 12)))
+    task_id = repository.create_task(conn, title=title, note=note, now=created)
+
+    # Pareto(1.1) - 1: ~60% of tasks have 0-1 events, the tail runs long.
+    # Squared uniforms cluster events early, so review gaps grow over time.
+    n_events = min(int(rnd.paretovariate(1.1)) - 1, MAX_EVENTS_PER_TASK)
+    span = ANCHOR - created - timedelta(minutes=n_events + 1)
+    at = created
+    for u in sorted(rnd.random() ** 2 for _ in range(n_events)):
+        at = max(at + timedelta(minutes=1), created + span * u)
+        grade = rnd.choices(VALID_GRADES, weights=GRADE_WEIGHTS)[0]
+        repository.add_completion_event(conn, task_id=task_id, completed_at=at, grade=grade)
+
+    n_tags = min(int(rnd.paretovariate(1.5)) - 1, 5)
+    for rank in set(rnd.choices(range(TAG_POOL_SIZE), weights=tag_weights, k=n_tags)):
+        repository.add_tag_to_task(conn, task_id=task_id, tag_name=tag_name(rank), now_epoch=anchor_epoch)
+    return task_id
+
+
+@contextmanager
+def _seeded_ids(rnd: random.Random) -> Iterator[None]:
+    # repository.new_public_id is uuid4; draw from rnd instead so public ids
+    # (and with them the public_id index layout) are reproducible.
+    original = repository.new_public_id
+    repository.new_public_id = lambda: uuid.UUID(int=rnd.getrandbits(128), version=4).bytes
+    try:
+        yield
+    finally:
+        repository.new_public_id = original
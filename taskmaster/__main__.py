@@ -1,6 +1,28 @@
 from __future__ import annotations
 
-from taskmaster.app import main
+import sys
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    # Subcommands (or CLI options) run headless; anything else starts the GUI.
+    if args and (args[0] in _cli_commands() or args[0] in ("--db", "--text", "-h", "--help")):
+        from taskmaster.cli import main as cli_main
+
+        return cli_main(args)
+
+    from taskmaster import startup
+
+    startup.begin()
+    from taskmaster.app import main as app_main
+
+    return app_main(None if argv is None else [sys.argv[0], *argv])
+
+
+def _cli_commands() -> tuple[str, ...]:
+    from taskmaster.cli import COMMANDS
+
+    return COMMANDS
 
 
 if __name__ == "__main__":
@@ -0,0 +1,150 @@
+"""Accuracy of approximate activation against the exact sum on a real DB.
+
+Usage: python -m taskmaster.activation_report [DB_PATH] [--horizon DAYS] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import sqlite3
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+from taskmaster import db
+from taskmaster.constants import (
+    ACTIVATION_RECENT_EVENTS,
+    DEFAULT_DECAY_D,
+    DEFAULT_HORIZON_DAYS,
+    DEFAULT_NOISE_S,
+    DEFAULT_P_TARGET,
+    DEFAULT_TAU,
+    GRADE_P_TARGET,
+)
+from taskmaster.repository import load_history_batch
+from taskmaster.scheduler import (
+    ActivationState,
+    approx_history_sum,
+    base_activation,
+    solve_next_review,
+    solve_next_review_from_state,
+)
+from taskmaster.timeutil import from_epoch_seconds, to_epoch_seconds
+
+
+def accuracy_report(conn: sqlite3.Connection, *, horizon_days: int) -> dict[str, object]:
+    """Compare exact and approximate scheduling for every active task.
+
+    Only tasks with more than ACTIVATION_RECENT_EVENTS events are measured;
+    shorter histories are kept exactly and have no error.
+    """
+    batch = load_history_batch(conn)
+
+    activation_errors: list[float] = []
+    schedule_errors_min: list[float] = []
+    exact_tasks = 0
+
+    for i in range(len(batch.task_ids)):
+        epochs = batch.event_epochs[batch.offsets[i] : batch.offsets[i + 1]]
+        if len(epochs) <= ACTIVATION_RECENT_EVENTS:
+            exact_tasks += 1
+            continue
+
+        state = ActivationState()
+        for ep in epochs:
+            state = state.with_event(ep, keep=ACTIVATION_RECENT_EVENTS)
+
+        history_times = [from_epoch_seconds(ep) for ep in epochs]
+        now = history_times[-1]
+        t_target = now + timedelta(days=horizon_days)
+
+        exact_B = base_activation(history_times, t_target, DEFAULT_DECAY_D)
+        approx_B = math.log(approx_history_sum(state, to_epoch_seconds(t_target), DEFAULT_DECAY_D))
+        activation_errors.append(abs(approx_B - exact_B))
+
+        params = dict(
+            d=DEFAULT_DECAY_D,
+            tau=DEFAULT_TAU,
+            s=DEFAULT_NOISE_S,
+            p_target=float(GRADE_P_TARGET.get(batch.last_grades[i], DEFAULT_P_TARGET)),
+            horizon_days=horizon_days,
+        )
+        exact_next = solve_next_review(history_times, now, **params)
+        approx_next = solve_next_review_from_state(state, now, **params)
+        schedule_errors_min.append(abs((approx_next - exact_next).total_seconds()) / 60.0)
+
+    return {
+        "tasks": len(batch.task_ids),
+        "exact_tasks": exact_tasks,
+        "approximated_tasks": len(activation_errors),
+        "recent_events_kept": ACTIVATION_RECENT_EVENTS,
+        "horizon_days": horizon_days,
+        "activation_abs_error": _summary(activation_errors),
+        "next_review_abs_error_minutes": _summary(schedule_errors_min),
+        "next_review_identical_ratio": (
+            sum(1 for e in schedule_errors_min if e == 0.0) / len(schedule_errors_min)
+            if schedule_errors_min
+            else 1.0
+        ),
+    }
+
+
+def _summary(values: list[float]) -> dict[str, float]:
+    if not values:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(values)
+    return {
+        "mean": sum(ordered) / len(ordered),
+        "p50": ordered[int(0.50 * (len(ordered) - 1))],
+        "p95": ordered[int(0.95 * (len(ordered) - 1))],
+        "max": ordered[-1],
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m taskmaster.activation_report")
+    parser.add_argument("db_path", nargs="?", help="defaults to the app's default DB")
+    parser.add_argument("--horizon", type=int, default=DEFAULT_HORIZON_DAYS)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    if args.db_path:
+        db_path = Path(args.db_path).expanduser()
+    else:
+        from taskmaster.settings import default_db_path
+
+        db_path = default_db_path()
+
+    conn = db.connect(db_path)
+    db.migrate(conn)
+    report = accuracy_report(conn, horizon_days=args.horizon)
+    conn.close()
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return 0
+
+    act = report["activation_abs_error"]
+    sched = report["next_review_abs_error_minutes"]
+    print(f"DB: {db_path}")
+    print(
+        f"Tasks: {report['tasks']} ({report['approximated_tasks']} approximated, "
+        f"{report['exact_tasks']} exact with <= {ACTIVATION_RECENT_EVENTS} events)"
+    )
+    print(f"Horizon: {args.horizon} days")
+    print("                      mean        p50        p95        max")
+    print(
+        f"|dB| (activation) {act['mean']:10.5f} {act['p50']:10.5f} {act['p95']:10.5f} {act['max']:10.5f}"
+    )
+    print(
+        f"|dt| (minutes)    {sched['mean']:10.1f} {sched['p50']:10.1f} {sched['p95']:10.1f} {sched['max']:10.1f}"
+    )
+    print(f"Identical next review: {report['next_review_identical_ratio']:.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
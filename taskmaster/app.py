@@ -4,14 +4,17 @@ import sys
 import os
 from pathlib import Path
 
-from PySide6.QtCore import QUrl
+from PySide6.QtCore import Qt, QUrl
 from PySide6.QtWidgets import QApplication
 from PySide6.QtQml import QQmlApplicationEngine, QQmlEngine
 
+from taskmaster import startup
 from taskmaster.controller import TaskMasterController
 
 
 def main(argv: list[str] | None = None) -> int:
+    startup.begin()
+    startup.mark("import")
     argv = list(sys.argv if argv is None else argv)
 
     # Workaround: Some QtQuick.Controls styles (e.g., Fusion/Material) are broken
@@ -20,10 +23,12 @@ def main(argv: list[str] | None = None) -> int:
     os.environ.setdefault("QT_QUICK_CONTROLS_STYLE", "Basic")
 
     app = QApplication(argv)
+    startup.mark("qapplication")
 
     engine = QQmlApplicationEngine()
     controller = TaskMasterController()
     controller.setParent(app)
+    app.aboutToQuit.connect(controller.shutdown)
     QQmlEngine.setObjectOwnership(controller, QQmlEngine.ObjectOwnership.CppOwnership)
     engine.rootContext().setContextProperty("TM", controller)
 
@@ -32,5 +37,13 @@ def main(argv: list[str] | None = None) -> int:
 
     if not engine.rootObjects():
         return 1
+    startup.mark("qml_load")
+    engine.rootObjects()[0].frameSwapped.connect(
+        lambda: startup.mark("first_frame"), Qt.ConnectionType.SingleShotConnection
+    )
+
+    # The window is up with empty views; the DB opens on the writer thread
+    # and the visible view fills in when its first query returns.
+    controller.start()
 
     return app.exec()
@@ -0,0 +1,129 @@
+"""Online backups through the SQLite backup API, and scheduled rotation.
+
+backup_to copies a live DB page batch by page batch from a connection of
+its own, so it runs next to the app's reader and writer. Nothing here
+imports Qt; the controller runs it on a DbWorker.
+"""
+
+from __future__ import annotations
+
+import gzip
+import os
+import re
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+from taskmaster.constants import BACKUP_PAGES_PER_STEP
+
+SCHEDULED_PREFIX = "taskmaster-auto-"
+_SCHEDULED_RE = re.compile(re.escape(SCHEDULED_PREFIX) + r"(\d{8}-\d{6})\.db(\.gz)?$")
+_STAMP_FORMAT = "%Y%m%d-%H%M%S"
+_COPY_CHUNK = 1024 * 1024
+
+
+class BackupCancelled(Exception):
+    pass
+
+
+def backup_to(
+    source: sqlite3.Connection,
+    dest: Path,
+    *,
+    compress: bool = False,
+    pages: int = BACKUP_PAGES_PER_STEP,
+    progress: Callable[[float], None] | None = None,
+) -> Path:
+    """Copy the DB behind ``source`` to ``dest``; returns the file written.
+
+    With ``compress`` the result is gzip'd and ``.gz`` is appended. The page
+    copy it compresses goes to a temporary directory first, which needs
+    about the DB's size free while the backup runs; only the compressed
+    file is written next to ``dest``. The file only appears under its final
+    name once complete. ``progress`` gets the done fraction after every step
+    and may raise (e.g. BackupCancelled) to abort.
+    """
+    report = progress or (lambda _fraction: None)
+    final = dest.with_name(dest.name + ".gz") if compress and dest.suffix != ".gz" else dest
+    partial = final.with_name(final.name + ".partial")
+    final.parent.mkdir(parents=True, exist_ok=True)
+
+    try:
+        if compress:
+            import tempfile
+
+            # The copy is half the work, compressing the other half.
+            with tempfile.TemporaryDirectory(prefix="taskmaster-backup-") as tmp:
+                raw = Path(tmp) / final.stem
+                _copy_pages(source, raw, pages=pages, report=lambda f: report(f * 0.5))
+                _gzip(raw, partial, report=lambda f: report(0.5 + f * 0.5))
+        else:
+            _copy_pages(source, partial, pages=pages, report=report)
+        os.replace(partial, final)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    report(1.0)
+    return final
+
+
+def _copy_pages(
+    source: sqlite3.Connection, dest: Path, *, pages: int, report: Callable[[float], None]
+) -> None:
+    # In WAL mode a read transaction pins one snapshot: commits by the app's
+    # writer go on between steps and no longer restart the copy. Under a
+    # rollback journal it would block them, so the copy may restart instead.
+    wal = source.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    if wal:
+        source.execute("BEGIN")
+        source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+    try:
+        target = sqlite3.connect(str(dest))
+        try:
+            source.backup(
+                target,
+                pages=pages,
+                progress=lambda _status, remaining, total: report(1 - remaining / total if total else 1.0),
+            )
+        finally:
+            target.close()
+    finally:
+        if wal:
+            source.rollback()
+
+
+def _gzip(src: Path, dest: Path, *, report: Callable[[float], None]) -> None:
+    total = src.stat().st_size or 1
+    done = 0
+    with open(src, "rb") as fin, gzip.open(dest, "wb", compresslevel=6) as fout:
+        while chunk := fin.read(_COPY_CHUNK):
+            fout.write(chunk)
+            done += len(chunk)
+            report(done / total)
+
+
+def scheduled_backup_path(directory: Path, now: datetime) -> Path:
+    return directory / f"{SCHEDULED_PREFIX}{now.strftime(_STAMP_FORMAT)}.db"
+
+
+def scheduled_backups(directory: Path) -> list[tuple[datetime, Path]]:
+    """Scheduled backups in ``directory``, oldest first (times are local)."""
+    if not directory.is_dir():
+        return []
+    found = []
+    for path in directory.iterdir():
+        m = _SCHEDULED_RE.match(path.name)
+        if m:
+            found.append((datetime.strptime(m.group(1), _STAMP_FORMAT), path))
+    return sorted(found)
+
+
+def rotate(directory: Path, *, keep: int) -> list[Path]:
+    """Delete all but the newest ``keep`` scheduled backups; returns the deleted files."""
+    backups = scheduled_backups(directory)
+    doomed = [path for _stamp, path in backups[: max(0, len(backups) - keep)]]
+    for path in doomed:
+        path.unlink(missing_ok=True)
+    return doomed
+
@@ -0,0 +1,383 @@
+"""Headless command line interface (never imports Qt).
+
+Usage: python -m taskmaster <command> [options]
+
+Commands print JSON on stdout (``--text`` for tab-separated lines) and
+exit 1 with {"error": ...} on stderr when the task does not exist, the
+action is not allowed, or a file or the DB cannot be read or written. The DB is --db, else $TASKMASTER_DB, else the one
+configured in the app, else the default path.
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import os
+import sqlite3
+import sys
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+from taskmaster import db
+from taskmaster.constants import LIST_VIEWS, VALID_GRADES
+from taskmaster.repository import (
+    TaskRow,
+    add_tag_to_task,
+    archive_task,
+    create_task,
+    db_stats,
+    get_task,
+    list_tasks,
+    task_id_for,
+    update_due_from_waiting,
+)
+from taskmaster.timeutil import to_epoch_seconds, utc_now
+
+COMMANDS = (
+    "add",
+    "list",
+    "search",
+    "complete",
+    "archive",
+    "recalc",
+    "stats",
+    "import",
+    "export",
+    "export-changes",
+    "apply-changes",
+    "trim-changes",
+    "migrate",
+)
+DB_ENV_VAR = "TASKMASTER_DB"
+
+
+class CliError(Exception):
+    pass
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+
+    from taskmaster.settings import AppSettings, default_db_path
+
+    settings = AppSettings.read_only()
+    db_path = Path(args.db or os.environ.get(DB_ENV_VAR) or settings.db_path() or default_db_path()).expanduser()
+    args.db = str(db_path)
+    conn: sqlite3.Connection | None = None
+    try:
+        conn = db.connect(db_path, profile=db.CONNECTION_PROFILES[settings.connection_profile()])
+        if args.command != "migrate":
+            db.migrate(conn)
+        result = _COMMAND_HANDLERS[args.command](conn, args, settings)
+    except (CliError, ValueError, OSError, sqlite3.Error) as e:
+        json.dump({"error": str(e)}, sys.stderr)
+        sys.stderr.write("\n")
+        return 1
+    finally:
+        if conn is not None:
+            conn.close()
+
+    _print(result, text=args.text)
+    return 0
+
+
+def _common_options(*, defaults: bool) -> argparse.ArgumentParser:
+    # Shared by the top-level parser and every command, so the options go
+    # before or after the command. Only the top level sets defaults; a
+    # command's would overwrite a value given before it.
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--db",
+        default=None if defaults else argparse.SUPPRESS,
+        help="DB path (default: $TASKMASTER_DB or the app's DB)",
+    )
+    common.add_argument(
+        "--text",
+        action="store_true",
+        default=False if defaults else argparse.SUPPRESS,
+        help="tab-separated output instead of JSON",
+    )
+    return common
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m taskmaster", parents=[_common_options(defaults=True)])
+    sub = parser.add_subparsers(dest="command", required=True)
+    add_command = functools.partial(sub.add_parser, parents=[_common_options(defaults=False)])
+
+    add = add_command("add", help="create a due task")
+    add.add_argument("title")
+    add.add_argument("--note", default="")
+    add.add_argument("--tag", action="append", default=[], help="repeatable, max 5")
+
+    lst = add_command("list", help="list a view in display order")
+    lst.add_argument("--view", choices=LIST_VIEWS, default="due")
+    lst.add_argument("--limit", type=int)
+
+    search = add_command("search", help="search a view; #tag tokens filter by tag")
+    search.add_argument("query")
+    search.add_argument("--view", choices=LIST_VIEWS, default="due")
+    search.add_argument("--limit", type=int)
+
+    complete = add_command("complete", help="record a completion of a due task and reschedule")
+    complete.add_argument("task_id")
+    complete.add_argument("--grade", choices=VALID_GRADES, default="good")
+
+    archive = add_command("archive", help="archive a task")
+    archive.add_argument("task_id")
+
+    add_command("recalc", help="recompute next review for every due/waiting task")
+    add_command("stats", help="task, event and tag counts")
+
+    imp = add_command("import", help="bulk import tasks, events and tags from JSONL or CSV files")
+    imp.add_argument("paths", nargs="+", help="a .csv file holds one record type; give tasks before events")
+    imp.add_argument("--format", choices=("jsonl", "csv"), help="default: from the file suffix")
+
+    exp = add_command("export", help="export every task, event and tag as JSONL or CSV")
+    exp.add_argument("out")
+    exp.add_argument("--format", choices=("jsonl", "csv"), help="default: from the file suffix")
+    exp.add_argument("--events-out", help="events file (required for CSV)")
+
+    export = add_command("export-changes", help="write rows changed after --since as a JSONL delta")
+    export.add_argument("out", help="file to write")
+    export.add_argument("--since", type=int, default=0, help="to_seq of the previous export (default: everything logged)")
+
+    apply = add_command("apply-changes", help="replay a delta written by export-changes")
+    apply.add_argument("path")
+
+    trim = add_command("trim-changes", help="drop change log entries up to --through")
+    trim.add_argument("--through", type=int, required=True)
+
+    mig = add_command("migrate", help="upgrade the DB schema, printing per-step timings")
+    mig.add_argument("--dry-run", action="store_true", help="migrate a temporary copy instead")
+    return parser
+
+
+def _cmd_add(conn: sqlite3.Connection, args: argparse.Namespace, settings: Any) -> dict[str, Any]:
+    title = args.title.strip()
+    if not title:
+        raise CliError("title is required")
+    now = utc_now()
+    with conn:
+        task_id = create_task(conn, title=title, note=args.note, now=now)
+        for tag in args.tag:
+            add_tag_to_task(conn, task_id=task_id, tag_name=tag, now_epoch=to_epoch_seconds(now))
+        update_due_from_waiting(conn, now_epoch=to_epoch_seconds(now))
+    return _task_json(get_task(conn, task_id=task_id))
+
+
+def _cmd_list(conn: sqlite3.Connection, args: argparse.Namespace, settings: Any) -> list[dict[str, Any]]:
+    return _list(conn, view=args.view, query="", limit=args.limit)
+
+
+def _cmd_search(conn: sqlite3.Connection, args: argparse.Namespace, settings: Any) -> list[dict[str, Any]]:
+    return _list(conn, view=args.view, query=args.query, limit=args.limit)
+
+
+def _list(conn: sqlite3.Connection, *, view: str, query: str, limit: int | None) -> list[dict[str, Any]]:
+    from taskmaster.query_parser import parse_search_query
+
+    text, tags = parse_search_query(query)
+    rows = list_tasks(
+        conn,
+        view=view,
+        text=text or None,
+        tags=tags,
+        limit=limit,
+        now_epoch=to_epoch_seconds(utc_now()),
+    )
+    return [_task_json(r) for r in rows]
+
+
+def _cmd_complete(conn: sqlite3.Connection, args: argparse.Namespace, settings: Any) -> dict[str, Any]:
+    from taskmaster.service import complete_task
+
+    task = _require_task(conn, args.task_id)
+    if task.status == "archived":
+        raise CliError(f"task is archived: {args.task_id}")
+    now = utc_now()
+    # Like the app, which only completes from the Due view; a waiting task
+    # whose review time has passed counts as due.
+    elapsed = task.next_review_at is not None and task.next_review_at <= to_epoch_seconds(now)
+    if task.status != "due" and not elapsed:
+        raise CliError(f"task is not due: {args.task_id}")
+    with conn:
+        complete_task(
+            conn,
+            task_id=task.id,
+            grade=args.grade,
+            now=now,
+            horizon_days=settings.horizon_days(),
+            approximate=settings.approx_activation(),
+        )
+        update_due_from_waiting(conn, now_epoch=to_epoch_seconds(now))
+    return _task_json(get_task(conn, task_id=task.id))
+
+
+def _cmd_archive(conn: sqlite3.Connection, args: argparse.Namespace, settings: Any) -> dict[str, Any]:
+    task = _require_task(conn, args.task_id)
+    if task.status == "archived":
+        raise CliError(f"task is already archived: {args.task_id}")
+    now_epoch = to_epoch_seconds(utc_now())
+    with conn:
+        archive_task(conn, task_id=task.id, now_epoch=now_epoch)
+        update_due_from_waiting(conn, now_epoch=now_epoch)
+    return _task_json(get_task(conn, task_id=task.id))
+
+
+def _cmd_recalc(conn: sqlite3.Connection, args: argparse.Namespace, settings: Any) -> dict[str, Any]:
+    from taskmaster.service import recalculate_all
+
+    with conn:
+        count = recalculate_all(
+            conn,
+            now=utc_now(),
+            horizon_days=settings.horizon_days(),
+            approximate=settings.approx_activation(),
+        )
+    return {"rescheduled": count}
+
+
+def _cmd_stats(conn: sqlite3.Connection, args: argparse.Namespace, settings: Any) -> dict[str, Any]:
+    info = db.db_info(conn, Path(args.db))
+    stats = db_stats(conn, now_epoch=to_epoch_seconds(utc_now()))
+    return {"db_path": str(info.path), "schema_version": info.schema_version, **stats}
+
+
+def _cmd_import(conn: sqlite3.Connection, args: argparse.Namespace, settings: Any) -> dict[str, Any]:
+    from taskmaster.transfer import import_records, read_csv, read_jsonl
+
+    def records():
+        for path in args.paths:
+            reader = read_csv if _file_format(path, args.format) == "csv" else read_jsonl
+            with open(Path(path).expanduser(), encoding="utf-8", newline="") as f:
+                yield from reader(f)
+
+    summary = import_records(
+        conn,
+        records(),
+        now=utc_now(),
+        horizon_days=settings.horizon_days(),
+        approximate=settings.approx_activation(),
+    )
+    return asdict(summary)
+
+
+def _cmd_export(conn: sqlite3.Connection, args: argparse.Namespace, settings: Any) -> dict[str, Any]:
+    from taskmaster.transfer import export_csv, export_jsonl
+
+    out = Path(args.out).expanduser()
+    if _file_format(args.out, args.format) == "csv":
+        if not args.events_out:
+            raise CliError("CSV export needs --events-out")
+        events_out = Path(args.events_out).expanduser()
+        with open(out, "w", encoding="utf-8", newline="") as f, open(events_out, "w", encoding="utf-8", newline="") as g:
+            summary = export_csv(conn, f, g)
+        return {"path": str(out), "events_path": str(events_out), **asdict(summary)}
+    with open(out, "w", encoding="utf-8") as f:
+        summary = export_jsonl(conn, f)
+    return {"path": str(out), **asdict(summary)}
+
+
+def _file_format(path: str, fmt: str | None) -> str:
+    return fmt or ("csv" if path.lower().endswith(".csv") else "jsonl")
+
+
+def _cmd_export_changes(conn: sqlite3.Connection, args: argparse.Namespace, settings: Any) -> dict[str, Any]:
+    from taskmaster.changes import export_changes
+
+    out = Path(args.out).expanduser()
+    partial = out.with_name(out.name + ".partial")
+    try:
+        with open(partial, "w", encoding="utf-8") as f:
+            summary = export_changes(conn, f, since_seq=args.since)
+        os.replace(partial, out)
+    finally:
+        partial.unlink(missing_ok=True)
+    return {"path": str(out), **asdict(summary)}
+
+
+def _cmd_apply_changes(conn: sqlite3.Connection, args: argparse.Namespace, settings: Any) -> dict[str, Any]:
+    from taskmaster.changes import apply_changes
+
+    with open(Path(args.path).expanduser(), encoding="utf-8") as f, conn:
+        summary = apply_changes(conn, f)
+    return asdict(summary)
+
+
+def _cmd_trim_changes(conn: sqlite3.Connection, args: argparse.Namespace, settings: Any) -> dict[str, Any]:
+    from taskmaster.changes import trim_change_log
+
+    with conn:
+        return {"trimmed": trim_change_log(conn, through_seq=args.through)}
+
+
+def _cmd_migrate(conn: sqlite3.Connection, args: argparse.Namespace, settings: Any) -> dict[str, Any]:
+    steps: list[db.StepTiming] = []
+    if args.dry_run:
+        steps = db.dry_run(Path(args.db))
+        version = steps[-1].version if steps else db.get_schema_version(conn)
+    else:
+        version = db.migrate(conn, on_step=steps.append)
+    return {"schema_version": version, "dry_run": args.dry_run, "steps": [asdict(t) for t in steps]}
+
+
+_COMMAND_HANDLERS = {
+    "add": _cmd_add,
+    "list": _cmd_list,
+    "search": _cmd_search,
+    "complete": _cmd_complete,
+    "archive": _cmd_archive,
+    "recalc": _cmd_recalc,
+    "stats": _cmd_stats,
+    "import": _cmd_import,
+    "export": _cmd_export,
+    "export-changes": _cmd_export_changes,
+    "apply-changes": _cmd_apply_changes,
+    "trim-changes": _cmd_trim_changes,
+    "migrate": _cmd_migrate,
+}
+
+
+def _require_task(conn: sqlite3.Connection, public_id: str) -> TaskRow:
+    task_id = task_id_for(conn, public_id=public_id)
+    task = get_task(conn, task_id=task_id) if task_id is not None else None
+    if task is None or task.purged_at is not None:
+        raise CliError(f"no such task: {public_id}")
+    return task
+
+
+def _task_json(task: TaskRow) -> dict[str, Any]:
+    return {
+        "id": task.public_id.hex(),
+        "title": task.title,
+        "note": task.note,
+        "status": task.status,
+        "created_at": task.created_at,
+        "updated_at": task.updated_at,
+        "next_review_at": task.next_review_at,
+        "archived_at": task.deleted_at,
+        "last_completed_at": task.last_completed_at,
+        "review_count": task.review_count,
+        "tags": [t for t in (task.tags or "").split(", ") if t],
+    }
+
+
+def _print(result: Any, *, text: bool) -> None:
+    if not text:
+        json.dump(result, sys.stdout, ensure_ascii=False)
+        sys.stdout.write("\n")
+        return
+    for row in result if isinstance(result, list) else [result]:
+        print("\t".join(_text_cell(v) for v in row.values()))
+
+
+def _text_cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return ",".join(value)
+    return str(value).replace("\t", " ").replace("\n", " ")
@@ -3,7 +3,15 @@ from __future__ import annotations
 APP_ORG = "Yaki"
 APP_NAME = "TaskMaster"
 
-SCHEMA_VERSION = 1
+SCHEMA_VERSION = 7
+# Rows per transaction in migration backfills (db.migrate).
+MIGRATION_CHUNK_ROWS = 10_000
+
+# SQLite connection profiles, see db.CONNECTION_PROFILES.
+CONNECTION_PROFILE_NAMES = ("wal", "rollback")
+DEFAULT_CONNECTION_PROFILE = "wal"
+
+MAX_TAGS_PER_TASK = 5
 
 DEFAULT_HORIZON_DAYS = 365
 MAX_HORIZON_DAYS = 365
@@ -24,6 +32,31 @@ GRADE_P_TARGET = {
 
 VALID_GRADES = tuple(GRADE_P_TARGET.keys())
 
+# Approximate activation: newest events kept exactly per task (older ones are
+# summarized by count + first event time).
+ACTIVATION_RECENT_EVENTS = 3
+
+# Backups: pages copied per backup step (4 MiB at the default page size), how
+# often the scheduled backup checks whether one is due, and how many it keeps.
+BACKUP_PAGES_PER_STEP = 1024
+BACKUP_CHECK_MS = 10 * 60 * 1000
+DEFAULT_BACKUP_KEEP = 7
+MAX_BACKUP_INTERVAL_HOURS = 24 * 30
+
+# Bulk import (transfer.import_records): records per transaction.
+IMPORT_BATCH_ROWS = 20_000
+
+# Search: the FTS5 trigram index needs at least 3 characters; shorter text
+# falls back to LIKE.
+FTS_MIN_QUERY_CHARS = 3
+
 # UI
+LIST_VIEWS = ("due", "waiting", "archived")
 SEARCH_DEBOUNCE_MS = 150
-DUE_UPDATE_INTERVAL_MS = 60_000
+# The due timer is armed for the earliest next_review_at; QTimer intervals
+# are capped at INT_MAX ms (~24.8 days), longer waits re-arm on expiry.
+DUE_TIMER_MAX_MS = 2**31 - 1
+IDLE_REFRESH_MS = 500
+LIST_PAGE_SIZE = 200
+METRICS_REFRESH_MS = 2000
+METRICS_ROWS = 25
@@ -1,25 +1,40 @@
 from __future__ import annotations
 
-import shutil
+import math
 import sqlite3
+import threading
 from dataclasses import asdict
 from datetime import datetime, timedelta
+from functools import partial
 from pathlib import Path
+from typing import Any, Callable
 
-from PySide6.QtCore import (QObject, Property, QTimer, Signal, Slot)
+from PySide6.QtCore import (QObject, Property, Qt, QTimer, Signal, Slot)
 from PySide6.QtGui import QGuiApplication
 
 from taskmaster import db
+from taskmaster.backup import BackupCancelled, backup_to, rotate, scheduled_backup_path, scheduled_backups
+from taskmaster.db_worker import DbWorker
+from taskmaster import instrumentation, startup
+from taskmaster.instrumentation import timed
 from taskmaster.constants import (
-    DUE_UPDATE_INTERVAL_MS,
-    GRADE_P_TARGET,
+    BACKUP_CHECK_MS,
+    CONNECTION_PROFILE_NAMES,
+    DUE_TIMER_MAX_MS,
+    IDLE_REFRESH_MS,
+    METRICS_REFRESH_MS,
+    METRICS_ROWS,
+    LIST_PAGE_SIZE,
+    LIST_VIEWS,
     SEARCH_DEBOUNCE_MS,
     VALID_GRADES,
 )
 from taskmaster.query_parser import parse_search_query
 from taskmaster.repository import (
-    add_completion_event,
+    TagCache,
+    TaskRow,
     add_tag_to_task,
+    add_tags_to_tasks,
     archive_task,
     completion_history,
     create_task,
@@ -27,22 +42,36 @@ from taskmaster.repository import (
     get_task,
     list_tasks,
     list_task_tags,
+    next_due_epoch,
+    public_id_from_text,
     purge_task,
+    rebuild_search_index,
     remove_tag_from_task,
+    remove_tags_from_tasks,
     restore_task,
+    task_cursor,
+    task_id_for,
+    task_ids_for,
     update_due_from_waiting,
     update_task,
 )
-from taskmaster.scheduler import find_next_review
-from taskmaster.settings import AppSettings, default_db_path
+from taskmaster.service import complete_task, recalculate_all
+from taskmaster.settings import AppSettings, default_db_path, default_metrics_path
 from taskmaster.table_models import Column, TaskTableModel
-from taskmaster.timeutil import (
-    ceil_to_minute,
-    ensure_min_gap,
-    from_epoch_seconds,
-    to_epoch_seconds,
-    utc_now,
-)
+from taskmaster.timeutil import to_epoch_seconds, utc_now
+
+
+def _task_view(conn: sqlite3.Connection, task_id: int) -> str | None:
+    t = get_task(conn, task_id=task_id)
+    return t.status if t is not None else None
+
+
+def _task_id(conn: sqlite3.Connection, public_id: str) -> int:
+    """Internal id of the task QML knows as ``public_id``."""
+    task_id = task_id_for(conn, public_id=public_id)
+    if task_id is None:
+        raise LookupError(f"no such task: {public_id}")
+    return task_id
 
 
 def _pick_background(theme: str) -> str:
@@ -75,15 +104,49 @@ class TaskMasterController(QObject):
     statusMessageChanged = Signal()
     themeChanged = Signal()
     horizonDaysChanged = Signal()
+    approxActivationChanged = Signal()
+    connectionProfileChanged = Signal()
+    instrumentationChanged = Signal()
     dbLabelChanged = Signal()
     countsChanged = Signal()
     backgroundChanged = Signal()
+    backupChanged = Signal()
+    backupScheduleChanged = Signal()
+
+    # Emitted on the backup thread; delivered queued to _on_backup_progress.
+    _backupProgressed = Signal(float)
+    # (db epoch, version, fraction), emitted on the writer thread while it migrates.
+    _migrationProgressed = Signal(int, int, float)
 
     def __init__(self) -> None:
         super().__init__()
         self._settings = AppSettings()
+        if instrumentation.enabled_by_env() or self._settings.instrumentation():
+            instrumentation.enable(dump_path=default_metrics_path())
         self._db_path = Path(self._settings.db_path() or str(default_db_path()))
         self._conn: sqlite3.Connection | None = None
+        # False until the DB is open and migrated (see _open_db); views and
+        # counts stay dirty until then.
+        self._ready = False
+        self._db_epoch = 0  # bumped by _close_db; stale opens are ignored
+        # Used only by jobs on the writer connection; replaced on every open.
+        self._tag_cache = TagCache()
+
+        # List/count queries go to the read-only reader, mutations to the
+        # single writer; with WAL a long read never blocks a complete.
+        self._reader = DbWorker(read_only=True)
+        self._writer = DbWorker()
+        # Backups copy from a connection of their own, so a long one holds up
+        # neither list queries nor mutations (see backup.backup_to).
+        self._backuper = DbWorker(read_only=True, name="taskmaster-db-backup")
+        for worker in (self._reader, self._writer, self._backuper):
+            worker.jobFinished.connect(self._job_finished)
+            worker.jobFailed.connect(self._job_failed)
+            worker.jobCancelled.connect(self._job_cancelled)
+        self._pending: dict[int, tuple[Callable[[Any], None] | None, Callable[[str], None] | None]] = {}
+        # Bumped when the search or DB changes; list results from an older
+        # generation are dropped (and interrupted if still running).
+        self._generation = 0
 
         self._view = "due"  # due|waiting|archived|settings
         self._search_query = ""
@@ -120,19 +183,52 @@ class TaskMasterController(QObject):
             parent=self,
         )
 
+        for view in LIST_VIEWS:
+            self._model_for(view).setPageLoader(partial(self._load_page, view))
+
         self._due_count = 0
         self._waiting_count = 0
 
+        # Views whose models are out of date. Only the visible one is
+        # re-queried right away; hidden ones wait until shown or idle.
+        self._dirty_views: set[str] = set(LIST_VIEWS)
+        self._counts_dirty = True
+
         self._searchTimer = QTimer(self)
         self._searchTimer.setSingleShot(True)
-        self._searchTimer.timeout.connect(self.refresh)
+        self._searchTimer.timeout.connect(self._apply_search)
+
+        self._idleTimer = QTimer(self)
+        self._idleTimer.setSingleShot(True)
+        self._idleTimer.timeout.connect(self._refresh_idle)
 
+        # Single shot, armed for the earliest waiting deadline (see _arm_due_timer).
         self._dueTimer = QTimer(self)
+        self._dueTimer.setSingleShot(True)
+        self._dueTimer.setTimerType(Qt.TimerType.PreciseTimer)
         self._dueTimer.timeout.connect(self._tick_due_update)
 
+        # Set while a backup runs; setting the event cancels it.
+        self._backup_cancel: threading.Event | None = None
+        self._backup_progress = 0.0
+        self._backupProgressed.connect(self._on_backup_progress)
+
+        # Set to interrupt a running migration (it resumes on the next open).
+        self._migration_cancel = threading.Event()
+        self._migrationProgressed.connect(self._on_migration_progress)
+
+        self._backupTimer = QTimer(self)
+        self._backupTimer.setInterval(BACKUP_CHECK_MS)
+        self._backupTimer.timeout.connect(self._maybe_scheduled_backup)
+
+        # Repaints the Diagnostics card while it is shown.
+        self._metricsTimer = QTimer(self)
+        self._metricsTimer.setInterval(METRICS_REFRESH_MS)
+        self._metricsTimer.timeout.connect(self.instrumentationChanged)
+
+    def start(self) -> None:
+        """Open the DB in the background; call once the window is loaded."""
         self._open_db()
-        self.refresh()
-        self._dueTimer.start(DUE_UPDATE_INTERVAL_MS)
 
     # ---------- properties ----------
 
@@ -172,6 +268,23 @@ class TaskMasterController(QObject):
     def horizonDays(self) -> int:
         return self._settings.horizon_days()
 
+    @Property(bool, notify=approxActivationChanged)
+    def approxActivation(self) -> bool:
+        return self._settings.approx_activation()
+
+    @Property(str, notify=connectionProfileChanged)
+    def connectionProfile(self) -> str:
+        return self._settings.connection_profile()
+
+    @Property(bool, notify=instrumentationChanged)
+    def instrumentationEnabled(self) -> bool:
+        return instrumentation.is_enabled()
+
+    @Property("QVariantList", notify=instrumentationChanged)
+    def instrumentationReport(self):
+        rec = instrumentation.recorder()
+        return rec.report()[:METRICS_ROWS] if rec is not None else []
+
     @Property(str, notify=dbLabelChanged)
     def dbLabel(self) -> str:
         return self._db_path.name if self._db_path else "(not set)"
@@ -190,11 +303,99 @@ class TaskMasterController(QObject):
     def backgroundPath(self) -> str:
         return _pick_background(self._settings.theme())
 
+    @Property(bool, notify=backupChanged)
+    def backupRunning(self) -> bool:
+        return self._backup_cancel is not None
+
+    @Property(float, notify=backupChanged)
+    def backupProgress(self) -> float:
+        return self._backup_progress
+
+    @Property(str, notify=backupScheduleChanged)
+    def backupDir(self) -> str:
+        return self._settings.backup_dir()
+
+    @Property(int, notify=backupScheduleChanged)
+    def backupIntervalHours(self) -> int:
+        return self._settings.backup_interval_hours()
+
+    @Property(int, notify=backupScheduleChanged)
+    def backupKeep(self) -> int:
+        return self._settings.backup_keep()
+
+    @Property(bool, notify=backupScheduleChanged)
+    def backupCompress(self) -> bool:
+        return self._settings.backup_compress()
+
     # ---------- internal ----------
 
     def _open_db(self) -> None:
-        self._conn = db.connect(self._db_path)
-        db.migrate(self._conn)
+        # The writer sets the journal mode and migrates; the reader and this
+        # thread's connection are read-only, so they wait for it (_db_opened).
+        # Writes submitted meanwhile queue behind the migration.
+        profile = db.CONNECTION_PROFILES[self._settings.connection_profile()]
+        self._set_status("Opening DB…")
+        self._tag_cache = TagCache()
+        self._writer.open(self._db_path, profile)
+        epoch = self._db_epoch
+        cancel = self._migration_cancel = threading.Event()
+        reported = [-1]
+
+        def progress(version: int, fraction: float) -> None:
+            # Runs on the writer thread after each backfill chunk.
+            if cancel.is_set():
+                raise RuntimeError("DB closed during upgrade")
+            percent = int(fraction * 100)
+            if percent != reported[0]:
+                reported[0] = percent
+                self._migrationProgressed.emit(epoch, version, fraction)
+
+        job_id = self._writer.submit(partial(db.migrate, progress=progress))
+        self._pending[job_id] = (
+            partial(self._db_opened, epoch, profile),
+            partial(self._db_open_failed, epoch),
+        )
+
+    @Slot(int, int, float)
+    @timed
+    def _on_migration_progress(self, epoch: int, version: int, fraction: float) -> None:
+        if epoch == self._db_epoch and not self._ready:
+            self._set_status(f"Upgrading DB to v{version}… {fraction:.0%}")
+
+    def _db_open_failed(self, epoch: int, message: str) -> None:
+        if epoch == self._db_epoch:
+            self._set_status(f"Failed to open DB: {message}")
+
+    def _db_opened(self, epoch: int, profile: db.ConnectionProfile, _version: int) -> None:
+        if epoch != self._db_epoch:
+            return  # closed or switched since
+        self._reader.open(self._db_path, profile)
+        self._backuper.open(self._db_path, profile)
+        self._conn = db.connect(self._db_path, profile=profile, read_only=True)
+        self._ready = True
+        startup.mark("db_open")
+        self.dbLabelChanged.emit()
+        if self._status_message == "Opening DB…" or self._status_message.startswith("Upgrading DB"):
+            self._set_status("")
+        self._check_due_timer()
+        self._refresh_visible()
+        self._backupTimer.start()
+        self._maybe_scheduled_backup()
+
+    def _close_db(self) -> None:
+        self._ready = False
+        self._db_epoch += 1
+        self._new_generation()
+        self._backupTimer.stop()
+        self._migration_cancel.set()
+        if self._backup_cancel is not None:
+            self._backup_cancel.set()
+        self._backuper.close()
+        self._reader.close()
+        self._writer.close()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
 
     def _require_conn(self) -> sqlite3.Connection:
         if self._conn is None:
@@ -206,77 +407,338 @@ class TaskMasterController(QObject):
             return None
         return db.db_info(self._conn, self._db_path)
 
+    def _update_metrics_timer(self) -> None:
+        if instrumentation.is_enabled() and self._view == "settings":
+            self._metricsTimer.start()
+        else:
+            self._metricsTimer.stop()
+
     def _set_status(self, msg: str) -> None:
         self._status_message = msg
         self.statusMessageChanged.emit()
 
+    # Queries and mutations run on the DB worker; small point reads for the
+    # detail pane stay on this thread's connection.
+
+    def _submit(
+        self,
+        fn: Callable[[sqlite3.Connection], Any],
+        on_done: Callable[[Any], None] | None = None,
+        *,
+        on_error: Callable[[str], None] | None = None,
+        write: bool = False,
+        generation: int | None = None,
+        worker: DbWorker | None = None,
+    ) -> None:
+        worker = worker or (self._writer if write else self._reader)
+        job_id = worker.submit(fn, write=write, generation=generation)
+        self._pending[job_id] = (on_done, on_error)
+
+    @Slot(int, object)
+    @timed
+    def _job_finished(self, job_id: int, result: object) -> None:
+        on_done, _on_error = self._pending.pop(job_id, (None, None))
+        if on_done is not None:
+            on_done(result)
+
+    @Slot(int, str)
+    @timed
+    def _job_failed(self, job_id: int, message: str) -> None:
+        _on_done, on_error = self._pending.pop(job_id, (None, None))
+        if on_error is not None:
+            on_error(message)
+        else:
+            self._set_status(message)
+
+    @Slot(int)
+    @timed
+    def _job_cancelled(self, job_id: int) -> None:
+        self._pending.pop(job_id, None)
+
+    def _write(
+        self,
+        fn: Callable[[sqlite3.Connection], Any],
+        *,
+        done: str,
+        failed: str,
+        views: Callable[[Any], tuple[str | None, ...]] = lambda _result: (),
+    ) -> None:
+        """Run a mutation; on success show ``done`` and invalidate ``views(result)``.
+
+        The transaction also persists any pending due promotion, since it is
+        writing anyway.
+        """
+        now_epoch = to_epoch_seconds(utc_now())
+        tag_cache = self._tag_cache
+
+        def job(conn: sqlite3.Connection) -> tuple[Any, int]:
+            try:
+                return fn(conn), update_due_from_waiting(conn, now_epoch=now_epoch)
+            except Exception:
+                tag_cache.clear()  # the transaction is rolled back
+                raise
+
+        def on_done(outcome: tuple[Any, int]) -> None:
+            result, promoted = outcome
+            self._set_status(done)
+            self._invalidate(*views(result), *(("due", "waiting") if promoted else ()))
+
+        self._submit(
+            job,
+            on_done,
+            on_error=lambda message: self._set_status(f"{failed}: {message}"),
+            write=True,
+        )
+
+    def _start_backup(self, dest: Path, *, compress: bool, rotate_keep: int | None = None) -> None:
+        if self._backup_cancel is not None:
+            self._set_status("A backup is already running")
+            return
+        if not self._ready:
+            self._set_status("Backup failed: DB is not open")
+            return
+        cancel = threading.Event()
+        reported = [-1]
+
+        def progress(fraction: float) -> None:
+            # Runs on the backup thread between page batches.
+            if cancel.is_set():
+                raise BackupCancelled("backup cancelled")
+            percent = int(fraction * 100)
+            if percent != reported[0]:
+                reported[0] = percent
+                self._backupProgressed.emit(fraction)
+
+        def job(conn: sqlite3.Connection) -> Path:
+            path = backup_to(conn, dest, compress=compress, progress=progress)
+            if rotate_keep is not None:
+                rotate(dest.parent, keep=rotate_keep)
+            return path
+
+        def on_done(path: Path) -> None:
+            self._end_backup()
+            self._set_status(f"Backup created: {path.name}")
+
+        def on_error(message: str) -> None:
+            self._end_backup()
+            self._set_status("Backup cancelled" if cancel.is_set() else f"Backup failed: {message}")
+
+        self._backup_cancel = cancel
+        self._backup_progress = 0.0
+        self.backupChanged.emit()
+        self._set_status("Backing up…")
+        self._submit(job, on_done, on_error=on_error, worker=self._backuper)
+
+    def _end_backup(self) -> None:
+        self._backup_cancel = None
+        self._backup_progress = 0.0
+        self.backupChanged.emit()
+
+    @Slot(float)
+    @timed
+    def _on_backup_progress(self, fraction: float) -> None:
+        if self._backup_cancel is not None:
+            self._backup_progress = fraction
+            self.backupChanged.emit()
+
+    def _maybe_scheduled_backup(self) -> None:
+        hours = self._settings.backup_interval_hours()
+        if not hours or not self._ready or self._backup_cancel is not None:
+            return
+        directory = Path(self._settings.backup_dir()).expanduser()
+        now = datetime.now()
+        backups = scheduled_backups(directory)
+        if backups and now - backups[-1][0] < timedelta(hours=hours):
+            return
+        self._start_backup(
+            scheduled_backup_path(directory, now),
+            compress=self._settings.backup_compress(),
+            rotate_keep=self._settings.backup_keep(),
+        )
+
+    def _new_generation(self) -> None:
+        # Results of older list queries are no longer wanted.
+        self._generation += 1
+        self._reader.cancel_before(self._generation)
+
     def _update_counts(self) -> None:
-        conn = self._require_conn()
-        self._due_count, self._waiting_count = due_waiting_counts(conn)
+        self._counts_dirty = False
+        now_epoch = to_epoch_seconds(utc_now())
+        self._submit(lambda conn: due_waiting_counts(conn, now_epoch=now_epoch), self._apply_counts)
+
+    def _apply_counts(self, counts: tuple[int, int]) -> None:
+        self._due_count, self._waiting_count = counts
         self.countsChanged.emit()
 
     def _tick_due_update(self) -> None:
-        conn = self._require_conn()
-        changed = update_due_from_waiting(conn, now_epoch=to_epoch_seconds(utc_now()))
-        if changed:
-            conn.commit()
-            self.refresh()
+        now_epoch = to_epoch_seconds(utc_now())
 
-    def _refresh_view(self, view: str) -> None:
-        conn = self._require_conn()
-        text, tags = parse_search_query(self._search_query)
-        q_like = f"%{text}%" if text else None
-        rows = list_tasks(conn, view=view, q_like=q_like, tags=tags)
+        def job(conn: sqlite3.Connection) -> tuple[int, int | None]:
+            return update_due_from_waiting(conn, now_epoch=now_epoch), next_due_epoch(conn)
+
+        def on_done(result: tuple[int, int | None]) -> None:
+            changed, next_epoch = result
+            if changed:
+                self._invalidate("due", "waiting")
+            else:
+                self._arm_due_timer(next_epoch)
+
+        self._submit(job, on_done, write=True)
 
+    def _check_due_timer(self) -> None:
+        # The set of waiting tasks changed, so the earliest deadline may have.
+        if not self._ready:
+            return
+        self._submit(next_due_epoch, self._arm_due_timer)
+
+    def _arm_due_timer(self, next_epoch: int | None) -> None:
+        if next_epoch is None:
+            self._dueTimer.stop()
+            return
+        delay_ms = math.ceil((next_epoch - utc_now().timestamp()) * 1000)
+        self._dueTimer.start(min(max(delay_ms, 0), DUE_TIMER_MAX_MS))
+
+    def _invalidate(self, *views: str | None) -> None:
+        """Mark views stale, refresh the visible one now and the rest later."""
+        self._dirty_views.update(v for v in views if v in LIST_VIEWS)
+        if "due" in views or "waiting" in views:
+            self._counts_dirty = True
+        if "waiting" in views:
+            self._check_due_timer()
+        self._refresh_visible()
+
+    def _refresh_visible(self) -> None:
+        if not self._ready:
+            return
+        if self._view in self._dirty_views:
+            self._dirty_views.discard(self._view)
+            self._refresh_view(self._view)
+        if self._counts_dirty:
+            self._update_counts()
+        if self._dirty_views:
+            self._idleTimer.start(IDLE_REFRESH_MS)
+
+    def _refresh_idle(self) -> None:
+        # One hidden view per idle tick keeps each tick short.
+        if not self._ready:
+            return
+        for view in LIST_VIEWS:
+            if view in self._dirty_views:
+                self._dirty_views.discard(view)
+                self._refresh_view(view)
+                break
+        if self._dirty_views:
+            self._idleTimer.start(IDLE_REFRESH_MS)
+
+    def _apply_search(self) -> None:
+        self._new_generation()
+        self._invalidate(*LIST_VIEWS)
+
+    def _model_for(self, view: str) -> TaskTableModel:
         if view == "due":
-            self._dueModel.setRows(rows)
-        elif view == "waiting":
-            self._waitingModel.setRows(rows)
-        elif view == "archived":
-            self._archivedModel.setRows(rows)
+            return self._dueModel
+        if view == "waiting":
+            return self._waitingModel
+        return self._archivedModel
+
+    def _refresh_view(self, view: str) -> None:
+        # Re-read as many rows as are loaded now (at least one page) so that a
+        # refresh does not collapse a view the user has scrolled into.
+        limit = max(LIST_PAGE_SIZE, self._model_for(view).rowCount())
+        self._submit(
+            self._view_query(view, limit=limit + 1),
+            partial(self._apply_rows, view, self._generation, limit),
+            generation=self._generation,
+        )
+
+    def _apply_rows(self, view: str, generation: int, limit: int, rows: list[TaskRow]) -> None:
+        if generation != self._generation:
+            return
+        self._model_for(view).setRows(rows[:limit], has_more=len(rows) > limit)
+        if view == self._view:
+            startup.mark("first_rows")
+
+    def _load_page(self, view: str, last: TaskRow) -> None:
+        model = self._model_for(view)
+        generation = self._generation
+
+        def on_done(rows: list[TaskRow]) -> None:
+            if generation == self._generation:
+                model.appendRows(rows[:LIST_PAGE_SIZE], has_more=len(rows) > LIST_PAGE_SIZE)
+
+        def on_error(message: str) -> None:
+            model.appendRows([], has_more=False)
+            self._set_status(f"Failed to load tasks: {message}")
+
+        self._submit(
+            self._view_query(view, limit=LIST_PAGE_SIZE + 1, after=task_cursor(view, last)),
+            on_done,
+            on_error=on_error,
+            generation=generation,
+        )
+
+    def _view_query(
+        self, view: str, *, limit: int, after: tuple | None = None
+    ) -> Callable[[sqlite3.Connection], list[TaskRow]]:
+        text, tags = parse_search_query(self._search_query)
+        now_epoch = to_epoch_seconds(utc_now())
+        return lambda conn: list_tasks(
+            conn, view=view, text=text or None, tags=tags, limit=limit, after=after, now_epoch=now_epoch
+        )
 
     # ---------- slots (navigation) ----------
 
     @Slot(str)
+    @timed
     def setView(self, view: str) -> None:
         if view not in ("due", "waiting", "archived", "settings"):
             return
         self._view = view
         self.viewChanged.emit()
-        if view in ("due", "waiting", "archived"):
-            self.refresh()
+        self._update_metrics_timer()
+        self._refresh_visible()
 
     # ---------- slots (search/refresh) ----------
 
     @Slot(str)
+    @timed
     def setSearchQuery(self, query: str) -> None:
         self._search_query = query
         self._searchTimer.start(SEARCH_DEBOUNCE_MS)
 
     @Slot()
+    @timed
     def refresh(self) -> None:
-        conn = self._require_conn()
-        update_due_from_waiting(conn, now_epoch=to_epoch_seconds(utc_now()))
-        conn.commit()
+        # Read-only: views compute due membership against the current time and
+        # the due timer persists it (see _tick_due_update).
+        self._invalidate(*LIST_VIEWS)
 
-        for v in ("due", "waiting", "archived"):
-            self._refresh_view(v)
-
-        self._update_counts()
+    @Slot()
+    @timed
+    def shutdown(self) -> None:
+        self._dueTimer.stop()
+        self._idleTimer.stop()
+        self._searchTimer.stop()
+        self._close_db()
+        self._backuper.stop()
+        self._reader.stop()
+        self._writer.stop()
 
     # ---------- slots (details) ----------
 
     @Slot(str, result="QVariantMap")
-    def taskDetail(self, task_id: str):
+    @timed
+    def taskDetail(self, public_id: str):
         conn = self._require_conn()
-        t = get_task(conn, task_id=task_id)
+        task_id = task_id_for(conn, public_id=public_id)
+        t = get_task(conn, task_id=task_id) if task_id is not None else None
         if t is None:
             return {}
 
         tags_list = list_task_tags(conn, task_id=task_id)
 
         return {
-            "id": t.id,
+            "id": t.public_id.hex(),
             "title": t.title,
             "note": t.note,
             "status": t.status,
@@ -292,14 +754,18 @@ class TaskMasterController(QObject):
         }
 
     @Slot(str, result="QStringList")
-    def taskTags(self, task_id: str):
+    @timed
+    def taskTags(self, public_id: str):
         conn = self._require_conn()
-        return list_task_tags(conn, task_id=task_id)
+        task_id = task_id_for(conn, public_id=public_id)
+        return list_task_tags(conn, task_id=task_id) if task_id is not None else []
 
     @Slot(str, result="QVariantList")
-    def taskHistory(self, task_id: str):
+    @timed
+    def taskHistory(self, public_id: str):
         conn = self._require_conn()
-        hist = completion_history(conn, task_id=task_id)
+        task_id = task_id_for(conn, public_id=public_id)
+        hist = completion_history(conn, task_id=task_id) if task_id is not None else []
         return [
             {"completedAt": int(ep), "grade": str(g)}
             for ep, g in hist
@@ -308,39 +774,41 @@ class TaskMasterController(QObject):
     # ---------- slots (CRUD) ----------
 
     @Slot(str, str)
+    @timed
     def newTask(self, title: str, note: str) -> None:
         title = (title or "").strip()
         if not title:
             self._set_status("Title is required")
             return
-        conn = self._require_conn()
-        try:
-            with conn:
-                create_task(conn, title=title, note=note or "", now=utc_now())
-            self._set_status("Task created")
-            self.refresh()
-        except Exception as e:
-            self._set_status(f"Failed to create task: {e}")
+        now = utc_now()
+        self._write(
+            lambda conn: create_task(conn, title=title, note=note or "", now=now),
+            done="Task created",
+            failed="Failed to create task",
+            views=lambda _task_id: ("due",),
+        )
 
     @Slot(str, str, str)
-    def editTask(self, task_id: str, title: str, note: str) -> None:
+    @timed
+    def editTask(self, public_id: str, title: str, note: str) -> None:
         title = (title or "").strip()
         if not title:
             self._set_status("Title is required")
             return
-        conn = self._require_conn()
-        try:
-            with conn:
-                update_task(conn, task_id=task_id, title=title, note=note or "", now=utc_now())
-            self._set_status("Task updated")
-            self.refresh()
-        except Exception as e:
-            self._set_status(f"Failed to update task: {e}")
+        now = utc_now()
+
+        def job(conn: sqlite3.Connection) -> str | None:
+            task_id = _task_id(conn, public_id)
+            update_task(conn, task_id=task_id, title=title, note=note or "", now=now)
+            return _task_view(conn, task_id)
+
+        self._write(job, done="Task updated", failed="Failed to update task", views=lambda view: (view,))
 
     # ---------- slots (complete/archive/restore/purge) ----------
 
     @Slot(str, str)
-    def completeTask(self, task_id: str, grade: str) -> None:
+    @timed
+    def completeTask(self, public_id: str, grade: str) -> None:
         if self._view == "waiting":
             self._set_status("Complete is disabled in Waiting")
             return
@@ -348,108 +816,111 @@ class TaskMasterController(QObject):
             self._set_status("Invalid grade")
             return
 
-        conn = self._require_conn()
         now = utc_now()
-        now_epoch = to_epoch_seconds(now)
-
-        try:
-            with conn:
-                # Ensure min gap for completed_at vs last event
-                history = completion_history(conn, task_id=task_id)
-                completed_at = now
-                if history:
-                    last_epoch, _last_grade = history[-1]
-                    last_dt = from_epoch_seconds(last_epoch)
-                    completed_at = ensure_min_gap(completed_at, last_dt, min_seconds=60)
-                completed_at = ceil_to_minute(completed_at)
-
-                add_completion_event(conn, task_id=task_id, completed_at=completed_at, grade=grade)
-
-                history2 = completion_history(conn, task_id=task_id)
-                history_times = [from_epoch_seconds(ep) for ep, _g in history2]
-
-                p_target = float(GRADE_P_TARGET[grade])
-                next_dt = find_next_review(
-                    history_times,
-                    completed_at,
-                    d=0.5,
-                    tau=0.0,
-                    s=0.4,
-                    p_target=p_target,
-                    horizon_days=self.horizonDays,
-                )
-
-                set_epoch = to_epoch_seconds(next_dt)
-                conn.execute(
-                    "UPDATE tasks SET status='waiting', next_review_at=:n, updated_at=:u WHERE id=:id",
-                    {"id": task_id, "n": set_epoch, "u": now_epoch},
-                )
-
-            self._set_status(f"Completed ({grade})")
-            self.refresh()
-        except Exception as e:
-            self._set_status(f"Failed to complete: {e}")
+        horizon_days = self.horizonDays
+        approximate = self.approxActivation
+        self._write(
+            lambda conn: complete_task(
+                conn,
+                task_id=_task_id(conn, public_id),
+                grade=grade,
+                now=now,
+                horizon_days=horizon_days,
+                approximate=approximate,
+            ),
+            done=f"Completed ({grade})",
+            failed="Failed to complete",
+            views=lambda _next_dt: ("due", "waiting"),
+        )
 
     @Slot(str)
-    def archiveTask(self, task_id: str) -> None:
-        conn = self._require_conn()
-        try:
-            with conn:
-                archive_task(conn, task_id=task_id, now_epoch=to_epoch_seconds(utc_now()))
-            self._set_status("Archived")
-            self.refresh()
-        except Exception as e:
-            self._set_status(f"Failed to archive: {e}")
+    @timed
+    def archiveTask(self, public_id: str) -> None:
+        now_epoch = to_epoch_seconds(utc_now())
+
+        def job(conn: sqlite3.Connection) -> str | None:
+            task_id = _task_id(conn, public_id)
+            source = _task_view(conn, task_id)
+            archive_task(conn, task_id=task_id, now_epoch=now_epoch)
+            return source
+
+        self._write(job, done="Archived", failed="Failed to archive", views=lambda source: (source, "archived"))
 
     @Slot(str)
-    def restoreTask(self, task_id: str) -> None:
-        conn = self._require_conn()
-        try:
-            with conn:
-                restore_task(conn, task_id=task_id, now_epoch=to_epoch_seconds(utc_now()))
-            self._set_status("Restored")
-            self.refresh()
-        except Exception as e:
-            self._set_status(f"Failed to restore: {e}")
+    @timed
+    def restoreTask(self, public_id: str) -> None:
+        now_epoch = to_epoch_seconds(utc_now())
+
+        def job(conn: sqlite3.Connection) -> str | None:
+            task_id = _task_id(conn, public_id)
+            restore_task(conn, task_id=task_id, now_epoch=now_epoch)
+            return _task_view(conn, task_id)
+
+        self._write(job, done="Restored", failed="Failed to restore", views=lambda view: ("archived", view))
 
     @Slot(str)
-    def purgeTask(self, task_id: str) -> None:
-        conn = self._require_conn()
-        try:
-            with conn:
-                purge_task(conn, task_id=task_id, now_epoch=to_epoch_seconds(utc_now()))
-            self._set_status("Purged")
-            self.refresh()
-        except Exception as e:
-            self._set_status(f"Failed to purge: {e}")
+    @timed
+    def purgeTask(self, public_id: str) -> None:
+        now_epoch = to_epoch_seconds(utc_now())
+        self._write(
+            lambda conn: purge_task(conn, task_id=_task_id(conn, public_id), now_epoch=now_epoch),
+            done="Purged",
+            failed="Failed to purge",
+            views=lambda _result: ("archived",),
+        )
 
     # ---------- tags ----------
 
     @Slot(str, str)
-    def addTag(self, task_id: str, tag: str) -> None:
-        conn = self._require_conn()
-        try:
-            with conn:
-                add_tag_to_task(conn, task_id=task_id, tag_name=tag, now_epoch=to_epoch_seconds(utc_now()))
-            self._set_status("Tag added")
-            self.refresh()
-        except Exception as e:
-            self._set_status(f"Failed to add tag: {e}")
+    @timed
+    def addTag(self, public_id: str, tag: str) -> None:
+        now_epoch = to_epoch_seconds(utc_now())
+
+        tag_cache = self._tag_cache
+
+        def job(conn: sqlite3.Connection) -> str | None:
+            task_id = _task_id(conn, public_id)
+            add_tag_to_task(conn, task_id=task_id, tag_name=tag, now_epoch=now_epoch, cache=tag_cache)
+            return _task_view(conn, task_id)
+
+        self._write(job, done="Tag added", failed="Failed to add tag", views=lambda view: (view,))
 
     @Slot(str, str)
-    def removeTag(self, task_id: str, tag: str) -> None:
-        conn = self._require_conn()
-        try:
-            with conn:
-                remove_tag_from_task(conn, task_id=task_id, tag_name=tag)
-            self._set_status("Tag removed")
-            self.refresh()
-        except Exception as e:
-            self._set_status(f"Failed to remove tag: {e}")
+    @timed
+    def removeTag(self, public_id: str, tag: str) -> None:
+        tag_cache = self._tag_cache
+
+        def job(conn: sqlite3.Connection) -> str | None:
+            task_id = _task_id(conn, public_id)
+            remove_tag_from_task(conn, task_id=task_id, tag_name=tag, cache=tag_cache)
+            return _task_view(conn, task_id)
+
+        self._write(job, done="Tag removed", failed="Failed to remove tag", views=lambda view: (view,))
+
+    @Slot("QStringList", "QStringList", "QStringList")
+    @timed
+    def tagTasks(self, public_ids: list[str], add: list[str], remove: list[str]) -> None:
+        """Remove then add tags on many tasks in one transaction; nothing
+        changes if a task would exceed the tag limit."""
+        keys = [public_id_from_text(p) for p in public_ids]
+        add, remove = list(add), list(remove)
+        now_epoch = to_epoch_seconds(utc_now())
+        tag_cache = self._tag_cache
+
+        def job(conn: sqlite3.Connection) -> tuple[int, int]:
+            task_ids = list(task_ids_for(conn, keys).values())
+            removed = remove_tags_from_tasks(conn, task_ids=task_ids, tag_names=remove, cache=tag_cache)
+            added = add_tags_to_tasks(
+                conn, task_ids=task_ids, tag_names=add, now_epoch=now_epoch, cache=tag_cache
+            )
+            return added, removed
+
+        self._write(job, done="Tags updated", failed="Failed to update tags", views=lambda _counts: LIST_VIEWS)
 
     # ---------- clipboard ----------
 
     @Slot(str)
+    @timed
     def copyText(self, text: str) -> None:
         cb = QGuiApplication.clipboard()
         cb.setText(text or "")
@@ -458,12 +929,21 @@ class TaskMasterController(QObject):
     # ---------- settings ----------
 
     @Slot(int)
+    @timed
     def setHorizonDays(self, days: int) -> None:
         self._settings.set_horizon_days(days)
         self.horizonDaysChanged.emit()
         self._set_status("Horizon days updated (applies to future completes)")
 
+    @Slot(bool)
+    @timed
+    def setApproxActivation(self, enabled: bool) -> None:
+        self._settings.set_approx_activation(enabled)
+        self.approxActivationChanged.emit()
+        self._set_status("Approximate activation " + ("enabled" if enabled else "disabled"))
+
     @Slot(str)
+    @timed
     def setTheme(self, theme: str) -> None:
         self._settings.set_theme(theme)
         self.themeChanged.emit()
@@ -471,79 +951,105 @@ class TaskMasterController(QObject):
         self._set_status("Theme updated")
 
     @Slot(str)
+    @timed
     def setDbPath(self, path: str) -> None:
         p = Path(path).expanduser()
         self._settings.set_db_path(str(p))
         self._db_path = p
 
-        if self._conn is not None:
-            self._conn.close()
-            self._conn = None
-
+        self._close_db()
         self._open_db()
         self.dbLabelChanged.emit()
         self._set_status("DB switched")
-        self.refresh()
+        self._invalidate(*LIST_VIEWS)
+
+    @Slot(bool)
+    @timed
+    def setInstrumentationEnabled(self, enabled: bool) -> None:
+        self._settings.set_instrumentation(enabled)
+        if enabled == instrumentation.is_enabled():
+            return
+        if enabled:
+            instrumentation.enable(dump_path=default_metrics_path())
+        else:
+            instrumentation.disable()
+        # Connections only pick up (or drop) SQL tracing when reopened.
+        self._close_db()
+        self._open_db()
+        self._invalidate(*LIST_VIEWS)
+        self._update_metrics_timer()
+        self.instrumentationChanged.emit()
+        self._set_status("Instrumentation " + ("enabled" if enabled else "disabled"))
+
+    @Slot()
+    @timed
+    def resetInstrumentation(self) -> None:
+        rec = instrumentation.recorder()
+        if rec is not None:
+            rec.reset()
+        self.instrumentationChanged.emit()
 
     @Slot(str)
+    @timed
+    def setConnectionProfile(self, name: str) -> None:
+        if name not in CONNECTION_PROFILE_NAMES:
+            return
+        self._settings.set_connection_profile(name)
+        self._close_db()
+        self._open_db()
+        self.connectionProfileChanged.emit()
+        self._set_status(f"Connection profile: {name}")
+        self._invalidate(*LIST_VIEWS)
+
+    @Slot(str)
+    @timed
     def backupDbTo(self, dest_path: str) -> None:
+        """Back up in the background; a path ending in .gz is compressed."""
         dest = Path(dest_path).expanduser()
-        try:
-            dest.parent.mkdir(parents=True, exist_ok=True)
-            if self._conn is not None:
-                self._conn.commit()
-            shutil.copy2(self._db_path, dest)
-            self._set_status(f"Backup created: {dest.name}")
-        except Exception as e:
-            self._set_status(f"Backup failed: {e}")
+        self._start_backup(dest, compress=dest.suffix == ".gz")
 
     @Slot()
+    @timed
+    def cancelBackup(self) -> None:
+        if self._backup_cancel is not None:
+            self._backup_cancel.set()
+
+    @Slot(str, int, int, bool)
+    @timed
+    def setBackupSchedule(self, directory: str, interval_hours: int, keep: int, compress: bool) -> None:
+        self._settings.set_backup_schedule(
+            directory=directory.strip(), interval_hours=interval_hours, keep=keep, compress=compress
+        )
+        self.backupScheduleChanged.emit()
+        hours = self._settings.backup_interval_hours()
+        self._set_status(f"Automatic backups every {hours} h" if hours else "Automatic backups off")
+        self._maybe_scheduled_backup()
+
+    @Slot()
+    @timed
+    def rebuildSearchIndex(self) -> None:
+        self._write(
+            rebuild_search_index,
+            done="Search index rebuilt",
+            failed="Search index rebuild failed",
+            views=lambda _result: LIST_VIEWS,
+        )
+
+    @Slot()
+    @timed
     def recalculateAll(self) -> None:
-        conn = self._require_conn()
         now = utc_now()
-        now_epoch = to_epoch_seconds(now)
-
-        try:
-            with conn:
-                rows = conn.execute(
-                    """
-                    SELECT id FROM tasks
-                    WHERE deleted_at IS NULL AND purged_at IS NULL AND status IN ('due','waiting')
-                    """
-                ).fetchall()
-
-                for r in rows:
-                    task_id = r["id"]
-                    hist = completion_history(conn, task_id=task_id)
-                    if not hist:
-                        conn.execute(
-                            "UPDATE tasks SET status='due', next_review_at=NULL, updated_at=:u WHERE id=:id",
-                            {"id": task_id, "u": now_epoch},
-                        )
-                        continue
-
-                    history_times = [from_epoch_seconds(ep) for ep, _g in hist]
-                    last_grade = hist[-1][1]
-                    p_target = float(GRADE_P_TARGET.get(last_grade, 0.90))
-                    last_completed_dt = history_times[-1]
-
-                    next_dt = find_next_review(
-                        history_times,
-                        last_completed_dt,
-                        d=0.5,
-                        tau=0.0,
-                        s=0.4,
-                        p_target=p_target,
-                        horizon_days=self.horizonDays,
-                    )
-                    conn.execute(
-                        "UPDATE tasks SET next_review_at=:n, status='waiting', updated_at=:u WHERE id=:id",
-                        {"id": task_id, "n": to_epoch_seconds(next_dt), "u": now_epoch},
-                    )
-
-                update_due_from_waiting(conn, now_epoch=now_epoch)
-
-            self._set_status("Recalculated all tasks")
-            self.refresh()
-        except Exception as e:
-            self._set_status(f"Recalculate failed: {e}")
+        horizon_days = self.horizonDays
+        approximate = self.approxActivation
+        self._set_status("Recalculating…")
+        self._write(
+            lambda conn: recalculate_all(
+                conn,
+                now=now,
+                horizon_days=horizon_days,
+                approximate=approximate,
+            ),
+            done="Recalculated all tasks",
+            failed="Recalculate failed",
+            views=lambda _count: ("due", "waiting"),
+        )
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+import json
 import sqlite3
+import sys
+import time
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Callable, Iterator
 
-from taskmaster.constants import SCHEMA_VERSION
+from taskmaster.constants import DEFAULT_CONNECTION_PROFILE, MIGRATION_CHUNK_ROWS, SCHEMA_VERSION
 
 
 @dataclass(frozen=True)
@@ -13,11 +18,73 @@ class DbInfo:
     schema_version: int | None
 
 
-def connect(db_path: Path) -> sqlite3.Connection:
-    db_path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(db_path))
+@dataclass(frozen=True)
+class ConnectionProfile:
+    journal_mode: str
+    synchronous: str
+    cache_size_kib: int
+    mmap_size: int
+    temp_store: str
+    busy_timeout_ms: int
+
+
+# "wal": readers and the writer no longer block each other; NORMAL sync is
+# durable against app crashes, a power loss may drop the last commits.
+# "rollback": the pre-WAL behaviour (SQLite defaults).
+CONNECTION_PROFILES = {
+    "wal": ConnectionProfile(
+        journal_mode="wal",
+        synchronous="normal",
+        cache_size_kib=32 * 1024,
+        mmap_size=256 * 1024 * 1024,
+        temp_store="memory",
+        busy_timeout_ms=5000,
+    ),
+    "rollback": ConnectionProfile(
+        journal_mode="delete",
+        synchronous="full",
+        cache_size_kib=2000,
+        mmap_size=0,
+        temp_store="default",
+        busy_timeout_ms=5000,
+    ),
+}
+
+
+def connect(
+    db_path: Path,
+    *,
+    profile: ConnectionProfile = CONNECTION_PROFILES[DEFAULT_CONNECTION_PROFILE],
+    read_only: bool = False,
+) -> sqlite3.Connection:
+    """Open a connection configured by ``profile``.
+
+    A read-only connection never takes the write lock; use it for list and
+    count queries next to the single writer. It can only set the
+    per-connection PRAGMAs, so the DB must already exist and the journal mode
+    comes from the writer.
+    """
+    timeout = profile.busy_timeout_ms / 1000
+    # Instrumentation can only be on once something has imported it (the
+    # app does, the CLI never), so the CLI does not pay for the import.
+    instrumentation = sys.modules.get("taskmaster.instrumentation")
+    traced = instrumentation is not None and instrumentation.is_enabled()
+    factory = instrumentation.TracedConnection if traced else sqlite3.Connection
+    if read_only:
+        conn = sqlite3.connect(
+            f"{db_path.resolve().as_uri()}?mode=ro", uri=True, timeout=timeout, factory=factory
+        )
+    else:
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(db_path), timeout=timeout, factory=factory)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON;")
+    if not read_only:
+        conn.execute(f"PRAGMA journal_mode = {profile.journal_mode};")
+    conn.execute(f"PRAGMA synchronous = {profile.synchronous};")
+    conn.execute(f"PRAGMA cache_size = {-profile.cache_size_kib};")
+    conn.execute(f"PRAGMA mmap_size = {profile.mmap_size};")
+    conn.execute(f"PRAGMA temp_store = {profile.temp_store};")
     return conn
 
 
@@ -34,25 +101,250 @@ def get_schema_version(conn: sqlite3.Connection) -> int | None:
     return int(row2["version"])
 
 
-def migrate(conn: sqlite3.Connection) -> int:
+@dataclass(frozen=True)
+class Backfill:
+    """Data work of a migration step, run over ``table`` in rowid order.
+
+    ``apply(conn, first_rowid, last_rowid)`` updates the rows in that
+    inclusive range; each call gets a transaction of its own.
+    """
+
+    table: str
+    apply: Callable[[sqlite3.Connection, int, int], None]
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int  # schema version after the step
+    description: str
+    schema: Callable[[sqlite3.Connection], None]
+    backfill: Backfill | None = None
+    # DDL that needs the backfilled rows; runs with the version bump.
+    finish: Callable[[sqlite3.Connection], None] | None = None
+
+
+@dataclass(frozen=True)
+class StepTiming:
+    version: int
+    description: str
+    rows: int
+    chunks: int
+    schema_ms: float
+    backfill_ms: float
+
+
+def migrate(
+    conn: sqlite3.Connection,
+    *,
+    target: int = SCHEMA_VERSION,
+    chunk_rows: int = MIGRATION_CHUNK_ROWS,
+    progress: Callable[[int, float], None] | None = None,
+    on_step: Callable[[StepTiming], None] | None = None,
+) -> int:
+    """Bring the DB up to ``target`` one MIGRATIONS step at a time; returns it.
+
+    A step commits its DDL, then its backfill in chunks of ``chunk_rows``,
+    and only then the new version. A step cut short (a crash, or
+    ``progress`` raising) resumes at its next chunk on the next call.
+    ``progress(version, fraction)`` runs after each chunk; ``on_step`` gets
+    the timing of each finished step.
+    """
     current = get_schema_version(conn)
 
     if current is None:
         _create_v1(conn)
         current = 1
 
-    if current != SCHEMA_VERSION:
-        raise RuntimeError(
-            f"Unsupported schema version: {current} (expected {SCHEMA_VERSION})"
-        )
+    if current > SCHEMA_VERSION:
+        raise RuntimeError(f"Unsupported schema version: {current} (newest known is {SCHEMA_VERSION})")
+
+    for step in MIGRATIONS:
+        if current < step.version <= target:
+            timing = _run_step(conn, step, chunk_rows=chunk_rows, progress=progress)
+            current = step.version
+            if on_step is not None:
+                on_step(timing)
 
+    if current < target:
+        raise RuntimeError(f"No migration from schema version {current} to {target}")
     return current
 
 
+def _run_step(
+    conn: sqlite3.Connection,
+    step: Migration,
+    *,
+    chunk_rows: int,
+    progress: Callable[[int, float], None] | None,
+) -> StepTiming:
+    start = time.perf_counter()
+    with conn:
+        conn.execute("BEGIN")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS migration_state (
+                version    INTEGER PRIMARY KEY,
+                last_rowid INTEGER NOT NULL
+            )
+            """
+        )
+        row = conn.execute(
+            "SELECT last_rowid FROM migration_state WHERE version = ?", (step.version,)
+        ).fetchone()
+        if row is not None:
+            last = int(row[0])  # resuming an interrupted backfill
+        else:
+            last = 0
+            step.schema(conn)
+            if step.backfill is None:
+                _finish_step(conn, step)
+            else:
+                conn.execute("INSERT INTO migration_state(version, last_rowid) VALUES (?, 0)", (step.version,))
+    schema_ms = (time.perf_counter() - start) * 1000.0
+
+    start = time.perf_counter()
+    rows = chunks = 0
+    if step.backfill is not None:
+        table = step.backfill.table
+        total = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        done = conn.execute(f"SELECT COUNT(*) FROM {table} WHERE rowid <= ?", (last,)).fetchone()[0]
+        while True:
+            with conn:
+                conn.execute("BEGIN")
+                hi, n = conn.execute(
+                    f"""
+                    SELECT MAX(rowid), COUNT(*)
+                    FROM (SELECT rowid FROM {table} WHERE rowid > ? ORDER BY rowid LIMIT ?)
+                    """,
+                    (last, chunk_rows),
+                ).fetchone()
+                if hi is None:
+                    conn.execute("DELETE FROM migration_state WHERE version = ?", (step.version,))
+                    _finish_step(conn, step)
+                    break
+                step.backfill.apply(conn, last + 1, hi)
+                conn.execute(
+                    "UPDATE migration_state SET last_rowid = ? WHERE version = ?", (hi, step.version)
+                )
+            last = hi
+            rows += n
+            chunks += 1
+            done += n
+            if progress is not None:
+                progress(step.version, done / total if total else 1.0)
+
+    return StepTiming(
+        version=step.version,
+        description=step.description,
+        rows=rows,
+        chunks=chunks,
+        schema_ms=schema_ms,
+        backfill_ms=(time.perf_counter() - start) * 1000.0,
+    )
+
+
+def _finish_step(conn: sqlite3.Connection, step: Migration) -> None:
+    if step.finish is not None:
+        step.finish(conn)
+    _write_schema_version(conn, step.version)
+
+
+def dry_run(
+    db_path: Path,
+    *,
+    chunk_rows: int = MIGRATION_CHUNK_ROWS,
+    progress: Callable[[int, float], None] | None = None,
+) -> list[StepTiming]:
+    """Migrate a temporary copy of ``db_path`` and return the step timings.
+
+    The DB itself is only read.
+    """
+    import tempfile
+
+    timings: list[StepTiming] = []
+    with tempfile.TemporaryDirectory(prefix="taskmaster-migrate-") as tmp:
+        copy = Path(tmp) / db_path.name
+        source = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True)
+        target = sqlite3.connect(str(copy))
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+        conn = connect(copy)
+        try:
+            migrate(conn, chunk_rows=chunk_rows, progress=progress, on_step=timings.append)
+        finally:
+            conn.close()
+    return timings
+
+
 def db_info(conn: sqlite3.Connection, db_path: Path) -> DbInfo:
     return DbInfo(path=db_path, schema_version=get_schema_version(conn))
 
 
+@contextmanager
+def read_snapshot(conn: sqlite3.Connection) -> Iterator[None]:
+    """Run the reads in the block in one read transaction, so they all see
+    the same state of the DB.
+
+    Refuses a connection with a transaction already open: its uncommitted
+    writes would be read, and ending the snapshot would end them too.
+    """
+    if conn.in_transaction:
+        raise RuntimeError("read_snapshot needs a connection without an open transaction; commit first")
+    conn.execute("BEGIN")
+    try:
+        yield
+    finally:
+        # Only reads ran since our BEGIN; this just ends the snapshot.
+        if conn.in_transaction:
+            conn.rollback()
+
+
+@contextmanager
+def bulk_load(conn: sqlite3.Connection) -> Iterator[None]:
+    """Insert many rows without the per-row search index and list stats triggers.
+
+    Use inside a transaction. The triggers are dropped on entry; on exit the
+    inserted tasks are indexed and the stats of the tasks that got events or
+    tags are recomputed in bulk, then the triggers are recreated. A rollback
+    restores them too (DDL is transactional). Only for inserts: updates and
+    deletes made in the block are not caught up.
+    """
+    if not conn.in_transaction:
+        raise RuntimeError("bulk_load needs an open transaction")
+    last_task, last_event, last_map = conn.execute(
+        """
+        SELECT (SELECT COALESCE(MAX(rowid), 0) FROM tasks),
+               (SELECT COALESCE(MAX(rowid), 0) FROM completion_events),
+               (SELECT COALESCE(MAX(rowid), 0) FROM task_tag_map)
+        """
+    ).fetchone()
+    for name in _BULK_LOAD_TRIGGERS:
+        conn.execute(f"DROP TRIGGER {name}")
+    yield
+    conn.execute(
+        "INSERT INTO tasks_fts(rowid, title, note) SELECT rowid, title, note FROM tasks WHERE rowid > ?",
+        (last_task,),
+    )
+    task_ids = [
+        row[0]
+        for row in conn.execute(
+            """
+            SELECT task_id FROM completion_events WHERE rowid > ?
+            UNION
+            SELECT task_id FROM task_tag_map WHERE rowid > ?
+            """,
+            (last_event, last_map),
+        )
+    ]
+    if task_ids:
+        refresh_task_stats(conn, task_ids=task_ids)
+    for statement in _BULK_LOAD_TRIGGERS.values():
+        conn.execute(statement)
+
+
 def _create_v1(conn: sqlite3.Connection) -> None:
     conn.executescript(
         """
@@ -117,6 +409,667 @@ def _create_v1(conn: sqlite3.Connection) -> None:
         """
     )
 
-    conn.execute("DELETE FROM schema_version")
-    conn.execute("INSERT INTO schema_version(version) VALUES (?)", (SCHEMA_VERSION,))
+    _write_schema_version(conn, 1)
     conn.commit()
+
+
+def _write_schema_version(conn: sqlite3.Connection, version: int) -> None:
+    conn.execute("DELETE FROM schema_version")
+    conn.execute("INSERT INTO schema_version(version) VALUES (?)", (version,))
+
+
+def _upgrade_v1_to_v2(conn: sqlite3.Connection) -> None:
+    # Compact activation state (see scheduler.ActivationState), maintained by
+    # repository.add_completion_event.
+    conn.execute("ALTER TABLE tasks ADD COLUMN act_recent TEXT NOT NULL DEFAULT ''")
+    conn.execute("ALTER TABLE tasks ADD COLUMN act_tail_count INTEGER NOT NULL DEFAULT 0")
+    conn.execute("ALTER TABLE tasks ADD COLUMN act_first_at INTEGER")
+    conn.execute("ALTER TABLE tasks ADD COLUMN last_grade TEXT")
+
+
+def _backfill_v2(conn: sqlite3.Connection, first_rowid: int, last_rowid: int) -> None:
+    # What repository.rebuild_activation_state did at v2, frozen here so
+    # replaying the step never runs code written for a later schema; the
+    # same goes for the other backfills. 3 was ACTIVATION_RECENT_EVENTS.
+    conn.execute(
+        """
+        UPDATE tasks
+        SET act_recent = COALESCE((
+                SELECT GROUP_CONCAT(completed_at, ',')
+                FROM (
+                    SELECT ce.completed_at
+                    FROM completion_events ce
+                    WHERE ce.task_id = tasks.id
+                    ORDER BY ce.completed_at DESC
+                    LIMIT 3
+                )
+            ), ''),
+            act_tail_count = MAX(
+                (SELECT COUNT(*) FROM completion_events ce WHERE ce.task_id = tasks.id) - 3,
+                0
+            ),
+            act_first_at = (
+                SELECT MIN(ce.completed_at) FROM completion_events ce WHERE ce.task_id = tasks.id
+            ),
+            last_grade = (
+                SELECT ce.grade
+                FROM completion_events ce
+                WHERE ce.task_id = tasks.id
+                ORDER BY ce.completed_at DESC
+                LIMIT 1
+            )
+        WHERE rowid BETWEEN ? AND ?
+        """,
+        (first_rowid, last_rowid),
+    )
+
+
+def _upgrade_v2_to_v3(conn: sqlite3.Connection) -> None:
+    # Denormalized list stats, kept current by triggers so list queries never
+    # aggregate completion_events or the tag map per row.
+    conn.execute("ALTER TABLE tasks ADD COLUMN last_completed_at INTEGER")
+    conn.execute("ALTER TABLE tasks ADD COLUMN review_count INTEGER NOT NULL DEFAULT 0")
+    conn.execute("ALTER TABLE tasks ADD COLUMN tags_text TEXT NOT NULL DEFAULT ''")
+
+    for statement in _TASK_STATS_TRIGGERS:
+        conn.execute(statement)
+
+
+def _backfill_v3(conn: sqlite3.Connection, first_rowid: int, last_rowid: int) -> None:
+    # refresh_task_stats as of v3.
+    conn.execute(
+        """
+        UPDATE tasks
+        SET last_completed_at = (
+                SELECT MAX(ce.completed_at) FROM completion_events ce WHERE ce.task_id = tasks.id
+            ),
+            review_count = (
+                SELECT COUNT(*) FROM completion_events ce WHERE ce.task_id = tasks.id
+            ),
+            tags_text = (
+                SELECT COALESCE(GROUP_CONCAT(name, ', '), '')
+                FROM (
+                    SELECT g.name
+                    FROM task_tag_map m
+                    JOIN task_tags g ON g.id = m.tag_id
+                    WHERE m.task_id = tasks.id
+                    ORDER BY g.name
+                )
+            )
+        WHERE rowid BETWEEN ? AND ?
+        """,
+        (first_rowid, last_rowid),
+    )
+
+
+def refresh_task_stats(conn: sqlite3.Connection, *, task_ids: list[int] | None = None) -> None:
+    """Recompute the trigger-maintained list stats of ``task_ids`` (default: all tasks)."""
+    where = "WHERE id IN (SELECT value FROM json_each(:ids))" if task_ids is not None else ""
+    conn.execute(
+        f"""
+        UPDATE tasks
+        SET last_completed_at = (
+                SELECT MAX(ce.completed_at) FROM completion_events ce WHERE ce.task_id = tasks.id
+            ),
+            review_count = (
+                SELECT COUNT(*) FROM completion_events ce WHERE ce.task_id = tasks.id
+            ),
+            tags_text = {_TAGS_TEXT_SQL.format(task_id="tasks.id")}
+        {where}
+        """,
+        {"ids": json.dumps(task_ids)},
+    )
+
+
+_TAGS_TEXT_SQL = """(
+    SELECT COALESCE(GROUP_CONCAT(name, ', '), '')
+    FROM (
+        SELECT g.name
+        FROM task_tag_map m
+        JOIN task_tags g ON g.id = m.tag_id
+        WHERE m.task_id = {task_id}
+        ORDER BY g.name
+    )
+)"""
+
+_TASK_STATS_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_completion_events_stats_ai
+    AFTER INSERT ON completion_events
+    BEGIN
+        UPDATE tasks
+        SET review_count = review_count + 1,
+            last_completed_at = MAX(COALESCE(last_completed_at, NEW.completed_at), NEW.completed_at)
+        WHERE id = NEW.task_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_completion_events_stats_ad
+    AFTER DELETE ON completion_events
+    BEGIN
+        UPDATE tasks
+        SET review_count = review_count - 1,
+            last_completed_at = (
+                SELECT MAX(ce.completed_at) FROM completion_events ce WHERE ce.task_id = OLD.task_id
+            )
+        WHERE id = OLD.task_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_completion_events_stats_au
+    AFTER UPDATE OF task_id, completed_at ON completion_events
+    BEGIN
+        UPDATE tasks
+        SET review_count = (
+                SELECT COUNT(*) FROM completion_events ce WHERE ce.task_id = tasks.id
+            ),
+            last_completed_at = (
+                SELECT MAX(ce.completed_at) FROM completion_events ce WHERE ce.task_id = tasks.id
+            )
+        WHERE id IN (OLD.task_id, NEW.task_id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_task_tag_map_stats_ai
+    AFTER INSERT ON task_tag_map
+    BEGIN
+        UPDATE tasks
+        SET tags_text = {_TAGS_TEXT_SQL.format(task_id="NEW.task_id")}
+        WHERE id = NEW.task_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_task_tag_map_stats_ad
+    AFTER DELETE ON task_tag_map
+    BEGIN
+        UPDATE tasks
+        SET tags_text = {_TAGS_TEXT_SQL.format(task_id="OLD.task_id")}
+        WHERE id = OLD.task_id;
+    END
+    """,
+)
+
+
+def _upgrade_v3_to_v4(conn: sqlite3.Connection) -> None:
+    # Trigram FTS5 index over title/note for substring search (including
+    # Japanese). External content keyed by tasks.rowid; after a VACUUM that
+    # renumbers rows, run repository.rebuild_search_index.
+    conn.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+            title,
+            note,
+            content='tasks',
+            content_rowid='rowid',
+            tokenize='trigram'
+        )
+        """
+    )
+
+    for statement in _TASKS_FTS_TRIGGERS:
+        conn.execute(statement)
+
+
+def _backfill_v4(conn: sqlite3.Connection, first_rowid: int, last_rowid: int) -> None:
+    conn.execute(
+        """
+        INSERT INTO tasks_fts(rowid, title, note)
+        SELECT rowid, title, note FROM tasks WHERE rowid BETWEEN ? AND ?
+        """,
+        (first_rowid, last_rowid),
+    )
+
+
+_TASKS_FTS_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_tasks_fts_ai
+    AFTER INSERT ON tasks
+    BEGIN
+        INSERT INTO tasks_fts(rowid, title, note) VALUES (NEW.rowid, NEW.title, NEW.note);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_tasks_fts_ad
+    AFTER DELETE ON tasks
+    BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, note)
+        VALUES ('delete', OLD.rowid, OLD.title, OLD.note);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_tasks_fts_au
+    AFTER UPDATE OF title, note ON tasks
+    BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, note)
+        VALUES ('delete', OLD.rowid, OLD.title, OLD.note);
+        INSERT INTO tasks_fts(rowid, title, note) VALUES (NEW.rowid, NEW.title, NEW.note);
+    END
+    """,
+)
+
+
+def _upgrade_v4_to_v5(conn: sqlite3.Connection) -> None:
+    # Tasks per tag, kept current by triggers; list_tasks reads it to start a
+    # multi-tag filter from the rarest tag's postings.
+    conn.execute("ALTER TABLE task_tags ADD COLUMN task_count INTEGER NOT NULL DEFAULT 0")
+
+    for statement in _TAG_COUNT_TRIGGERS:
+        conn.execute(statement)
+
+
+def _backfill_v5(conn: sqlite3.Connection, first_rowid: int, last_rowid: int) -> None:
+    conn.execute(
+        """
+        UPDATE task_tags
+        SET task_count = (SELECT COUNT(*) FROM task_tag_map m WHERE m.tag_id = task_tags.id)
+        WHERE rowid BETWEEN ? AND ?
+        """,
+        (first_rowid, last_rowid),
+    )
+
+
+_TAG_COUNT_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_task_tag_map_count_ai
+    AFTER INSERT ON task_tag_map
+    BEGIN
+        UPDATE task_tags SET task_count = task_count + 1 WHERE id = NEW.tag_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_task_tag_map_count_ad
+    AFTER DELETE ON task_tag_map
+    BEGIN
+        UPDATE task_tags SET task_count = task_count - 1 WHERE id = OLD.tag_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_task_tag_map_count_au
+    AFTER UPDATE OF tag_id ON task_tag_map
+    BEGIN
+        UPDATE task_tags SET task_count = task_count - 1 WHERE id = OLD.tag_id;
+        UPDATE task_tags SET task_count = task_count + 1 WHERE id = NEW.tag_id;
+    END
+    """,
+)
+
+
+def _upgrade_v5_to_v6(conn: sqlite3.Connection) -> None:
+    # Append-only log of changed rows (keys only, op i/u/d) for delta export;
+    # see taskmaster.changes. AUTOINCREMENT keeps seq from ever going back,
+    # even after the log is trimmed to empty. Task and event ids never
+    # change, so their update triggers only log the new key.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq        INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            op         TEXT NOT NULL,
+            row_key    TEXT NOT NULL,
+            row_key2   TEXT NOT NULL DEFAULT ''
+        )
+        """
+    )
+
+    for statement in _CHANGE_LOG_TRIGGERS:
+        conn.execute(statement)
+
+
+_CHANGE_LOG_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_tasks_log_ai
+    AFTER INSERT ON tasks
+    BEGIN
+        INSERT INTO change_log(table_name, op, row_key, row_key2)
+        VALUES ('tasks', 'i', NEW.id, '');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_tasks_log_au
+    AFTER UPDATE ON tasks
+    BEGIN
+        INSERT INTO change_log(table_name, op, row_key, row_key2)
+        VALUES ('tasks', 'u', NEW.id, '');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_tasks_log_ad
+    AFTER DELETE ON tasks
+    BEGIN
+        INSERT INTO change_log(table_name, op, row_key, row_key2)
+        VALUES ('tasks', 'd', OLD.id, '');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_completion_events_log_ai
+    AFTER INSERT ON completion_events
+    BEGIN
+        INSERT INTO change_log(table_name, op, row_key, row_key2)
+        VALUES ('completion_events', 'i', NEW.id, '');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_completion_events_log_au
+    AFTER UPDATE ON completion_events
+    BEGIN
+        INSERT INTO change_log(table_name, op, row_key, row_key2)
+        VALUES ('completion_events', 'u', NEW.id, '');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_completion_events_log_ad
+    AFTER DELETE ON completion_events
+    BEGIN
+        INSERT INTO change_log(table_name, op, row_key, row_key2)
+        VALUES ('completion_events', 'd', OLD.id, '');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_task_tag_map_log_ai
+    AFTER INSERT ON task_tag_map
+    BEGIN
+        INSERT INTO change_log(table_name, op, row_key, row_key2)
+        VALUES ('task_tag_map', 'i', NEW.task_id, NEW.tag_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_task_tag_map_log_au
+    AFTER UPDATE ON task_tag_map
+    BEGIN
+        INSERT INTO change_log(table_name, op, row_key, row_key2)
+        VALUES ('task_tag_map', 'd', OLD.task_id, OLD.tag_id),
+               ('task_tag_map', 'u', NEW.task_id, NEW.tag_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_task_tag_map_log_ad
+    AFTER DELETE ON task_tag_map
+    BEGIN
+        INSERT INTO change_log(table_name, op, row_key, row_key2)
+        VALUES ('task_tag_map', 'd', OLD.task_id, OLD.tag_id);
+    END
+    """,
+)
+
+
+def _upgrade_v6_to_v7(conn: sqlite3.Connection) -> None:
+    # Integer keys: tasks, events and tags are keyed by rowid, so the tag
+    # map and the event indexes hold integers instead of 36-character UUID
+    # strings. Tasks keep the UUID's 16 bytes as public_id, which is what
+    # the UI, the CLI, exports and change streams show. The new tables are
+    # filled next to the old ones (_backfill_v7) and swapped in at the end
+    # (_finish_v7).
+    conn.execute(
+        """
+        CREATE TABLE tasks_v7 (
+            id                INTEGER PRIMARY KEY,
+            public_id         BLOB NOT NULL,
+            title             TEXT NOT NULL,
+            note              TEXT NOT NULL DEFAULT '',
+            status            TEXT NOT NULL,
+            created_at        INTEGER NOT NULL,
+            updated_at        INTEGER NOT NULL,
+            next_review_at    INTEGER,
+            deleted_at        INTEGER,
+            purged_at         INTEGER,
+            act_recent        TEXT NOT NULL DEFAULT '',
+            act_tail_count    INTEGER NOT NULL DEFAULT 0,
+            act_first_at      INTEGER,
+            last_grade        TEXT,
+            last_completed_at INTEGER,
+            review_count      INTEGER NOT NULL DEFAULT 0,
+            tags_text         TEXT NOT NULL DEFAULT '',
+            CHECK (status IN ('due', 'waiting', 'archived')),
+            CHECK (length(public_id) = 16)
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE completion_events_v7 (
+            id           INTEGER PRIMARY KEY,
+            task_id      INTEGER NOT NULL,
+            completed_at INTEGER NOT NULL,
+            grade        TEXT NOT NULL,
+            FOREIGN KEY(task_id) REFERENCES tasks_v7(id) ON DELETE CASCADE
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE task_tags_v7 (
+            id         INTEGER PRIMARY KEY,
+            name       TEXT NOT NULL UNIQUE,
+            created_at INTEGER NOT NULL,
+            task_count INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE task_tag_map_v7 (
+            task_id INTEGER NOT NULL,
+            tag_id  INTEGER NOT NULL,
+            PRIMARY KEY(task_id, tag_id),
+            FOREIGN KEY(task_id) REFERENCES tasks_v7(id) ON DELETE CASCADE,
+            FOREIGN KEY(tag_id)  REFERENCES task_tags_v7(id) ON DELETE CASCADE
+        )
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO task_tags_v7(id, name, created_at, task_count)
+        SELECT rowid, name, created_at, task_count FROM task_tags
+        """
+    )
+
+
+def _backfill_v7(conn: sqlite3.Connection, first_rowid: int, last_rowid: int) -> None:
+    # A task keeps its rowid as id, so tasks_fts stays valid.
+    conn.create_function("taskmaster_public_id", 1, _v7_public_id, deterministic=True)
+    params = (first_rowid, last_rowid)
+    conn.execute(
+        f"""
+        INSERT INTO tasks_v7(id, public_id, {_V7_TASK_COLUMNS})
+        SELECT rowid, taskmaster_public_id(id), {_V7_TASK_COLUMNS}
+        FROM tasks
+        WHERE rowid BETWEEN ? AND ?
+        """,
+        params,
+    )
+    conn.execute(
+        """
+        INSERT INTO completion_events_v7(task_id, completed_at, grade)
+        SELECT t.rowid, ce.completed_at, ce.grade
+        FROM tasks t
+        JOIN completion_events ce ON ce.task_id = t.id
+        WHERE t.rowid BETWEEN ? AND ?
+        ORDER BY t.rowid, ce.completed_at
+        """,
+        params,
+    )
+    conn.execute(
+        """
+        INSERT INTO task_tag_map_v7(task_id, tag_id)
+        SELECT t.rowid, g.rowid
+        FROM tasks t
+        JOIN task_tag_map m ON m.task_id = t.id
+        JOIN task_tags g ON g.id = m.tag_id
+        WHERE t.rowid BETWEEN ? AND ?
+        """,
+        params,
+    )
+
+
+def _v7_public_id(text: str) -> bytes:
+    # repository.public_id_from_text as of v7: the UUID's bytes, or for a
+    # non-UUID id a name-based UUID in the namespace of foreign ids.
+    import uuid
+
+    try:
+        return uuid.UUID(text).bytes
+    except ValueError:
+        return uuid.uuid5(uuid.UUID("6f1f3a52-2d8e-4c1b-9a57-0c3e5d7b8a21"), text).bytes
+
+
+def _finish_v7(conn: sqlite3.Connection) -> None:
+    # Dropping a table drops its indexes and triggers; children go first so
+    # no foreign key points at a dropped parent.
+    for table in ("task_tag_map", "completion_events", "tasks", "task_tags"):
+        conn.execute(f"DROP TABLE {table}")
+    for table in ("task_tags", "tasks", "completion_events", "task_tag_map"):
+        conn.execute(f"ALTER TABLE {table}_v7 RENAME TO {table}")
+    for statement in (
+        *_V7_INDEXES,
+        *_TASK_STATS_TRIGGERS,
+        *_TASKS_FTS_TRIGGERS,
+        *_TAG_COUNT_TRIGGERS,
+        *_PUBLIC_CHANGE_LOG_TRIGGERS,
+    ):
+        conn.execute(statement)
+    # The logged keys name rows by their old ids. Dropping them (seq keeps
+    # counting) makes export_changes ask for a full backup instead.
+    conn.execute("DELETE FROM change_log")
+
+
+_V7_TASK_COLUMNS = (
+    "title, note, status, created_at, updated_at, next_review_at, deleted_at, purged_at, "
+    "act_recent, act_tail_count, act_first_at, last_grade, last_completed_at, review_count, tags_text"
+)
+
+# Built after the backfill, in one sort each instead of row by row.
+_V7_INDEXES = (
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_tasks_public_id ON tasks(public_id)",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_status_next_review ON tasks(status, next_review_at)",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_deleted ON tasks(deleted_at)",
+    "CREATE INDEX IF NOT EXISTS idx_completion_events_task_time ON completion_events(task_id, completed_at)",
+    """
+    CREATE INDEX IF NOT EXISTS idx_completion_events_task_grade_time
+        ON completion_events(task_id, grade, completed_at)
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_tag_map_tag ON task_tag_map(tag_id)",
+    "CREATE INDEX IF NOT EXISTS idx_tag_map_task ON task_tag_map(task_id)",
+)
+
+# The v7 change log names rows by what identifies them in every copy: a
+# task by its public id (hex), an event by its task's public id plus
+# "<completed_at> <grade>", a tag assignment by the task's public id plus
+# the tag name. Events and assignments are identified by their content, so
+# an update logs the old key as a delete. Rows whose task (or tag) is
+# already gone (a cascade) are not logged; the parent's delete covers them.
+_PUBLIC_CHANGE_LOG_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_tasks_log_ai
+    AFTER INSERT ON tasks
+    BEGIN
+        INSERT INTO change_log(table_name, op, row_key, row_key2)
+        VALUES ('tasks', 'i', lower(hex(NEW.public_id)), '');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_tasks_log_au
+    AFTER UPDATE ON tasks
+    BEGIN
+        INSERT INTO change_log(table_name, op, row_key, row_key2)
+        VALUES ('tasks', 'u', lower(hex(NEW.public_id)), '');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_tasks_log_ad
+    AFTER DELETE ON tasks
+    BEGIN
+        INSERT INTO change_log(table_name, op, row_key, row_key2)
+        VALUES ('tasks', 'd', lower(hex(OLD.public_id)), '');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_completion_events_log_ai
+    AFTER INSERT ON completion_events
+    BEGIN
+        INSERT INTO change_log(table_name, op, row_key, row_key2)
+        SELECT 'completion_events', 'i', lower(hex(public_id)), NEW.completed_at || ' ' || NEW.grade
+        FROM tasks WHERE id = NEW.task_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_completion_events_log_au
+    AFTER UPDATE ON completion_events
+    BEGIN
+        INSERT INTO change_log(table_name, op, row_key, row_key2)
+        SELECT 'completion_events', 'd', lower(hex(public_id)), OLD.completed_at || ' ' || OLD.grade
+        FROM tasks WHERE id = OLD.task_id;
+        INSERT INTO change_log(table_name, op, row_key, row_key2)
+        SELECT 'completion_events', 'u', lower(hex(public_id)), NEW.completed_at || ' ' || NEW.grade
+        FROM tasks WHERE id = NEW.task_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_completion_events_log_ad
+    AFTER DELETE ON completion_events
+    BEGIN
+        INSERT INTO change_log(table_name, op, row_key, row_key2)
+        SELECT 'completion_events', 'd', lower(hex(public_id)), OLD.completed_at || ' ' || OLD.grade
+        FROM tasks WHERE id = OLD.task_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_task_tag_map_log_ai
+    AFTER INSERT ON task_tag_map
+    BEGIN
+        INSERT INTO change_log(table_name, op, row_key, row_key2)
+        SELECT 'task_tag_map', 'i', lower(hex(t.public_id)), g.name
+        FROM tasks t, task_tags g
+        WHERE t.id = NEW.task_id AND g.id = NEW.tag_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_task_tag_map_log_au
+    AFTER UPDATE ON task_tag_map
+    BEGIN
+        INSERT INTO change_log(table_name, op, row_key, row_key2)
+        SELECT 'task_tag_map', 'd', lower(hex(t.public_id)), g.name
+        FROM tasks t, task_tags g
+        WHERE t.id = OLD.task_id AND g.id = OLD.tag_id;
+        INSERT INTO change_log(table_name, op, row_key, row_key2)
+        SELECT 'task_tag_map', 'u', lower(hex(t.public_id)), g.name
+        FROM tasks t, task_tags g
+        WHERE t.id = NEW.task_id AND g.id = NEW.tag_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_task_tag_map_log_ad
+    AFTER DELETE ON task_tag_map
+    BEGIN
+        INSERT INTO change_log(table_name, op, row_key, row_key2)
+        SELECT 'task_tag_map', 'd', lower(hex(t.public_id)), g.name
+        FROM tasks t, task_tags g
+        WHERE t.id = OLD.task_id AND g.id = OLD.tag_id;
+    END
+    """,
+)
+
+
+# Triggers bulk_load drops and catches up on, by name.
+_BULK_LOAD_TRIGGERS = {
+    "trg_tasks_fts_ai": _TASKS_FTS_TRIGGERS[0],
+    "trg_completion_events_stats_ai": _TASK_STATS_TRIGGERS[0],
+    "trg_task_tag_map_stats_ai": _TASK_STATS_TRIGGERS[3],
+}
+
+
+# In version order, one step per version from 2 to SCHEMA_VERSION. A new
+# step puts its DDL in ``schema`` and anything that touches every row in a
+# Backfill, so large DBs upgrade in chunks. Steps are frozen: they never
+# call repository code, and SQL a step uses is not edited afterwards; a
+# later schema that needs different triggers or backfill logic defines its
+# own in its step.
+MIGRATIONS = (
+    Migration(2, "activation state columns", _upgrade_v1_to_v2, Backfill("tasks", _backfill_v2)),
+    Migration(3, "list stats columns and triggers", _upgrade_v2_to_v3, Backfill("tasks", _backfill_v3)),
+    Migration(4, "trigram search index", _upgrade_v3_to_v4, Backfill("tasks", _backfill_v4)),
+    Migration(5, "task count per tag", _upgrade_v4_to_v5, Backfill("task_tags", _backfill_v5)),
+    Migration(6, "change log", _upgrade_v5_to_v6),
+    Migration(
+        7, "integer keys, task public ids", _upgrade_v6_to_v7, Backfill("tasks", _backfill_v7), _finish_v7
+    ),
+)
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import itertools
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from PySide6.QtCore import QObject, QThread, Qt, Signal, Slot
+
+from taskmaster import db
+
+
+# Ids are unique across workers so callers can key pending jobs by id alone.
+_job_ids = itertools.count(1)
+
+
+@dataclass(frozen=True)
+class _Job:
+    id: int
+    fn: Callable[[sqlite3.Connection], Any]
+    write: bool
+    generation: int | None
+
+
+class DbWorker(QObject):
+    """Runs DB jobs in submission order on a dedicated thread.
+
+    The worker owns its own connection. Jobs are plain callables taking that
+    connection; write jobs run inside ``with conn:``. Results come back as
+    queued signals keyed by the id returned from submit(). Jobs tagged with a
+    generation are read-only and may be dropped or interrupted once
+    cancel_before() moves past it.
+    """
+
+    jobFinished = Signal(int, object)
+    jobFailed = Signal(int, str)
+    jobCancelled = Signal(int)
+
+    _jobQueued = Signal(object)
+    _openRequested = Signal(str, object)
+    _closeRequested = Signal()
+
+    def __init__(self, *, read_only: bool = False, name: str | None = None) -> None:
+        super().__init__()
+        self._read_only = read_only
+        self._conn: sqlite3.Connection | None = None
+        # Guards _running/_min_generation so interrupt() can only hit the
+        # stale read it was aimed at, never the job after it.
+        self._lock = threading.Lock()
+        self._running: _Job | None = None
+        self._min_generation = 0
+
+        self._thread = QThread()
+        self._thread.setObjectName(name or ("taskmaster-db-read" if read_only else "taskmaster-db-write"))
+        self.moveToThread(self._thread)
+        self._jobQueued.connect(self._run)
+        self._openRequested.connect(self._open)
+        self._closeRequested.connect(self._close, Qt.ConnectionType.BlockingQueuedConnection)
+        self._thread.start()
+
+    def open(self, db_path: Path, profile: db.ConnectionProfile) -> None:
+        """(Re)open the worker connection; jobs submitted later use it."""
+        self._openRequested.emit(str(db_path), profile)
+
+    def close(self) -> None:
+        """Wait for queued jobs, then close the connection."""
+        if self._thread.isRunning():
+            self._closeRequested.emit()
+
+    def submit(
+        self,
+        fn: Callable[[sqlite3.Connection], Any],
+        *,
+        write: bool = False,
+        generation: int | None = None,
+    ) -> int:
+        job = _Job(next(_job_ids), fn, write, generation)
+        self._jobQueued.emit(job)
+        return job.id
+
+    def cancel_before(self, generation: int) -> None:
+        """Drop queued reads older than ``generation`` and interrupt a running one."""
+        with self._lock:
+            self._min_generation = generation
+            job = self._running
+            if job is not None and self._is_stale(job) and self._conn is not None:
+                self._conn.interrupt()
+
+    def stop(self) -> None:
+        """Finish queued jobs, close the connection and stop the thread."""
+        if not self._thread.isRunning():
+            return
+        self.close()
+        self._thread.quit()
+        self._thread.wait()
+
+    def _is_stale(self, job: _Job) -> bool:
+        return job.generation is not None and job.generation < self._min_generation
+
+    @Slot(str, object)
+    def _open(self, db_path: str, profile: db.ConnectionProfile) -> None:
+        if self._conn is not None:
+            self._conn.close()
+        self._conn = db.connect(Path(db_path), profile=profile, read_only=self._read_only)
+
+    @Slot()
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @Slot(object)
+    def _run(self, job: _Job) -> None:
+        with self._lock:
+            if self._is_stale(job):
+                self.jobCancelled.emit(job.id)
+                return
+            self._running = job
+        try:
+            conn = self._conn
+            if conn is None:
+                raise RuntimeError("DB not initialized")
+            if job.write:
+                with conn:
+                    result = job.fn(conn)
+            else:
+                result = job.fn(conn)
+        except sqlite3.OperationalError as e:
+            if job.generation is not None and str(e) == "interrupted":
+                self.jobCancelled.emit(job.id)
+            else:
+                self.jobFailed.emit(job.id, str(e))
+        except Exception as e:
+            self.jobFailed.emit(job.id, str(e))
+        else:
+            self.jobFinished.emit(job.id, result)
+        finally:
+            with self._lock:
+                self._running = None
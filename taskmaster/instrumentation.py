@@ -0,0 +1,279 @@
+"""Opt-in latency instrumentation.
+
+Enabled with TASKMASTER_INSTRUMENT=1 or the Settings toggle. While enabled:
+
+- connections from db.connect are TracedConnection: every statement records
+  its latency (execute plus fetches) and row count, and COMMIT its own;
+- functions decorated with @timed (controller slots, TaskTableModel.setRows)
+  record their wall time.
+
+Samples go into rolling per-name histograms; report() summarizes them and
+the whole report is written as JSON at exit.
+"""
+
+from __future__ import annotations
+
+import atexit
+import functools
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+
+ENV_VAR = "TASKMASTER_INSTRUMENT"
+DUMP_ENV_VAR = "TASKMASTER_INSTRUMENT_DUMP"
+ROLLING_WINDOW = 2048
+_SQL_KEY_CHARS = 160
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Histogram:
+    """Latency samples (ms) of the last ROLLING_WINDOW calls."""
+
+    def __init__(self) -> None:
+        self.samples: deque[float] = deque(maxlen=ROLLING_WINDOW)
+        self.count = 0
+        self.rows = 0
+
+    def record(self, ms: float, rows: int | None) -> None:
+        self.samples.append(ms)
+        self.count += 1
+        if rows is not None and rows > 0:
+            self.rows += rows
+
+    def summary(self) -> dict[str, float]:
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "rows": self.rows,
+            "p50_ms": _percentile(ordered, 0.50),
+            "p95_ms": _percentile(ordered, 0.95),
+            "p99_ms": _percentile(ordered, 0.99),
+            "max_ms": ordered[-1] if ordered else 0.0,
+        }
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._histograms: dict[str, Histogram] = {}
+
+    def record(self, name: str, ms: float, rows: int | None = None) -> None:
+        with self._lock:
+            hist = self._histograms.get(name)
+            if hist is None:
+                hist = self._histograms[name] = Histogram()
+            hist.record(ms, rows)
+
+    def report(self) -> list[dict[str, Any]]:
+        """One entry per name, slowest p95 first."""
+        with self._lock:
+            entries = [{"name": name, **h.summary()} for name, h in self._histograms.items()]
+        entries.sort(key=lambda e: e["p95_ms"], reverse=True)
+        return entries
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+
+_recorder: Recorder | None = None
+_dump_path: Path | None = None
+_atexit_registered = False
+
+
+def enabled_by_env() -> bool:
+    return os.environ.get(ENV_VAR, "").strip().lower() not in ("", "0", "false", "no")
+
+
+def is_enabled() -> bool:
+    return _recorder is not None
+
+
+def recorder() -> Recorder | None:
+    return _recorder
+
+
+def enable(*, dump_path: Path | None = None) -> Recorder:
+    """Start recording; the report is dumped to ``dump_path`` at exit."""
+    global _recorder, _dump_path, _atexit_registered
+    if _recorder is None:
+        _recorder = Recorder()
+    env_path = os.environ.get(DUMP_ENV_VAR)
+    _dump_path = Path(env_path).expanduser() if env_path else dump_path
+    if not _atexit_registered:
+        atexit.register(_dump_at_exit)
+        _atexit_registered = True
+    return _recorder
+
+
+def disable() -> None:
+    global _recorder
+    _dump_at_exit()
+    _recorder = None
+
+
+def dump(path: Path) -> None:
+    rec = _recorder
+    if rec is None:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {"written_at": int(time.time()), "window": ROLLING_WINDOW, "metrics": rec.report()}
+    path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+
+
+def _dump_at_exit() -> None:
+    if _dump_path is not None:
+        dump(_dump_path)
+
+
+def timed(fn: F) -> F:
+    """Record the wall time of each call under the function's qualname."""
+    name = fn.__qualname__
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        rec = _recorder
+        if rec is None:
+            return fn(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            rec.record(name, (time.perf_counter() - start) * 1000.0)
+
+    return wrapper  # type: ignore[return-value]
+
+
+def sql_key(sql: str) -> str:
+    """Histogram name of a statement: whitespace collapsed, select list elided
+    so that the WHERE clause (which tells the queries apart) fits."""
+    text = re.sub(r"\s+", " ", sql).strip()
+    text = re.sub(r"^SELECT (.+?) FROM ", "SELECT … FROM ", text, count=1)
+    return text[:_SQL_KEY_CHARS]
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor that records each statement once its results are consumed.
+
+    Time spent in execute and in the fetches is summed; the sample is taken
+    when the rows run out, on the next execute, or when the cursor goes away.
+    """
+
+    _pending: list | None = None  # [key, seconds, rows]
+
+    def execute(self, sql: str, parameters: Any = (), /) -> TracedCursor:
+        self._flush()
+        start = time.perf_counter()
+        super().execute(sql, parameters)
+        self._begin(sql, time.perf_counter() - start)
+        return self
+
+    def executemany(self, sql: str, seq_of_parameters: Any, /) -> TracedCursor:
+        self._flush()
+        start = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        self._begin(sql, time.perf_counter() - start)
+        return self
+
+    def fetchone(self) -> Any:
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._add(time.perf_counter() - start, 0 if row is None else 1, done=row is None)
+        return row
+
+    def fetchmany(self, size: int | None = None) -> list[Any]:
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._add(time.perf_counter() - start, len(rows), done=not rows)
+        return rows
+
+    def fetchall(self) -> list[Any]:
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._add(time.perf_counter() - start, len(rows), done=True)
+        return rows
+
+    def __next__(self) -> Any:
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._add(time.perf_counter() - start, 0, done=True)
+            raise
+        self._add(time.perf_counter() - start, 1, done=False)
+        return row
+
+    def close(self) -> None:
+        self._flush()
+        super().close()
+
+    def __del__(self) -> None:
+        self._flush()
+
+    def _begin(self, sql: str, seconds: float) -> None:
+        rows = self.rowcount if self.rowcount >= 0 else 0
+        self._pending = [sql_key(sql), seconds, rows]
+        if self.description is None:
+            # No result set (DML/DDL): nothing left to fetch.
+            self._flush()
+
+    def _add(self, seconds: float, rows: int, *, done: bool) -> None:
+        pending = self._pending
+        if pending is None:
+            return
+        pending[1] += seconds
+        pending[2] += rows
+        if done:
+            self._flush()
+
+    def _flush(self) -> None:
+        pending, self._pending = self._pending, None
+        rec = _recorder
+        if pending is not None and rec is not None:
+            rec.record(f"sql: {pending[0]}", pending[1] * 1000.0, pending[2])
+
+
+class TracedConnection(sqlite3.Connection):
+    """Connection whose statements go through TracedCursor."""
+
+    def cursor(self, factory: Any = TracedCursor) -> sqlite3.Cursor:  # type: ignore[override]
+        return super().cursor(factory)
+
+    # The C implementations of these bypass cursor(), so route them explicitly.
+    def execute(self, sql: str, parameters: Any = (), /) -> sqlite3.Cursor:
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Any, /) -> sqlite3.Cursor:
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self) -> None:
+        start = time.perf_counter()
+        super().commit()
+        _record_commit(start)
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> bool:
+        start = time.perf_counter()
+        result = super().__exit__(exc_type, exc, tb)
+        if exc_type is None:
+            _record_commit(start)
+        return result
+
+
+def _record_commit(start: float) -> None:
+    rec = _recorder
+    if rec is not None:
+        rec.record("sql: COMMIT", (time.perf_counter() - start) * 1000.0)
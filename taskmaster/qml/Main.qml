@@ -248,6 +248,8 @@ ApplicationWindow {
                                     enabled: true, run: () => controller.refresh() },
                                 { group: "App", title: "Recalculate All Tasks…", shortcut: "Ctrl+Shift+R", contextOnly: false,
                                     enabled: true, run: () => recalcConfirmDialog.open() },
+                                { group: "App", title: "Rebuild Search Index", shortcut: "", contextOnly: false,
+                                    enabled: true, run: () => controller.rebuildSearchIndex() },
 
                                 { group: "Theme", title: "Theme: Dark", shortcut: "", contextOnly: false,
                                     enabled: true, run: () => controller.setTheme("dark") },
@@ -724,6 +726,9 @@ ApplicationWindow {
                                 clip: true
                                 model: controller.currentView === "due" ? controller.dueModel : controller.currentView === "waiting" ? controller.waitingModel : controller.archivedModel
 
+                                // Pull the next page when scrolled to the end (models load in pages).
+                                onAtYEndChanged: if (atYEnd && model) model.loadMore()
+
                                 columnWidthProvider: function(col) {
                                     const n = tableView.model ? tableView.model.columnCount() : 1
                                     if (n <= 1) return tableView.width
@@ -849,6 +854,14 @@ ApplicationWindow {
                                         onActivated: controller.setTheme(currentText)
                                     }
                                 }
+
+                                RowLayout {
+                                    Label { text: "Approx. Activation"; color: "#BDBDBD"; Layout.preferredWidth: 140 }
+                                    CheckBox {
+                                        checked: controller.approxActivation
+                                        onToggled: controller.setApproxActivation(checked)
+                                    }
+                                }
                             }
                         }
 
@@ -890,6 +903,15 @@ ApplicationWindow {
                                     }
                                 }
 
+                                RowLayout {
+                                    Label { text: "Connection"; color: "#BDBDBD"; Layout.preferredWidth: 140 }
+                                    ComboBox {
+                                        model: ["wal", "rollback"]
+                                        currentIndex: controller.connectionProfile === "rollback" ? 1 : 0
+                                        onActivated: controller.setConnectionProfile(currentText)
+                                    }
+                                }
+
                                 RowLayout {
                                     Label { text: "Backup To"; color: "#BDBDBD"; Layout.preferredWidth: 140 }
                                     TextField {
@@ -917,13 +939,122 @@ ApplicationWindow {
                                     }
                                 }
 
+                                RowLayout {
+                                    visible: controller.backupRunning
+                                    Label { text: "Backing Up"; color: "#BDBDBD"; Layout.preferredWidth: 140 }
+                                    ProgressBar {
+                                        Layout.fillWidth: true
+                                        from: 0
+                                        to: 1
+                                        value: controller.backupProgress
+                                    }
+                                    Button {
+                                        text: "Cancel"
+                                        onClicked: controller.cancelBackup()
+                                    }
+                                }
+
+                                RowLayout {
+                                    Label { text: "Auto Backup Dir"; color: "#BDBDBD"; Layout.preferredWidth: 140 }
+                                    TextField {
+                                        id: backupDirField
+                                        Layout.fillWidth: true
+                                        text: controller.backupDir
+                                        onEditingFinished: {
+                                            if (text !== controller.backupDir) {
+                                                controller.setBackupSchedule(text, backupHoursBox.value, backupKeepBox.value, backupGzipBox.checked)
+                                            }
+                                        }
+                                    }
+                                }
+
+                                RowLayout {
+                                    Label { text: "Every (h, 0 = off)"; color: "#BDBDBD"; Layout.preferredWidth: 140 }
+                                    SpinBox {
+                                        id: backupHoursBox
+                                        from: 0
+                                        to: 720
+                                        value: controller.backupIntervalHours
+                                        editable: true
+                                        onValueModified: controller.setBackupSchedule(backupDirField.text, value, backupKeepBox.value, backupGzipBox.checked)
+                                    }
+                                    Label { text: "Keep"; color: "#BDBDBD" }
+                                    SpinBox {
+                                        id: backupKeepBox
+                                        from: 1
+                                        to: 100
+                                        value: controller.backupKeep
+                                        editable: true
+                                        onValueModified: controller.setBackupSchedule(backupDirField.text, backupHoursBox.value, value, backupGzipBox.checked)
+                                    }
+                                    CheckBox {
+                                        id: backupGzipBox
+                                        text: "gzip"
+                                        checked: controller.backupCompress
+                                        onToggled: controller.setBackupSchedule(backupDirField.text, backupHoursBox.value, backupKeepBox.value, checked)
+                                    }
+                                }
+
                                 Label {
-                                    text: "DB switch: focus DB Path then Ctrl+S. Backup: focus Backup To then Enter/Ctrl+B. Recalculate: Ctrl+Shift+R."
+                                    text: "DB switch: focus DB Path then Ctrl+S. Backup: focus Backup To then Enter/Ctrl+B (a .gz path is compressed). Recalculate: Ctrl+Shift+R."
                                     color: "#7A7A7A"
                                     wrapMode: Text.WordWrap
                                 }
                             }
                         }
+
+                        Rectangle {
+                            Layout.fillWidth: true
+                            implicitHeight: diagnosticsCardContent.implicitHeight + 28
+                            radius: 12
+                            color: Qt.rgba(0x25/255,0x25/255,0x26/255, 0.82)
+                            border.color: "#3C3C3C"
+
+                            ColumnLayout {
+                                id: diagnosticsCardContent
+                                anchors.left: parent.left
+                                anchors.right: parent.right
+                                anchors.top: parent.top
+                                anchors.margins: 14
+                                spacing: 6
+
+                                Label { text: "Diagnostics"; color: "#E6E6E6"; font.pixelSize: 16 }
+
+                                RowLayout {
+                                    Label { text: "Instrumentation"; color: "#BDBDBD"; Layout.preferredWidth: 140 }
+                                    CheckBox {
+                                        checked: controller.instrumentationEnabled
+                                        onToggled: controller.setInstrumentationEnabled(checked)
+                                    }
+                                    Button {
+                                        text: "Reset"
+                                        visible: controller.instrumentationEnabled
+                                        onClicked: controller.resetInstrumentation()
+                                    }
+                                }
+
+                                // Slowest first (by p95), latencies in ms over the rolling window.
+                                Repeater {
+                                    model: controller.instrumentationReport
+                                    delegate: RowLayout {
+                                        Layout.fillWidth: true
+                                        Label {
+                                            text: modelData.name
+                                            color: "#BDBDBD"
+                                            elide: Text.ElideRight
+                                            Layout.fillWidth: true
+                                        }
+                                        Label {
+                                            text: modelData.count + "×  p50 " + modelData.p50_ms.toFixed(2)
+                                                  + "  p95 " + modelData.p95_ms.toFixed(2)
+                                                  + "  p99 " + modelData.p99_ms.toFixed(2)
+                                            color: "#7A7A7A"
+                                            font.family: "monospace"
+                                        }
+                                    }
+                                }
+                            }
+                        }
                     }
                 }
             }
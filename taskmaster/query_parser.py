@@ -2,8 +2,6 @@ from __future__ import annotations
 
 import re
 
-from taskmaster.repository import normalize_tag
-
 
 def parse_search_query(query: str) -> tuple[str, list[str]]:
     """Return (text_query, tags).
@@ -16,6 +14,8 @@ def parse_search_query(query: str) -> tuple[str, list[str]]:
     if not raw:
         return "", []
 
+    from taskmaster.repository import normalize_tag
+
     tokens = re.split(r"\s+", raw)
     tags: list[str] = []
     text_parts: list[str] = []
@@ -1,18 +1,35 @@
 from __future__ import annotations
 
+import json
 import sqlite3
 import uuid
+from array import array
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Iterable
 
-from taskmaster.constants import VALID_GRADES
+from taskmaster.constants import (
+    ACTIVATION_RECENT_EVENTS,
+    FTS_MIN_QUERY_CHARS,
+    MAX_TAGS_PER_TASK,
+    VALID_GRADES,
+)
+from taskmaster.scheduler import ActivationState
 from taskmaster.timeutil import to_epoch_seconds
 
+# Namespace of the name-based public ids given to imported ids that are not
+# UUIDs (public_id_from_text).
+_FOREIGN_ID_NAMESPACE = uuid.UUID("6f1f3a52-2d8e-4c1b-9a57-0c3e5d7b8a21")
+# Public ids per IN (...) lookup, well under SQLite's variable limit.
+_PUBLIC_ID_CHUNK = 500
 
-@dataclass(frozen=True)
+
+# Slotted, and built positionally from cursor tuples (see _task_cursor): the
+# SELECTs below list the columns in field order.
+@dataclass(frozen=True, slots=True)
 class TaskRow:
-    id: str
+    id: int
+    public_id: bytes
     title: str
     note: str
     status: str
@@ -26,24 +43,72 @@ class TaskRow:
     review_count: int
 
 
-def _uuid() -> str:
-    return str(uuid.uuid4())
+@dataclass(frozen=True)
+class HistoryBatch:
+    """Completion histories of many tasks packed into flat arrays.
+
+    Task ``task_ids[i]`` owns ``event_epochs[offsets[i]:offsets[i + 1]]``.
+    """
+
+    task_ids: list[int]
+    last_grades: list[str]
+    event_epochs: array
+    offsets: array
+    # Set when the events are only the recent part of an ActivationState.
+    tail_counts: array | None = None
+    first_epochs: array | None = None
 
 
-def create_task(conn: sqlite3.Connection, *, title: str, note: str, now: datetime) -> str:
-    task_id = _uuid()
+def new_public_id() -> bytes:
+    return uuid.uuid4().bytes
+
+
+def public_id_from_text(text: str) -> bytes:
+    """Public id written as ``text`` (hex, or a UUID in any form).
+
+    Anything else (ids imported from elsewhere) maps to a name-based UUID
+    of the text, the same one every time.
+    """
+    try:
+        return uuid.UUID(text).bytes
+    except ValueError:
+        return uuid.uuid5(_FOREIGN_ID_NAMESPACE, text).bytes
+
+
+def task_id_for(conn: sqlite3.Connection, *, public_id: str) -> int | None:
+    """Internal id of the task shown as ``public_id`` in the UI or CLI."""
+    row = conn.execute(
+        "SELECT id FROM tasks WHERE public_id = ?", (public_id_from_text(public_id),)
+    ).fetchone()
+    return int(row[0]) if row else None
+
+
+def task_ids_for(conn: sqlite3.Connection, public_ids: Iterable[bytes]) -> dict[bytes, int]:
+    """Internal ids of the tasks with these public ids; unknown ones are left out."""
+    public_ids = list(dict.fromkeys(public_ids))
+    found: dict[bytes, int] = {}
+    for start in range(0, len(public_ids), _PUBLIC_ID_CHUNK):
+        chunk = public_ids[start : start + _PUBLIC_ID_CHUNK]
+        for public_id, task_id in conn.execute(
+            f"SELECT public_id, id FROM tasks WHERE public_id IN ({', '.join('?' * len(chunk))})", chunk
+        ):
+            found[public_id] = task_id
+    return found
+
+
+def create_task(conn: sqlite3.Connection, *, title: str, note: str, now: datetime) -> int:
     now_ep = to_epoch_seconds(now)
-    conn.execute(
+    cur = conn.execute(
         """
-        INSERT INTO tasks(id, title, note, status, created_at, updated_at, next_review_at, deleted_at, purged_at)
-        VALUES(:id, :title, :note, 'due', :now, :now, NULL, NULL, NULL)
+        INSERT INTO tasks(public_id, title, note, status, created_at, updated_at, next_review_at, deleted_at, purged_at)
+        VALUES(:public_id, :title, :note, 'due', :now, :now, NULL, NULL, NULL)
         """,
-        {"id": task_id, "title": title, "note": note, "now": now_ep},
+        {"public_id": new_public_id(), "title": title, "note": note, "now": now_ep},
     )
-    return task_id
+    return int(cur.lastrowid)
 
 
-def update_task(conn: sqlite3.Connection, *, task_id: str, title: str, note: str, now: datetime) -> None:
+def update_task(conn: sqlite3.Connection, *, task_id: int, title: str, note: str, now: datetime) -> None:
     conn.execute(
         """
         UPDATE tasks
@@ -60,46 +125,63 @@ def list_tasks(
     conn: sqlite3.Connection,
     *,
     view: str,
-    q_like: str | None,
+    text: str | None,
     tags: list[str],
+    limit: int | None = None,
+    after: tuple | None = None,
+    now_epoch: int | None = None,
 ) -> list[TaskRow]:
-    base_where, order_by = _view_where_and_order(view)
+    """List a view in display order.
+
+    Pages are keyset-based: pass ``limit`` and, for every page after the
+    first, ``after=task_cursor(view, last_row_of_previous_page)``. With
+    ``now_epoch``, due/waiting membership is computed against it instead of
+    the stored status, so listing never needs update_due_from_waiting first.
+    """
+    base_where, order_by = _view_where_and_order(view, elapsed_as_due=now_epoch is not None)
 
     params: dict[str, object] = {}
+    if now_epoch is not None:
+        params["now"] = now_epoch
     where_parts: list[str] = [base_where]
-
-    if q_like:
-        where_parts.append("(t.title LIKE :q OR t.note LIKE :q)")
-        params["q"] = q_like
-
-    join_tags = ""
-    having = ""
+    from_tasks = "tasks t"
+    join_fts = ""
 
     if tags:
-        join_tags = "\nJOIN task_tag_map m ON m.task_id = t.id\nJOIN task_tags g ON g.id = m.tag_id"
-        placeholders = []
-        for i, tag in enumerate(tags, start=1):
-            key = f"tag{i}"
-            params[key] = tag
-            placeholders.append(f":{key}")
-        where_parts.append(f"g.name IN ({', '.join(placeholders)})")
-        having = f"HAVING COUNT(DISTINCT g.name) = {len(tags)}"
+        # AND over tags: walk the rarest tag's postings (idx_tag_map_tag) and
+        # probe the others by primary key. CROSS JOIN pins that loop order.
+        tag_ids = _tag_ids_rarest_first(conn, tags)
+        if tag_ids is None:
+            return []
+        from_tasks = "task_tag_map m0\nCROSS JOIN tasks t ON t.id = m0.task_id"
+        where_parts.append("m0.tag_id = :tag0")
+        for i, tag_id in enumerate(tag_ids):
+            params[f"tag{i}"] = tag_id
+            if i:
+                where_parts.append(
+                    f"EXISTS (SELECT 1 FROM task_tag_map m{i} WHERE m{i}.task_id = t.id AND m{i}.tag_id = :tag{i})"
+                )
+
+    if after is not None:
+        where_parts.append(_keyset_where(view, after, params))
+
+    if text and len(text) >= FTS_MIN_QUERY_CHARS:
+        if tags:
+            # Match once into a rowid set; joined inside the postings loop,
+            # FTS5 would re-run the MATCH for every tagged row.
+            where_parts.append("t.rowid IN (SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH :q)")
+        else:
+            join_fts = "\nJOIN tasks_fts ON tasks_fts.rowid = t.rowid"
+            where_parts.append("tasks_fts MATCH :q")
+        params["q"] = _fts_phrase(text)
+    elif text:
+        where_parts.append("(t.title LIKE :q ESCAPE '\\' OR t.note LIKE :q ESCAPE '\\')")
+        params["q"] = f"%{_escape_like(text)}%"
 
     sql = f"""
-    WITH task_stats AS (
-        SELECT
-            t.*, 
-            (SELECT MAX(ce.completed_at) FROM completion_events ce WHERE ce.task_id = t.id) AS last_completed_at,
-            (SELECT COUNT(*) FROM completion_events ce WHERE ce.task_id = t.id) AS review_count,
-            (SELECT COALESCE(GROUP_CONCAT(g2.name, ', '), '')
-             FROM task_tag_map m2
-             JOIN task_tags g2 ON g2.id = m2.tag_id
-             WHERE m2.task_id = t.id
-            ) AS tags
-        FROM tasks t
-    )
     SELECT
         t.id,
+        t.public_id,
         t.title,
         t.note,
         t.status,
@@ -108,55 +190,76 @@ def list_tasks(
         t.next_review_at,
         t.deleted_at,
         t.purged_at,
-        t.tags,
+        t.tags_text,
         t.last_completed_at,
         t.review_count
-    FROM task_stats t
-    {join_tags}
+    FROM {from_tasks}
+    {join_fts}
     WHERE {' AND '.join(where_parts)}
-    GROUP BY t.id
-    {having}
     ORDER BY {order_by}
+    {"LIMIT :limit" if limit is not None else ""}
     """
+    if limit is not None:
+        params["limit"] = int(limit)
 
-    rows = conn.execute(sql, params).fetchall()
-    return [
-        TaskRow(
-            id=r["id"],
-            title=r["title"],
-            note=r["note"],
-            status=r["status"],
-            created_at=r["created_at"],
-            updated_at=r["updated_at"],
-            next_review_at=r["next_review_at"],
-            deleted_at=r["deleted_at"],
-            purged_at=r["purged_at"],
-            tags=r["tags"] or "",
-            last_completed_at=r["last_completed_at"],
-            review_count=int(r["review_count"] or 0),
-        )
-        for r in rows
-    ]
-
-
-def get_task(conn: sqlite3.Connection, *, task_id: str) -> TaskRow | None:
-    row = conn.execute(
+    return _task_cursor(conn).execute(sql, params).fetchall()
+
+
+def _tag_ids_rarest_first(conn: sqlite3.Connection, names: list[str]) -> list[int] | None:
+    """Ids of the named tags, fewest tasks first; None if one does not exist."""
+    names = list(dict.fromkeys(names))
+    placeholders = ", ".join("?" * len(names))
+    rows = conn.execute(
+        f"SELECT id, task_count FROM task_tags WHERE name IN ({placeholders})", names
+    ).fetchall()
+    if len(rows) != len(names):
+        return None
+    return [r[0] for r in sorted(rows, key=lambda r: r[1])]
+
+
+def task_cursor(view: str, row: TaskRow) -> tuple:
+    """Sort key of `row` in `view`, for list_tasks(after=...)."""
+    if view in ("due", "waiting"):
+        return (int(row.next_review_at is None), row.next_review_at or 0, row.updated_at, row.id)
+    if view == "archived":
+        return (row.deleted_at, row.updated_at, row.id)
+    raise ValueError(f"invalid view: {view}")
+
+
+def _keyset_where(view: str, after: tuple, params: dict[str, object]) -> str:
+    # (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ...; '<' for descending keys.
+    keys = _VIEW_SORT_KEYS[view]
+    if len(after) != len(keys):
+        raise ValueError(f"cursor does not match view: {view}")
+
+    alternatives: list[str] = []
+    for i, (expr, descending) in enumerate(keys):
+        params[f"after{i}"] = after[i]
+        terms = [f"{keys[j][0]} = :after{j}" for j in range(i)]
+        terms.append(f"{expr} {'<' if descending else '>'} :after{i}")
+        alternatives.append("(" + " AND ".join(terms) + ")")
+    return "(" + " OR ".join(alternatives) + ")"
+
+
+def rebuild_search_index(conn: sqlite3.Connection) -> None:
+    conn.execute("INSERT INTO tasks_fts(tasks_fts) VALUES('rebuild')")
+
+
+def _fts_phrase(text: str) -> str:
+    # A quoted phrase of trigrams matches the text as a plain substring.
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def get_task(conn: sqlite3.Connection, *, task_id: int) -> TaskRow | None:
+    return _task_cursor(conn).execute(
         """
-        WITH task_stats AS (
-            SELECT
-                t.*, 
-                (SELECT MAX(ce.completed_at) FROM completion_events ce WHERE ce.task_id = t.id) AS last_completed_at,
-                (SELECT COUNT(*) FROM completion_events ce WHERE ce.task_id = t.id) AS review_count,
-                (SELECT COALESCE(GROUP_CONCAT(g2.name, ', '), '')
-                 FROM task_tag_map m2
-                 JOIN task_tags g2 ON g2.id = m2.tag_id
-                 WHERE m2.task_id = t.id
-                ) AS tags
-            FROM tasks t
-            WHERE t.id = :id
-        )
         SELECT
             t.id,
+            t.public_id,
             t.title,
             t.note,
             t.status,
@@ -165,32 +268,28 @@ def get_task(conn: sqlite3.Connection, *, task_id: str) -> TaskRow | None:
             t.next_review_at,
             t.deleted_at,
             t.purged_at,
-            t.tags,
+            t.tags_text,
             t.last_completed_at,
             t.review_count
-        FROM task_stats t
+        FROM tasks t
+        WHERE t.id = :id
         """,
         {"id": task_id},
     ).fetchone()
-    if not row:
-        return None
-    return TaskRow(
-        id=row["id"],
-        title=row["title"],
-        note=row["note"],
-        status=row["status"],
-        created_at=row["created_at"],
-        updated_at=row["updated_at"],
-        next_review_at=row["next_review_at"],
-        deleted_at=row["deleted_at"],
-        purged_at=row["purged_at"],
-        tags=row["tags"] or "",
-        last_completed_at=row["last_completed_at"],
-        review_count=int(row["review_count"] or 0),
-    )
 
 
-def list_task_tags(conn: sqlite3.Connection, *, task_id: str) -> list[str]:
+def _task_cursor(conn: sqlite3.Connection) -> sqlite3.Cursor:
+    # Rows skip sqlite3.Row and its name lookups entirely.
+    cur = conn.cursor()
+    cur.row_factory = _task_row_factory
+    return cur
+
+
+def _task_row_factory(_cursor: sqlite3.Cursor, row: tuple) -> TaskRow:
+    return TaskRow(*row)
+
+
+def list_task_tags(conn: sqlite3.Connection, *, task_id: int) -> list[str]:
     rows = conn.execute(
         """
         SELECT g.name
@@ -204,51 +303,163 @@ def list_task_tags(conn: sqlite3.Connection, *, task_id: str) -> list[str]:
     return [str(r["name"]) for r in rows]
 
 
-def due_waiting_counts(conn: sqlite3.Connection) -> tuple[int, int]:
-    due = conn.execute(
+def due_waiting_counts(conn: sqlite3.Connection, *, now_epoch: int | None = None) -> tuple[int, int]:
+    """Due/waiting counts; with ``now_epoch`` elapsed waiting tasks count as due."""
+    row = conn.execute(
         """
-        SELECT COUNT(*) AS c
+        SELECT
+            COALESCE(SUM(status = 'due' OR COALESCE(next_review_at <= :now, 0)), 0) AS due,
+            COALESCE(SUM(status = 'waiting' AND NOT COALESCE(next_review_at <= :now, 0)), 0) AS waiting
         FROM tasks
-        WHERE deleted_at IS NULL AND purged_at IS NULL AND status = 'due'
-        """
-    ).fetchone()["c"]
-    waiting = conn.execute(
+        WHERE deleted_at IS NULL AND purged_at IS NULL AND status IN ('due', 'waiting')
+        """,
+        {"now": now_epoch},
+    ).fetchone()
+    return int(row["due"]), int(row["waiting"])
+
+
+def db_stats(conn: sqlite3.Connection, *, now_epoch: int) -> dict[str, int | None]:
+    """Task/event/tag totals; due and waiting as of ``now_epoch``."""
+    due, waiting = due_waiting_counts(conn, now_epoch=now_epoch)
+    row = conn.execute(
         """
-        SELECT COUNT(*) AS c
-        FROM tasks
-        WHERE deleted_at IS NULL AND purged_at IS NULL AND status = 'waiting'
+        SELECT
+            (SELECT COUNT(*) FROM tasks WHERE status = 'archived' AND purged_at IS NULL) AS archived,
+            (SELECT COUNT(*) FROM tasks WHERE purged_at IS NOT NULL) AS purged,
+            (SELECT COUNT(*) FROM completion_events) AS events,
+            (SELECT COUNT(*) FROM task_tags) AS tags
         """
-    ).fetchone()["c"]
-    return int(due), int(waiting)
+    ).fetchone()
+    return {
+        "due": due,
+        "waiting": waiting,
+        "archived": int(row["archived"]),
+        "purged": int(row["purged"]),
+        "events": int(row["events"]),
+        "tags": int(row["tags"]),
+        "next_due_at": next_due_epoch(conn),
+    }
 
 
 def add_completion_event(
     conn: sqlite3.Connection,
     *,
-    task_id: str,
+    task_id: int,
     completed_at: datetime,
     grade: str,
-) -> str:
+) -> int:
     if grade not in VALID_GRADES:
         raise ValueError(f"invalid grade: {grade}")
 
-    event_id = _uuid()
-    conn.execute(
+    completed_epoch = to_epoch_seconds(completed_at)
+    cur = conn.execute(
         """
-        INSERT INTO completion_events(id, task_id, completed_at, grade)
-        VALUES(:id, :task_id, :completed_at, :grade)
+        INSERT INTO completion_events(task_id, completed_at, grade)
+        VALUES(:task_id, :completed_at, :grade)
         """,
         {
-            "id": event_id,
             "task_id": task_id,
-            "completed_at": to_epoch_seconds(completed_at),
+            "completed_at": completed_epoch,
+            "grade": grade,
+        },
+    )
+
+    state = activation_state(conn, task_id=task_id)
+    latest = state.last_at is None or completed_epoch >= state.last_at
+    state = state.with_event(completed_epoch, keep=ACTIVATION_RECENT_EVENTS)
+    conn.execute(
+        """
+        UPDATE tasks
+        SET act_recent = :recent,
+            act_tail_count = :tail_count,
+            act_first_at = :first_at,
+            last_grade = CASE WHEN :latest THEN :grade ELSE last_grade END
+        WHERE id = :id
+        """,
+        {
+            "id": task_id,
+            "recent": _encode_recent(state.recent),
+            "tail_count": state.tail_count,
+            "first_at": state.first_at,
+            "latest": latest,
             "grade": grade,
         },
     )
-    return event_id
+    return int(cur.lastrowid)
+
+
+def activation_state(conn: sqlite3.Connection, *, task_id: int) -> ActivationState:
+    row = conn.execute(
+        "SELECT act_recent, act_tail_count, act_first_at FROM tasks WHERE id = :id",
+        {"id": task_id},
+    ).fetchone()
+    if not row:
+        return ActivationState()
+    return ActivationState(
+        recent=_decode_recent(row["act_recent"]),
+        tail_count=int(row["act_tail_count"]),
+        first_at=row["act_first_at"],
+    )
 
 
-def completion_history(conn: sqlite3.Connection, *, task_id: str) -> list[tuple[int, str]]:
+def rebuild_activation_state(
+    conn: sqlite3.Connection,
+    *,
+    task_id: int | None = None,
+    task_ids: list[int] | None = None,
+) -> None:
+    """Recompute the compact activation columns from completion_events
+    (of ``task_id``, or ``task_ids``, or every task)."""
+    if task_id is not None:
+        where = "WHERE id = :id"
+    elif task_ids is not None:
+        where = "WHERE id IN (SELECT value FROM json_each(:ids))"
+    else:
+        where = ""
+    conn.execute(
+        f"""
+        UPDATE tasks
+        SET act_recent = COALESCE((
+                SELECT GROUP_CONCAT(completed_at, ',')
+                FROM (
+                    SELECT ce.completed_at
+                    FROM completion_events ce
+                    WHERE ce.task_id = tasks.id
+                    ORDER BY ce.completed_at DESC
+                    LIMIT :keep
+                )
+            ), ''),
+            act_tail_count = MAX(
+                (SELECT COUNT(*) FROM completion_events ce WHERE ce.task_id = tasks.id) - :keep,
+                0
+            ),
+            act_first_at = (
+                SELECT MIN(ce.completed_at) FROM completion_events ce WHERE ce.task_id = tasks.id
+            ),
+            last_grade = (
+                SELECT ce.grade
+                FROM completion_events ce
+                WHERE ce.task_id = tasks.id
+                ORDER BY ce.completed_at DESC
+                LIMIT 1
+            )
+        {where}
+        """,
+        {"id": task_id, "ids": json.dumps(task_ids), "keep": ACTIVATION_RECENT_EVENTS},
+    )
+
+
+def _encode_recent(recent: tuple[int, ...]) -> str:
+    return ",".join(str(ep) for ep in recent)
+
+
+def _decode_recent(text: str | None) -> tuple[int, ...]:
+    if not text:
+        return ()
+    return tuple(sorted(int(ep) for ep in text.split(",")))
+
+
+def completion_history(conn: sqlite3.Connection, *, task_id: int) -> list[tuple[int, str]]:
     rows = conn.execute(
         """
         SELECT completed_at, grade
@@ -261,7 +472,7 @@ def completion_history(conn: sqlite3.Connection, *, task_id: str) -> list[tuple[
     return [(int(r["completed_at"]), str(r["grade"])) for r in rows]
 
 
-def set_task_waiting(conn: sqlite3.Connection, *, task_id: str, next_review_at: int, now: int) -> None:
+def set_task_waiting(conn: sqlite3.Connection, *, task_id: int, next_review_at: int, now: int) -> None:
     conn.execute(
         """
         UPDATE tasks
@@ -272,23 +483,171 @@ def set_task_waiting(conn: sqlite3.Connection, *, task_id: str, next_review_at:
     )
 
 
-def update_due_from_waiting(conn: sqlite3.Connection, *, now_epoch: int) -> int:
+def load_history_batch(conn: sqlite3.Connection, *, task_ids: list[int] | None = None) -> HistoryBatch:
+    """Stream every active task's history (or that of ``task_ids``) in one ordered pass."""
     cur = conn.execute(
+        f"""
+        SELECT ce.task_id, ce.completed_at, ce.grade
+        FROM completion_events ce
+        JOIN tasks t ON t.id = ce.task_id
+        WHERE t.deleted_at IS NULL
+          AND t.purged_at IS NULL
+          AND t.status IN ('due', 'waiting')
+          {_only_tasks("t.id", task_ids)}
+        ORDER BY ce.task_id, ce.completed_at
+        """,
+        {"ids": json.dumps(task_ids)},
+    )
+
+    found: list[int] = []
+    last_grades: list[str] = []
+    event_epochs = array("q")
+    offsets = array("q", [0])
+
+    current: int | None = None
+    for task_id, completed_at, grade in cur:
+        if task_id != current:
+            if current is not None:
+                offsets.append(len(event_epochs))
+            current = task_id
+            found.append(task_id)
+            last_grades.append(grade)
+        event_epochs.append(int(completed_at))
+        last_grades[-1] = grade
+
+    if current is not None:
+        offsets.append(len(event_epochs))
+
+    return HistoryBatch(
+        task_ids=found,
+        last_grades=last_grades,
+        event_epochs=event_epochs,
+        offsets=offsets,
+    )
+
+
+def load_activation_batch(conn: sqlite3.Connection, *, task_ids: list[int] | None = None) -> HistoryBatch:
+    """Like load_history_batch, but from the compact state on tasks only."""
+    cur = conn.execute(
+        f"""
+        SELECT id, act_recent, act_tail_count, act_first_at, last_grade
+        FROM tasks
+        WHERE deleted_at IS NULL
+          AND purged_at IS NULL
+          AND status IN ('due', 'waiting')
+          AND act_recent != ''
+          {_only_tasks("id", task_ids)}
+        """,
+        {"ids": json.dumps(task_ids)},
+    )
+
+    found: list[int] = []
+    last_grades: list[str] = []
+    event_epochs = array("q")
+    offsets = array("q", [0])
+    tail_counts = array("q")
+    first_epochs = array("q")
+
+    for task_id, recent, tail_count, first_at, last_grade in cur:
+        found.append(task_id)
+        last_grades.append(last_grade or "")
+        event_epochs.extend(_decode_recent(recent))
+        offsets.append(len(event_epochs))
+        tail_counts.append(int(tail_count))
+        first_epochs.append(int(first_at))
+
+    return HistoryBatch(
+        task_ids=found,
+        last_grades=last_grades,
+        event_epochs=event_epochs,
+        offsets=offsets,
+        tail_counts=tail_counts,
+        first_epochs=first_epochs,
+    )
+
+
+def set_tasks_waiting_many(
+    conn: sqlite3.Connection,
+    *,
+    updates: Iterable[tuple[int, int]],
+    now: int,
+) -> None:
+    conn.executemany(
         """
         UPDATE tasks
+        SET status = 'waiting', next_review_at = ?, updated_at = ?
+        WHERE id = ?
+        """,
+        ((next_review_at, now, task_id) for task_id, next_review_at in updates),
+    )
+
+
+def _only_tasks(column: str, task_ids: list[int] | None) -> str:
+    """Extra WHERE condition limiting ``column`` to ``task_ids`` (bound as :ids), if given."""
+    return "" if task_ids is None else f"AND {column} IN (SELECT value FROM json_each(:ids))"
+
+
+def reset_unreviewed_tasks(
+    conn: sqlite3.Connection,
+    *,
+    now_epoch: int,
+    from_state: bool = False,
+    task_ids: list[int] | None = None,
+) -> int:
+    if from_state:
+        no_history = "act_recent = ''"
+    else:
+        no_history = "NOT EXISTS (SELECT 1 FROM completion_events ce WHERE ce.task_id = tasks.id)"
+    cur = conn.execute(
+        f"""
+        UPDATE tasks
+        SET status = 'due', next_review_at = NULL, updated_at = :now
+        WHERE deleted_at IS NULL
+          AND purged_at IS NULL
+          AND status IN ('due', 'waiting')
+          AND {no_history}
+          {_only_tasks("id", task_ids)}
+        """,
+        {"now": now_epoch, "ids": json.dumps(task_ids)},
+    )
+    return int(cur.rowcount)
+
+
+def update_due_from_waiting(conn: sqlite3.Connection, *, now_epoch: int, task_ids: list[int] | None = None) -> int:
+    cur = conn.execute(
+        f"""
+        UPDATE tasks
         SET status = 'due', updated_at = :now
         WHERE status = 'waiting'
           AND deleted_at IS NULL
           AND purged_at IS NULL
           AND next_review_at IS NOT NULL
           AND next_review_at <= :now
+          {_only_tasks("id", task_ids)}
         """,
-        {"now": now_epoch},
+        {"now": now_epoch, "ids": json.dumps(task_ids)},
     )
     return int(cur.rowcount)
 
 
-def archive_task(conn: sqlite3.Connection, *, task_id: str, now_epoch: int) -> None:
+def next_due_epoch(conn: sqlite3.Connection) -> int | None:
+    """Earliest next_review_at among waiting tasks (walks idx_tasks_status_next_review)."""
+    row = conn.execute(
+        """
+        SELECT next_review_at
+        FROM tasks
+        WHERE status = 'waiting'
+          AND next_review_at IS NOT NULL
+          AND deleted_at IS NULL
+          AND purged_at IS NULL
+        ORDER BY next_review_at
+        LIMIT 1
+        """
+    ).fetchone()
+    return int(row[0]) if row else None
+
+
+def archive_task(conn: sqlite3.Connection, *, task_id: int, now_epoch: int) -> None:
     conn.execute(
         """
         UPDATE tasks
@@ -303,7 +662,7 @@ def archive_task(conn: sqlite3.Connection, *, task_id: str, now_epoch: int) -> N
     )
 
 
-def restore_task(conn: sqlite3.Connection, *, task_id: str, now_epoch: int) -> None:
+def restore_task(conn: sqlite3.Connection, *, task_id: int, now_epoch: int) -> None:
     conn.execute(
         """
         UPDATE tasks
@@ -321,7 +680,7 @@ def restore_task(conn: sqlite3.Connection, *, task_id: str, now_epoch: int) -> N
     )
 
 
-def purge_task(conn: sqlite3.Connection, *, task_id: str, now_epoch: int) -> None:
+def purge_task(conn: sqlite3.Connection, *, task_id: int, now_epoch: int) -> None:
     conn.execute(
         """
         UPDATE tasks
@@ -344,22 +703,21 @@ def normalize_tag(name: str) -> str:
     return name
 
 
-def ensure_tag(conn: sqlite3.Connection, *, name: str, now_epoch: int) -> str:
+def ensure_tag(conn: sqlite3.Connection, *, name: str, now_epoch: int) -> int:
     name = normalize_tag(name)
-    tag_id = _uuid()
     conn.execute(
         """
-        INSERT INTO task_tags(id, name, created_at)
-        VALUES(:id, :name, :now)
+        INSERT INTO task_tags(name, created_at)
+        VALUES(:name, :now)
         ON CONFLICT(name) DO NOTHING
         """,
-        {"id": tag_id, "name": name, "now": now_epoch},
+        {"name": name, "now": now_epoch},
     )
     row = conn.execute("SELECT id FROM task_tags WHERE name = :name", {"name": name}).fetchone()
-    return str(row["id"])
+    return int(row["id"])
 
 
-def tag_count(conn: sqlite3.Connection, *, task_id: str) -> int:
+def tag_count(conn: sqlite3.Connection, *, task_id: int) -> int:
     row = conn.execute(
         "SELECT COUNT(*) AS cnt FROM task_tag_map WHERE task_id = :task_id",
         {"task_id": task_id},
@@ -367,41 +725,185 @@ def tag_count(conn: sqlite3.Connection, *, task_id: str) -> int:
     return int(row["cnt"])
 
 
-def add_tag_to_task(conn: sqlite3.Connection, *, task_id: str, tag_name: str, now_epoch: int) -> None:
-    if tag_count(conn, task_id=task_id) >= 5:
-        raise ValueError("tag limit reached (max 5)")
-    tag_id = ensure_tag(conn, name=tag_name, now_epoch=now_epoch)
-    conn.execute(
-        "INSERT OR IGNORE INTO task_tag_map(task_id, tag_id) VALUES(:task_id, :tag_id)",
-        {"task_id": task_id, "tag_id": tag_id},
-    )
-
-
-def remove_tag_from_task(conn: sqlite3.Connection, *, task_id: str, tag_name: str) -> None:
-    tag_name = normalize_tag(tag_name)
-    row = conn.execute("SELECT id FROM task_tags WHERE name = :name", {"name": tag_name}).fetchone()
-    if not row:
-        return
-    conn.execute(
-        "DELETE FROM task_tag_map WHERE task_id = :task_id AND tag_id = :tag_id",
-        {"task_id": task_id, "tag_id": row["id"]},
-    )
+class TagCache:
+    """Tag name -> id and task -> tag ids, as read or written through it.
 
+    Keep one per connection and route that connection's tag-map writes
+    through it. A commit by another connection (PRAGMA data_version) drops
+    everything; call clear() when a transaction that used it rolls back.
+    """
 
-def _view_where_and_order(view: str) -> tuple[str, str]:
+    def __init__(self) -> None:
+        self._data_version: int | None = None
+        self._tag_ids: dict[str, int] = {}
+        self._task_tags: dict[int, set[int]] = {}
+
+    def clear(self) -> None:
+        self._data_version = None
+        self._tag_ids.clear()
+        self._task_tags.clear()
+
+    def sync(self, conn: sqlite3.Connection) -> None:
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._data_version:
+            self.clear()
+            self._data_version = version
+
+    def tag_ids(self, conn: sqlite3.Connection, names: list[str], *, create_at: int | None = None) -> dict[str, int]:
+        """Ids of the (normalized) names; missing tags are created when
+        ``create_at`` is given and left out otherwise."""
+        missing = [n for n in names if n not in self._tag_ids]
+        if missing:
+            self._load_tag_ids(conn, missing)
+            missing = [n for n in missing if n not in self._tag_ids]
+        if missing and create_at is not None:
+            conn.executemany(
+                "INSERT INTO task_tags(name, created_at) VALUES(?, ?) ON CONFLICT(name) DO NOTHING",
+                [(n, create_at) for n in missing],
+            )
+            self._load_tag_ids(conn, missing)
+        return {n: self._tag_ids[n] for n in names if n in self._tag_ids}
+
+    def task_tags(self, conn: sqlite3.Connection, task_ids: list[int]) -> dict[int, set[int]]:
+        """Tag ids on each task; callers may mutate the returned sets."""
+        missing = [t for t in task_ids if t not in self._task_tags]
+        if missing:
+            for task_id in missing:
+                self._task_tags[task_id] = set()
+            for task_id, tag_id in conn.execute(
+                "SELECT task_id, tag_id FROM task_tag_map WHERE task_id IN (SELECT value FROM json_each(?))",
+                (json.dumps(missing),),
+            ):
+                self._task_tags[task_id].add(tag_id)
+        return {t: self._task_tags[t] for t in task_ids}
+
+    def _load_tag_ids(self, conn: sqlite3.Connection, names: list[str]) -> None:
+        for tag_id, name in conn.execute(
+            "SELECT id, name FROM task_tags WHERE name IN (SELECT value FROM json_each(?))",
+            (json.dumps(names),),
+        ):
+            self._tag_ids[name] = tag_id
+
+
+def _tag_names(names: Iterable[str]) -> list[str]:
+    return [n for n in dict.fromkeys(normalize_tag(n) for n in names) if n]
+
+
+def add_tags_to_tasks(
+    conn: sqlite3.Connection,
+    *,
+    task_ids: Iterable[int],
+    tag_names: Iterable[str],
+    now_epoch: int,
+    cache: TagCache | None = None,
+) -> int:
+    """Put every tag on every task; returns the number of pairs added.
+
+    Raises ValueError before writing anything if a task would end up with
+    more than MAX_TAGS_PER_TASK tags.
+    """
+    cache = cache or TagCache()
+    cache.sync(conn)
+    task_ids = list(dict.fromkeys(task_ids))
+    names = _tag_names(tag_names)
+    if not task_ids or not names:
+        return 0
+
+    known = cache.tag_ids(conn, names)
+    current = cache.task_tags(conn, task_ids)
+    for task_id, tag_ids in current.items():
+        new = sum(1 for n in names if known.get(n) not in tag_ids)
+        if new and len(tag_ids) + new > MAX_TAGS_PER_TASK:
+            raise ValueError(f"tag limit reached (max {MAX_TAGS_PER_TASK})")
+
+    ids = cache.tag_ids(conn, names, create_at=now_epoch)
+    pairs = [(task_id, ids[n]) for task_id in task_ids for n in names if ids[n] not in current[task_id]]
+    conn.executemany("INSERT OR IGNORE INTO task_tag_map(task_id, tag_id) VALUES(?, ?)", pairs)
+    for task_id, tag_id in pairs:
+        current[task_id].add(tag_id)
+    return len(pairs)
+
+
+def remove_tags_from_tasks(
+    conn: sqlite3.Connection,
+    *,
+    task_ids: Iterable[int],
+    tag_names: Iterable[str],
+    cache: TagCache | None = None,
+) -> int:
+    """Take the tags off every task; returns the number of pairs removed."""
+    cache = cache or TagCache()
+    cache.sync(conn)
+    task_ids = list(dict.fromkeys(task_ids))
+    ids = cache.tag_ids(conn, _tag_names(tag_names))
+    if not task_ids or not ids:
+        return 0
+
+    current = cache.task_tags(conn, task_ids)
+    pairs = [(task_id, tag_id) for task_id in task_ids for tag_id in ids.values() if tag_id in current[task_id]]
+    conn.executemany("DELETE FROM task_tag_map WHERE task_id = ? AND tag_id = ?", pairs)
+    for task_id, tag_id in pairs:
+        current[task_id].discard(tag_id)
+    return len(pairs)
+
+
+def add_tag_to_task(
+    conn: sqlite3.Connection, *, task_id: int, tag_name: str, now_epoch: int, cache: TagCache | None = None
+) -> None:
+    add_tags_to_tasks(conn, task_ids=[task_id], tag_names=[tag_name], now_epoch=now_epoch, cache=cache)
+
+
+def remove_tag_from_task(
+    conn: sqlite3.Connection, *, task_id: int, tag_name: str, cache: TagCache | None = None
+) -> None:
+    remove_tags_from_tasks(conn, task_ids=[task_id], tag_names=[tag_name], cache=cache)
+
+
+# (expression, descending) per view; the trailing id makes the order total so
+# that keyset pagination never skips or repeats rows.
+_VIEW_SORT_KEYS: dict[str, tuple[tuple[str, bool], ...]] = {
+    "due": (
+        ("(t.next_review_at IS NULL)", False),
+        ("COALESCE(t.next_review_at, 0)", False),
+        ("t.updated_at", False),
+        ("t.id", False),
+    ),
+    "waiting": (
+        ("(t.next_review_at IS NULL)", False),
+        ("COALESCE(t.next_review_at, 0)", True),
+        ("t.updated_at", True),
+        ("t.id", True),
+    ),
+    "archived": (
+        ("t.deleted_at", True),
+        ("t.updated_at", True),
+        ("t.id", True),
+    ),
+}
+
+
+def _view_where_and_order(view: str, *, elapsed_as_due: bool = False) -> tuple[str, str]:
+    # With elapsed_as_due, waiting tasks whose next_review_at <= :now are
+    # listed as due before update_due_from_waiting has persisted it.
+    live = "t.deleted_at IS NULL AND t.purged_at IS NULL"
     if view == "due":
-        base_where = "t.deleted_at IS NULL AND t.purged_at IS NULL AND t.status = 'due'"
-        order_by = "CASE WHEN t.next_review_at IS NULL THEN 1 ELSE 0 END, t.next_review_at ASC, t.updated_at ASC"
-        return base_where, order_by
-
-    if view == "waiting":
-        base_where = "t.deleted_at IS NULL AND t.purged_at IS NULL AND t.status = 'waiting'"
-        order_by = "CASE WHEN t.next_review_at IS NULL THEN 1 ELSE 0 END, t.next_review_at DESC, t.updated_at DESC"
-        return base_where, order_by
-
-    if view == "archived":
+        if elapsed_as_due:
+            base_where = (
+                f"{live} AND (t.status = 'due' OR "
+                "(t.status = 'waiting' AND t.next_review_at IS NOT NULL AND t.next_review_at <= :now))"
+            )
+        else:
+            base_where = f"{live} AND t.status = 'due'"
+    elif view == "waiting":
+        base_where = f"{live} AND t.status = 'waiting'"
+        if elapsed_as_due:
+            base_where += " AND (t.next_review_at IS NULL OR t.next_review_at > :now)"
+    elif view == "archived":
         base_where = "t.deleted_at IS NOT NULL AND t.purged_at IS NULL AND t.status = 'archived'"
-        order_by = "t.deleted_at DESC, t.updated_at DESC"
-        return base_where, order_by
+    else:
+        raise ValueError(f"invalid view: {view}")
 
-    raise ValueError(f"invalid view: {view}")
+    order_by = ", ".join(
+        f"{expr} {'DESC' if descending else 'ASC'}" for expr, descending in _VIEW_SORT_KEYS[view]
+    )
+    return base_where, order_by
@@ -5,7 +5,7 @@ from dataclasses import dataclass
 from datetime import datetime, timedelta
 
 from taskmaster.constants import DEFAULT_DECAY_D, DEFAULT_NOISE_S, DEFAULT_TAU
-from taskmaster.timeutil import ceil_to_minute, ensure_min_gap
+from taskmaster.timeutil import ceil_to_minute, ensure_min_gap, to_epoch_seconds
 
 
 @dataclass(frozen=True)
@@ -39,6 +39,62 @@ def recall_prob(B: float, tau: float, s: float) -> float:
     return 1.0 / (1.0 + math.exp(-((B - tau) / s)))
 
 
+@dataclass(frozen=True)
+class ActivationState:
+    """Constant-size summary of a completion history (Petrov 2006 hybrid).
+
+    The newest events are kept exactly in ``recent`` (ascending epoch seconds);
+    everything older is reduced to ``tail_count`` plus the first event time.
+    """
+
+    recent: tuple[int, ...] = ()
+    tail_count: int = 0
+    first_at: int | None = None
+
+    @property
+    def count(self) -> int:
+        return len(self.recent) + self.tail_count
+
+    @property
+    def last_at(self) -> int | None:
+        return self.recent[-1] if self.recent else None
+
+    def with_event(self, epoch: int, *, keep: int) -> ActivationState:
+        recent = sorted(self.recent + (int(epoch),))
+        tail_count = self.tail_count
+        while len(recent) > keep:
+            recent.pop(0)
+            tail_count += 1
+        first_at = int(epoch) if self.first_at is None else min(self.first_at, int(epoch))
+        return ActivationState(recent=tuple(recent), tail_count=tail_count, first_at=first_at)
+
+
+def approx_history_sum(state: ActivationState, eval_epoch: int, d: float) -> float:
+    """Approximate sum of (eval - t_k)^-d over the whole history, in days."""
+    total = 0.0
+    for t_k in state.recent:
+        total += max((eval_epoch - t_k) / 86400.0, _MIN_DELTA_DAYS) ** (-d)
+    if state.tail_count and state.recent and state.first_at is not None:
+        total += _tail_sum(
+            state.tail_count,
+            max((eval_epoch - state.recent[0]) / 86400.0, _MIN_DELTA_DAYS),
+            max((eval_epoch - state.first_at) / 86400.0, _MIN_DELTA_DAYS),
+            d,
+        )
+    return total
+
+
+def _tail_sum(count: int, age_k: float, age_n: float, d: float) -> float:
+    # The older events are assumed to be spread evenly between the oldest
+    # exactly kept event (age_k) and the first event (age_n); integrating
+    # t^-d over that span gives Petrov's closed form.
+    if age_n - age_k <= _MIN_DELTA_DAYS:
+        return count * age_n ** (-d)
+    if d == 1.0:
+        return count * (math.log(age_n) - math.log(age_k)) / (age_n - age_k)
+    return count * (age_n ** (1.0 - d) - age_k ** (1.0 - d)) / ((1.0 - d) * (age_n - age_k))
+
+
 def find_next_review(
     history_times: list[datetime],
     now: datetime,
@@ -80,3 +136,240 @@ def find_next_review(
     result = now + timedelta(days=hi)
     result = ensure_min_gap(result, now, min_seconds=60)
     return ceil_to_minute(result)
+
+
+def solve_next_review(
+    history_times: list[datetime],
+    now: datetime,
+    *,
+    d: float,
+    tau: float,
+    s: float,
+    p_target: float,
+    horizon_days: int,
+    max_search_days: float = 365.0,
+    iters: int = 40,
+) -> datetime:
+    """Same result as find_next_review, without re-summing the history per step.
+
+    The history contribution at T_target is summed once. The recall target is
+    inverted to the activation term the new event must add, which gives the
+    candidate time in closed form; that estimate is then snapped onto the
+    bisection grid so the returned minute is identical to find_next_review.
+    """
+    if now.tzinfo is None:
+        raise ValueError("now must be timezone-aware")
+
+    if not history_times:
+        raise ValueError("history_times must not be empty")
+
+    T_target = now + timedelta(days=horizon_days)
+
+    hist_sum = 0.0
+    for t_k in history_times:
+        hist_sum += _delta_days(T_target, t_k) ** (-d)
+
+    return _solve_from_history_sum(
+        hist_sum,
+        now,
+        T_target,
+        d=d,
+        tau=tau,
+        s=s,
+        p_target=p_target,
+        max_search_days=max_search_days,
+        iters=iters,
+    )
+
+
+def solve_next_review_from_state(
+    state: ActivationState,
+    now: datetime,
+    *,
+    d: float,
+    tau: float,
+    s: float,
+    p_target: float,
+    horizon_days: int,
+    max_search_days: float = 365.0,
+    iters: int = 40,
+) -> datetime:
+    """solve_next_review on the approximate activation of a compact state."""
+    if now.tzinfo is None:
+        raise ValueError("now must be timezone-aware")
+
+    if not state.recent:
+        raise ValueError("activation state must not be empty")
+
+    T_target = now + timedelta(days=horizon_days)
+    hist_sum = approx_history_sum(state, to_epoch_seconds(T_target), d)
+
+    return _solve_from_history_sum(
+        hist_sum,
+        now,
+        T_target,
+        d=d,
+        tau=tau,
+        s=s,
+        p_target=p_target,
+        max_search_days=max_search_days,
+        iters=iters,
+    )
+
+
+def _solve_from_history_sum(
+    hist_sum: float,
+    now: datetime,
+    T_target: datetime,
+    *,
+    d: float,
+    tau: float,
+    s: float,
+    p_target: float,
+    max_search_days: float,
+    iters: int,
+) -> datetime:
+    # find_next_review only ever probes multiples of `step`; its answer is the
+    # smallest such multiple k * step (k >= 1) whose candidate meets p_target,
+    # or max_search_days when none does.
+    n_steps = 2**iters
+    step = float(max_search_days) / n_steps
+
+    def meets_target(k: int) -> bool:
+        candidate_time = ensure_min_gap(now + timedelta(days=k * step), now, min_seconds=60)
+        B_future = math.log(hist_sum + _delta_days(T_target, candidate_time) ** (-d))
+        return recall_prob(B_future, tau, s) >= p_target
+
+    if p_target <= 0.0:
+        guess = 1
+    elif p_target >= 1.0:
+        guess = n_steps
+    else:
+        # recall_prob(B) = p  <=>  B = tau + s * logit(p)
+        required_term = math.exp(tau + s * math.log(p_target / (1.0 - p_target))) - hist_sum
+        if required_term <= 0.0:
+            guess = 1
+        else:
+            gap_days = required_term ** (-1.0 / d)
+            if gap_days < _MIN_DELTA_DAYS:
+                guess = n_steps
+            else:
+                span_days = (T_target - now).total_seconds() / 86400.0
+                guess = math.ceil((span_days - gap_days) / step)
+
+    k = _smallest_passing_step(meets_target, guess, n_steps)
+
+    result = now + timedelta(days=k * step)
+    result = ensure_min_gap(result, now, min_seconds=60)
+    return ceil_to_minute(result)
+
+
+def _smallest_passing_step(meets_target, guess: int, n_steps: int) -> int:
+    # Bracket invariant, as in the bisection: meets_target(lo) is False (or
+    # lo == 0, never probed) and meets_target(hi) is True (or hi == n_steps).
+    lo, hi = 0, n_steps
+    k = min(max(guess, 1), n_steps)
+
+    if k < n_steps and not meets_target(k):
+        lo = k
+        if k + 1 == n_steps or meets_target(k + 1):
+            return k + 1
+        lo = k + 1
+    else:
+        hi = k
+        if k == 1 or not meets_target(k - 1):
+            return k
+        hi = k - 1
+
+    # The closed form was off (clamped by the 1-minute gap, the search cap or
+    # rounding): finish with a bracketed bisection on the same grid.
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if meets_target(mid):
+            hi = mid
+        else:
+            lo = mid
+    return hi
+
+
+def find_next_reviews_batch(
+    event_epochs,
+    offsets,
+    now_epochs,
+    p_targets,
+    *,
+    d: float,
+    tau: float,
+    s: float,
+    horizon_days: int,
+    max_search_days: float = 365.0,
+    iters: int = 40,
+    tail_counts=None,
+    first_epochs=None,
+):
+    """Vectorized find_next_review over many tasks at once.
+
+    Task i owns ``event_epochs[offsets[i]:offsets[i + 1]]`` (epoch seconds,
+    ascending); ``now_epochs`` and ``p_targets`` are per task. Returns an int64
+    array of next review epochs, ceiled to the minute like find_next_review.
+
+    With ``tail_counts``/``first_epochs`` the events are the ``recent`` part of
+    each task's ActivationState and the tail is added approximately.
+    """
+    import numpy as np
+
+    events = np.asarray(event_epochs, dtype=np.float64)
+    bounds = np.asarray(offsets, dtype=np.int64)
+    now = np.asarray(now_epochs, dtype=np.int64)
+    p_target = np.asarray(p_targets, dtype=np.float64)
+
+    n = len(bounds) - 1
+    if n <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    counts = np.diff(bounds)
+    if (counts <= 0).any():
+        raise ValueError("every task needs at least one completion event")
+
+    now_f = now.astype(np.float64)
+    t_target = now_f + horizon_days * 86400.0
+
+    # The history part of the activation sum does not depend on the candidate,
+    # so it is computed once per task instead of once per bisection step.
+    owner = np.repeat(np.arange(n), counts)
+    hist_delta = np.maximum((t_target[owner] - events) / 86400.0, _MIN_DELTA_DAYS)
+    hist_sum = np.add.reduceat(hist_delta ** (-d), bounds[:-1])
+
+    if tail_counts is not None:
+        tail = np.asarray(tail_counts, dtype=np.float64)
+        age_k = np.maximum((t_target - events[bounds[:-1]]) / 86400.0, _MIN_DELTA_DAYS)
+        age_n = np.maximum(
+            (t_target - np.asarray(first_epochs, dtype=np.float64)) / 86400.0,
+            _MIN_DELTA_DAYS,
+        )
+        span = age_n - age_k
+        narrow = span <= _MIN_DELTA_DAYS
+        if d == 1.0:
+            spread = (np.log(age_n) - np.log(age_k)) / np.where(narrow, 1.0, span)
+        else:
+            spread = (age_n ** (1.0 - d) - age_k ** (1.0 - d)) / ((1.0 - d) * np.where(narrow, 1.0, span))
+        hist_sum = hist_sum + tail * np.where(narrow, age_n ** (-d), spread)
+
+    lo = np.zeros(n)
+    hi = np.full(n, float(max_search_days))
+    min_candidate = now_f + 60.0
+
+    for _ in range(iters):
+        mid = (lo + hi) / 2.0
+        candidate = np.maximum(now_f + mid * 86400.0, min_candidate)
+        term = np.maximum((t_target - candidate) / 86400.0, _MIN_DELTA_DAYS) ** (-d)
+        p = 1.0 / (1.0 + np.exp(-((np.log(hist_sum + term) - tau) / s)))
+        ok = p >= p_target
+        hi = np.where(ok, mid, hi)
+        lo = np.where(ok, lo, mid)
+
+    # Same rounding as the scalar path: timedelta keeps microseconds, then the
+    # 1-minute gap is applied and the result is ceiled to the minute.
+    total_us = now * 1_000_000 + np.rint(hi * 86_400_000_000.0).astype(np.int64)
+    total_us = np.maximum(total_us, (now + 60) * 1_000_000)
+    return -(-total_us // 60_000_000) * 60
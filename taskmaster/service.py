@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime
+
+from taskmaster.constants import (
+    ACTIVATION_RECENT_EVENTS,
+    DEFAULT_DECAY_D,
+    DEFAULT_NOISE_S,
+    DEFAULT_P_TARGET,
+    DEFAULT_TAU,
+    GRADE_P_TARGET,
+)
+from taskmaster.repository import (
+    activation_state,
+    add_completion_event,
+    completion_history,
+    load_activation_batch,
+    load_history_batch,
+    reset_unreviewed_tasks,
+    set_task_waiting,
+    set_tasks_waiting_many,
+    update_due_from_waiting,
+)
+from taskmaster.scheduler import (
+    find_next_reviews_batch,
+    solve_next_review,
+    solve_next_review_from_state,
+)
+from taskmaster.timeutil import (
+    ceil_to_minute,
+    ensure_min_gap,
+    from_epoch_seconds,
+    to_epoch_seconds,
+)
+
+
+def complete_task(
+    conn: sqlite3.Connection,
+    *,
+    task_id: int,
+    grade: str,
+    now: datetime,
+    horizon_days: int,
+    approximate: bool = False,
+) -> datetime:
+    """Record a completion and move the task to waiting.
+
+    With ``approximate`` the schedule is computed from the compact activation
+    state on ``tasks`` and completion_events is never read. Returns the new
+    next_review_at. The caller owns the transaction.
+    """
+    if approximate:
+        state = activation_state(conn, task_id=task_id)
+        last_epoch = state.last_at
+    else:
+        history = completion_history(conn, task_id=task_id)
+        last_epoch = history[-1][0] if history else None
+
+    # Ensure min gap for completed_at vs last event
+    completed_at = now
+    if last_epoch is not None:
+        completed_at = ensure_min_gap(completed_at, from_epoch_seconds(last_epoch), min_seconds=60)
+    completed_at = ceil_to_minute(completed_at)
+
+    add_completion_event(conn, task_id=task_id, completed_at=completed_at, grade=grade)
+
+    p_target = float(GRADE_P_TARGET[grade])
+    if approximate:
+        next_dt = solve_next_review_from_state(
+            state.with_event(to_epoch_seconds(completed_at), keep=ACTIVATION_RECENT_EVENTS),
+            completed_at,
+            d=DEFAULT_DECAY_D,
+            tau=DEFAULT_TAU,
+            s=DEFAULT_NOISE_S,
+            p_target=p_target,
+            horizon_days=horizon_days,
+        )
+    else:
+        # The new event is at least a minute after the last one, so it sorts last.
+        history_times = [from_epoch_seconds(ep) for ep, _g in history]
+        history_times.append(completed_at)
+
+        next_dt = solve_next_review(
+            history_times,
+            completed_at,
+            d=DEFAULT_DECAY_D,
+            tau=DEFAULT_TAU,
+            s=DEFAULT_NOISE_S,
+            p_target=p_target,
+            horizon_days=horizon_days,
+        )
+
+    set_task_waiting(
+        conn,
+        task_id=task_id,
+        next_review_at=to_epoch_seconds(next_dt),
+        now=to_epoch_seconds(now),
+    )
+    return next_dt
+
+
+def recalculate_all(
+    conn: sqlite3.Connection,
+    *,
+    now: datetime,
+    horizon_days: int,
+    approximate: bool = False,
+    task_ids: list[int] | None = None,
+) -> int:
+    """Recompute next_review_at for every due/waiting task (or just those
+    of ``task_ids``) in one batch.
+
+    Tasks without history go back to due. With ``approximate`` only the
+    compact activation state on ``tasks`` is read. Returns the number of
+    rescheduled tasks. The caller owns the transaction.
+    """
+    now_epoch = to_epoch_seconds(now)
+
+    reset_unreviewed_tasks(conn, now_epoch=now_epoch, from_state=approximate, task_ids=task_ids)
+
+    if approximate:
+        batch = load_activation_batch(conn, task_ids=task_ids)
+    else:
+        batch = load_history_batch(conn, task_ids=task_ids)
+    if batch.task_ids:
+        last_epochs = [batch.event_epochs[end - 1] for end in batch.offsets[1:]]
+        p_targets = [float(GRADE_P_TARGET.get(g, DEFAULT_P_TARGET)) for g in batch.last_grades]
+
+        next_epochs = find_next_reviews_batch(
+            batch.event_epochs,
+            batch.offsets,
+            last_epochs,
+            p_targets,
+            d=DEFAULT_DECAY_D,
+            tau=DEFAULT_TAU,
+            s=DEFAULT_NOISE_S,
+            horizon_days=horizon_days,
+            tail_counts=batch.tail_counts,
+            first_epochs=batch.first_epochs,
+        )
+        set_tasks_waiting_many(
+            conn,
+            updates=zip(batch.task_ids, next_epochs.tolist()),
+            now=now_epoch,
+        )
+
+    update_due_from_waiting(conn, now_epoch=now_epoch, task_ids=task_ids)
+    return len(batch.task_ids)
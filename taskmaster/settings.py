@@ -1,14 +1,19 @@
 from __future__ import annotations
 
+import configparser
+import os
 from dataclasses import dataclass
 from pathlib import Path
-
-from PySide6.QtCore import QSettings
+from typing import Any
 
 from taskmaster.constants import (
     APP_NAME,
     APP_ORG,
+    CONNECTION_PROFILE_NAMES,
+    DEFAULT_BACKUP_KEEP,
+    DEFAULT_CONNECTION_PROFILE,
     DEFAULT_HORIZON_DAYS,
+    MAX_BACKUP_INTERVAL_HOURS,
     MAX_HORIZON_DAYS,
     MIN_HORIZON_DAYS,
 )
@@ -19,17 +24,40 @@ class AppSettingsSnapshot:
     db_path: str | None
     horizon_days: int
     theme: str
+    approx_activation: bool
+    connection_profile: str
+    instrumentation: bool
+    backup_dir: str
+    backup_interval_hours: int
+    backup_keep: int
+    backup_compress: bool
 
 
 class AppSettings:
-    def __init__(self) -> None:
-        self._q = QSettings(APP_ORG, APP_NAME)
+    def __init__(self, store: Any = None) -> None:
+        if store is None:
+            from PySide6.QtCore import QSettings
+
+            store = QSettings(APP_ORG, APP_NAME)
+        self._q = store
+
+    @classmethod
+    def read_only(cls) -> AppSettings:
+        """The app's saved settings, read without Qt (for the CLI)."""
+        return cls(_IniStore(settings_file_path()))
 
     def snapshot(self) -> AppSettingsSnapshot:
         return AppSettingsSnapshot(
             db_path=self.db_path(),
             horizon_days=self.horizon_days(),
             theme=self.theme(),
+            approx_activation=self.approx_activation(),
+            connection_profile=self.connection_profile(),
+            instrumentation=self.instrumentation(),
+            backup_dir=self.backup_dir(),
+            backup_interval_hours=self.backup_interval_hours(),
+            backup_keep=self.backup_keep(),
+            backup_compress=self.backup_compress(),
         )
 
     def db_path(self) -> str | None:
@@ -56,6 +84,99 @@ class AppSettings:
             return
         self._q.setValue("ui/theme", theme)
 
+    def approx_activation(self) -> bool:
+        return bool(self._q.value("scheduler/approx_activation", False, type=bool))
+
+    def set_approx_activation(self, enabled: bool) -> None:
+        self._q.setValue("scheduler/approx_activation", bool(enabled))
+
+    def connection_profile(self) -> str:
+        value = self._q.value("storage/connection_profile", DEFAULT_CONNECTION_PROFILE, type=str)
+        return value if value in CONNECTION_PROFILE_NAMES else DEFAULT_CONNECTION_PROFILE
+
+    def set_connection_profile(self, name: str) -> None:
+        if name not in CONNECTION_PROFILE_NAMES:
+            return
+        self._q.setValue("storage/connection_profile", name)
+
+    def instrumentation(self) -> bool:
+        return bool(self._q.value("diagnostics/instrumentation", False, type=bool))
+
+    def set_instrumentation(self, enabled: bool) -> None:
+        self._q.setValue("diagnostics/instrumentation", bool(enabled))
+
+    # Scheduled backups: every interval_hours (0 = off) into backup_dir,
+    # keeping the newest backup_keep of them.
+    def backup_dir(self) -> str:
+        return self._q.value("backup/dir", "", type=str) or str(default_backup_dir())
+
+    def backup_interval_hours(self) -> int:
+        value = self._q.value("backup/interval_hours", 0, type=int)
+        return max(0, min(MAX_BACKUP_INTERVAL_HOURS, int(value)))
+
+    def backup_keep(self) -> int:
+        return max(1, int(self._q.value("backup/keep", DEFAULT_BACKUP_KEEP, type=int)))
+
+    def backup_compress(self) -> bool:
+        return bool(self._q.value("backup/compress", False, type=bool))
+
+    def set_backup_schedule(self, *, directory: str, interval_hours: int, keep: int, compress: bool) -> None:
+        self._q.setValue("backup/dir", directory)
+        self._q.setValue("backup/interval_hours", max(0, min(MAX_BACKUP_INTERVAL_HOURS, int(interval_hours))))
+        self._q.setValue("backup/keep", max(1, int(keep)))
+        self._q.setValue("backup/compress", bool(compress))
+
+
+class _IniStore:
+    """Read-only stand-in for QSettings over its native INI file on Linux."""
+
+    def __init__(self, path: Path) -> None:
+        self._parser = configparser.ConfigParser(interpolation=None)
+        self._parser.optionxform = str  # keys are case-sensitive in QSettings
+        try:
+            self._parser.read(path, encoding="utf-8")
+        except configparser.Error:
+            pass
+
+    def value(self, key: str, default: Any = None, type: type = str) -> Any:
+        section, _, name = key.rpartition("/")
+        if not section:
+            section = "General"  # QSettings' section for top-level keys
+        elif section.lower() == "general":
+            section = "%General"  # ...so a group of that name is escaped
+        raw = self._parser.get(section, name, fallback=None)
+        if raw is None:
+            return default
+        raw = raw.strip()
+        if len(raw) >= 2 and raw[0] == raw[-1] == '"':
+            raw = raw[1:-1]
+        if type is bool:
+            return raw.lower() in ("true", "1")
+        if type is int:
+            try:
+                return int(raw)
+            except ValueError:
+                return default
+        return raw
+
+    def setValue(self, key: str, value: Any) -> None:
+        raise RuntimeError("settings are read-only outside the app")
+
+
+def settings_file_path() -> Path:
+    # Where QSettings(APP_ORG, APP_NAME) keeps its INI file on Linux.
+    base = os.environ.get("XDG_CONFIG_HOME") or str(Path.home() / ".config")
+    return Path(base) / APP_ORG / f"{APP_NAME}.conf"
+
+
+def default_metrics_path() -> Path:
+    """Where the instrumentation report is written at exit."""
+    return Path.home() / ".local" / "share" / "taskmaster-metrics.json"
+
+
+def default_backup_dir() -> Path:
+    return Path.home() / ".local" / "share" / "taskmaster-backups"
+
 
 def default_db_path() -> Path:
     base = Path.home() / ".local" / "share"
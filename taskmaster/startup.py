@@ -0,0 +1,59 @@
+"""Startup phase timing.
+
+Phases are measured from begin() (the top of ``python -m taskmaster``):
+import, qapplication, qml_load, first_frame, db_open, first_rows. Each phase
+is logged once to stderr when TASKMASTER_STARTUP_LOG is set, and is recorded
+as "startup: <phase>" when instrumentation is on at that point.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+
+from taskmaster import instrumentation
+
+ENV_VAR = "TASKMASTER_STARTUP_LOG"
+
+_lock = threading.Lock()
+_start: float | None = None
+_last = 0.0
+_phases: dict[str, float] = {}
+
+
+def begin() -> None:
+    """Start the clock (a no-op if it is already running)."""
+    global _start, _last
+    with _lock:
+        if _start is None:
+            _start = _last = time.perf_counter()
+
+
+def mark(phase: str) -> None:
+    """Record the end of ``phase``; later marks of the same phase are ignored.
+
+    Safe to call from any thread (first_frame comes from the render thread).
+    """
+    global _last
+    with _lock:
+        if _start is None or phase in _phases:
+            return
+        now = time.perf_counter()
+        step_ms = (now - _last) * 1000.0
+        total_ms = (now - _start) * 1000.0
+        _last = now
+        _phases[phase] = total_ms
+
+    rec = instrumentation.recorder()
+    if rec is not None:
+        rec.record(f"startup: {phase}", step_ms)
+    if os.environ.get(ENV_VAR, "").strip().lower() not in ("", "0", "false", "no"):
+        print(f"startup: {phase:<12} +{step_ms:8.1f} ms  ({total_ms:8.1f} ms)", file=sys.stderr)
+
+
+def phases() -> dict[str, float]:
+    """Phase -> ms since begin(), in the order reached."""
+    with _lock:
+        return dict(_phases)
@@ -1,32 +1,264 @@
 from __future__ import annotations
 
+from bisect import bisect_left
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Callable
 
-from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt, QTimer
 from PySide6.QtCore import Slot
 
+from taskmaster.instrumentation import timed
 from taskmaster.repository import TaskRow
 from taskmaster.timeutil import format_local, from_epoch_seconds, remaining_until, utc_now
 
 
+# setRows falls back to a full reset once a refresh needs more row operations
+# (inserts + removes + moves) than rows // _DIFF_OPS_DIVISOR, clamped to
+# [_DIFF_MIN_OPS, _DIFF_MAX_OPS].
+_DIFF_MIN_OPS = 64
+_DIFF_MAX_OPS = 1024
+_DIFF_OPS_DIVISOR = 4
+
+# "remaining" is the only clock-dependent column; it shows whole minutes.
+_REMAINING_TICK_MS = 60_000
+
+
 @dataclass(frozen=True)
 class Column:
     header: str
     key: str
 
 
+def _format_epoch(epoch: int | None) -> str:
+    return format_local(from_epoch_seconds(epoch)) if epoch else ""
+
+
+_FORMATTERS: dict[str, Callable[[TaskRow, datetime], str]] = {
+    "title": lambda row, _now: row.title,
+    "last_completed": lambda row, _now: _format_epoch(row.last_completed_at),
+    "review_count": lambda row, _now: str(row.review_count),
+    "next_review_at": lambda row, _now: _format_epoch(row.next_review_at),
+    "remaining": lambda row, now: (
+        remaining_until(now, from_epoch_seconds(row.next_review_at)) if row.next_review_at else ""
+    ),
+    "archived_at": lambda row, _now: _format_epoch(row.deleted_at),
+    "tags": lambda row, _now: row.tags or "",
+}
+
+
 class TaskTableModel(QAbstractTableModel):
     def __init__(self, columns: list[Column], parent=None) -> None:
         super().__init__(parent)
         self._columns = columns
         self._rows: list[TaskRow] = []
+        # task public id -> row; None after a reset until the next lookup
+        # rebuilds it.
+        self._row_of: dict[bytes, int] | None = {}
+        # Display strings, one list per column parallel to _rows, formatted
+        # when rows arrive; data() only indexes into them. "remaining" is
+        # formatted against _now, which the minute tick advances.
+        self._formatters = [_FORMATTERS.get(c.key, lambda _row, _now: "") for c in columns]
+        self._cells: list[list[str]] = [[] for _ in columns]
+        self._now = utc_now()
+        self._remaining_col = next((i for i, c in enumerate(columns) if c.key == "remaining"), None)
+        if self._remaining_col is not None:
+            self._tickTimer = QTimer(self)
+            self._tickTimer.setInterval(_REMAINING_TICK_MS)
+            self._tickTimer.timeout.connect(self._tick_remaining)
+            self._tickTimer.start()
+        # Paging: the model holds a prefix of the view; the page loader is
+        # called with the last loaded row and answers through appendRows.
+        self._has_more = False
+        self._fetching = False
+        self._page_loader: Callable[[TaskRow], None] | None = None
+
+    @timed
+    def setRows(self, rows: list[TaskRow], has_more: bool = False) -> None:  # Qt slot style
+        rows = list(rows)
+        self._has_more = has_more
+        self._fetching = False
+        if self._rows and rows and self._apply_diff(rows):
+            return
+        self._reset(rows)
 
-    def setRows(self, rows: list[TaskRow]) -> None:  # Qt slot style
+    def setPageLoader(self, loader: Callable[[TaskRow], None] | None) -> None:
+        self._page_loader = loader
+
+    def appendRows(self, rows: list[TaskRow], has_more: bool) -> None:
+        self._fetching = False
+        self._has_more = has_more
+        row_of = self._index()
+        rows = [r for r in rows if r.public_id not in row_of]
+        if not rows:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._rows.extend(rows)
+        row_of.update((r.public_id, i) for i, r in enumerate(rows, first))
+        for cells, block in zip(self._cells, self._format(rows)):
+            cells.extend(block)
+        self.endInsertRows()
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:  # type: ignore[override]
+        if parent.isValid():
+            return False
+        return self._has_more and not self._fetching and self._page_loader is not None and bool(self._rows)
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()) -> None:  # type: ignore[override]
+        if not self.canFetchMore(parent):
+            return
+        self._fetching = True
+        self._page_loader(self._rows[-1])
+
+    @Slot()
+    def loadMore(self) -> None:
+        self.fetchMore(QModelIndex())
+
+    def _reset(self, rows: list[TaskRow]) -> None:
         self.beginResetModel()
-        self._rows = list(rows)
+        self._now = utc_now()
+        self._rows = rows
+        self._row_of = None
+        self._cells = self._format(rows)
         self.endResetModel()
 
+    def _index(self) -> dict[bytes, int]:
+        if self._row_of is None:
+            self._row_of = {r.public_id: i for i, r in enumerate(self._rows)}
+        return self._row_of
+
+    def _format(self, rows: list[TaskRow]) -> list[list[str]]:
+        now = self._now
+        return [[fmt(r, now) for r in rows] for fmt in self._formatters]
+
+    def _tick_remaining(self) -> None:
+        """Re-format "remaining" against one new timestamp; one dataChanged
+        covers the rows whose text changed."""
+        col = self._remaining_col
+        if col is None:
+            return
+        self._now = now = utc_now()
+        fmt = self._formatters[col]
+        old = self._cells[col]
+        new = [fmt(r, now) for r in self._rows]
+        changed = [i for i, (a, b) in enumerate(zip(old, new)) if a != b]
+        self._cells[col] = new
+        if changed:
+            self.dataChanged.emit(self.index(changed[0], col), self.index(changed[-1], col), [Qt.DisplayRole])
+
+    def _apply_diff(self, new: list[TaskRow]) -> bool:
+        """Turn self._rows into `new` with minimal row notifications, keyed by public id.
+
+        Returns False (nothing touched) when the change is too large to be worth
+        diffing; the caller then resets the model instead.
+        """
+        new_pos = {r.public_id: i for i, r in enumerate(new)}
+        if len(new_pos) != len(new):
+            return False
+        old_pos = self._index()
+
+        # Surviving rows in their new order; the ones on the longest run that
+        # is already in order stay put, every other one is moved once.
+        kept = [r.public_id for r in new if r.public_id in old_pos]
+        stay = _longest_ordered_run(kept, old_pos)
+
+        removed = len(self._rows) - len(kept)
+        inserted = len(new) - len(kept)
+        moved = len(kept) - len(stay)
+        budget = min(_DIFF_MAX_OPS, max(_DIFF_MIN_OPS, len(new) // _DIFF_OPS_DIVISOR))
+        if removed + inserted + moved > budget:
+            return False
+
+        root = QModelIndex()
+        rows = self._rows
+
+        # 1) removals, bottom-up so the indexes above stay valid
+        i = len(rows) - 1
+        while i >= 0:
+            if rows[i].public_id in new_pos:
+                i -= 1
+                continue
+            last = i
+            while i >= 0 and rows[i].public_id not in new_pos:
+                i -= 1
+            self.beginRemoveRows(root, i + 1, last)
+            del rows[i + 1 : last + 1]
+            for cells in self._cells:
+                del cells[i + 1 : last + 1]
+            self.endRemoveRows()
+
+        # 2) moves, in target order: each row goes right after its target
+        #    predecessor, which is already in its final relative position.
+        #    A row's current index is its index as of some move, replayed
+        #    through the moves since; no scans of the (possibly 100k) rows.
+        if moved:
+            where = dict(zip((r.public_id for r in rows), range(len(rows))))
+            as_of: dict[bytes, int] = {}
+            moves: list[tuple[int, int]] = []
+
+            def position(task_id: bytes) -> int:
+                p = where[task_id]
+                for src, to in moves[as_of.get(task_id, 0) :]:
+                    if src < p <= to:
+                        p -= 1
+                    elif to <= p < src:
+                        p += 1
+                where[task_id] = p
+                as_of[task_id] = len(moves)
+                return p
+
+            for k, task_id in enumerate(kept):
+                if task_id in stay:
+                    continue
+                src = position(task_id)
+                dest = position(kept[k - 1]) + 1 if k else 0
+                if dest in (src, src + 1):
+                    continue
+                self.beginMoveRows(root, src, src, root, dest)
+                to = dest - 1 if src < dest else dest
+                rows.insert(to, rows.pop(src))
+                for cells in self._cells:
+                    cells.insert(to, cells.pop(src))
+                self.endMoveRows()
+                moves.append((src, to))
+                where[task_id] = to
+                as_of[task_id] = len(moves)
+
+        # 3) insert runs of new rows at their final positions
+        i = 0
+        while i < len(new):
+            if new[i].public_id in old_pos:
+                i += 1
+                continue
+            j = i
+            while j < len(new) and new[j].public_id not in old_pos:
+                j += 1
+            self.beginInsertRows(root, i, j - 1)
+            rows[i:i] = new[i:j]
+            for cells, block in zip(self._cells, self._format(new[i:j])):
+                cells[i:i] = block
+            self.endInsertRows()
+            i = j
+
+        # 4) refresh rows whose values changed in place
+        last_col = len(self._columns) - 1
+        i = 0
+        while i < len(new):
+            if rows[i] == new[i]:
+                i += 1
+                continue
+            first = i
+            while i < len(new) and rows[i] != new[i]:
+                rows[i] = new[i]
+                i += 1
+            for cells, block in zip(self._cells, self._format(new[first:i])):
+                cells[first:i] = block
+            self.dataChanged.emit(self.index(first, 0), self.index(i - 1, last_col))
+
+        self._row_of = new_pos
+        return True
+
     def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:  # type: ignore[override]
         if parent.isValid():
             return 0
@@ -48,14 +280,11 @@ class TaskTableModel(QAbstractTableModel):
         if not index.isValid() or not (0 <= index.row() < len(self._rows)):
             return None
 
-        row = self._rows[index.row()]
-        col = self._columns[index.column()].key
-
         if role == Qt.DisplayRole:
-            return self._display_value(row, col)
+            return self._cells[index.column()][index.row()]
 
         if role == Qt.UserRole:
-            return row.id
+            return self._rows[index.row()].public_id.hex()
 
         return None
 
@@ -68,14 +297,15 @@ class TaskTableModel(QAbstractTableModel):
     def taskIdAtRow(self, row: int) -> str:
         if not (0 <= row < len(self._rows)):
             return ""
-        return self._rows[row].id
+        return self._rows[row].public_id.hex()
 
     @Slot(str, result=int)
     def findRowByTaskId(self, task_id: str) -> int:
-        for i, r in enumerate(self._rows):
-            if r.id == task_id:
-                return i
-        return -1
+        try:
+            public_id = bytes.fromhex(task_id)
+        except ValueError:
+            return -1
+        return self._index().get(public_id, -1)
 
     @Slot(int, int, result=str)
     def cellDisplay(self, row: int, column: int) -> str:
@@ -83,29 +313,34 @@ class TaskTableModel(QAbstractTableModel):
             return ""
         if not (0 <= column < len(self._columns)):
             return ""
-        return self._display_value(self._rows[row], self._columns[column].key)
+        return self._cells[column][row]
 
     def rowAt(self, row: int) -> TaskRow | None:
         if not (0 <= row < len(self._rows)):
             return None
         return self._rows[row]
 
-    def _display_value(self, row: TaskRow, col: str) -> str:
-        now = utc_now()
-
-        if col == "title":
-            return row.title
-        if col == "last_completed":
-            return format_local(from_epoch_seconds(row.last_completed_at)) if row.last_completed_at else ""
-        if col == "review_count":
-            return str(row.review_count)
-        if col == "next_review_at":
-            return format_local(from_epoch_seconds(row.next_review_at)) if row.next_review_at else ""
-        if col == "remaining":
-            return remaining_until(now, from_epoch_seconds(row.next_review_at)) if row.next_review_at else ""
-        if col == "archived_at":
-            return format_local(from_epoch_seconds(row.deleted_at)) if row.deleted_at else ""
-        if col == "tags":
-            return row.tags
-
-        return ""
+
+def _longest_ordered_run(ids: list[bytes], old_pos: dict[bytes, int]) -> set[bytes]:
+    """Ids forming a longest subsequence of `ids` whose old positions increase."""
+    tail_pos: list[int] = []  # smallest old position ending a run of length n + 1
+    tail_idx: list[int] = []
+    prev = [-1] * len(ids)
+    for i, task_id in enumerate(ids):
+        pos = old_pos[task_id]
+        n = bisect_left(tail_pos, pos)
+        if n:
+            prev[i] = tail_idx[n - 1]
+        if n == len(tail_pos):
+            tail_pos.append(pos)
+            tail_idx.append(i)
+        else:
+            tail_pos[n] = pos
+            tail_idx[n] = i
+
+    run: set[bytes] = set()
+    i = tail_idx[-1] if tail_idx else -1
+    while i >= 0:
+        run.add(ids[i])
+        i = prev[i]
+    return run
@@ -0,0 +1,341 @@
+"""Streaming bulk import and export of tasks, completion events and tags.
+
+Records are dicts with a "type" of "task" or "event":
+
+    {"type": "task", "id": "...", "title": "...", "note": "", "status": "waiting",
+     "created_at": 1700000000, "updated_at": 1700000000, "next_review_at": null,
+     "archived_at": null, "tags": ["english"]}
+    {"type": "event", "task_id": "...", "completed_at": 1700000000, "grade": "good"}
+
+As JSONL, one record per line. As CSV, one file per record type (the
+columns above, tags joined with ", "); a file with a "grade" column holds
+events. Times are epoch seconds or ISO 8601 strings (UTC unless they carry
+an offset). Task ids are public ids (hex, or a UUID in any form; see
+repository.public_id_from_text for anything else) and optional. Exports
+carry them, so importing the same file twice adds nothing the second time:
+known tasks are skipped, and an event is skipped when its task already has
+one with the same time and grade. A task's events must come after the task.
+
+Nothing here holds more than one batch of records, apart from the final
+batch recalculation. Exports read one snapshot (db.read_snapshot), so they
+refuse a connection with a transaction still open.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import sqlite3
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any, Callable, Iterable, Iterator, TextIO
+
+from taskmaster import db
+from taskmaster.constants import IMPORT_BATCH_ROWS, MAX_TAGS_PER_TASK, VALID_GRADES
+from taskmaster.repository import (
+    new_public_id,
+    normalize_tag,
+    public_id_from_text,
+    rebuild_activation_state,
+    task_ids_for,
+)
+from taskmaster.service import recalculate_all
+from taskmaster.timeutil import to_epoch_seconds
+
+TASK_FIELDS = (
+    "id",
+    "title",
+    "note",
+    "status",
+    "created_at",
+    "updated_at",
+    "next_review_at",
+    "archived_at",
+    "tags",
+)
+EVENT_FIELDS = ("task_id", "completed_at", "grade")
+_CSV_TAG_SEPARATOR = ", "
+
+
+@dataclass(frozen=True)
+class ImportSummary:
+    tasks: int
+    skipped_tasks: int
+    events: int
+    tags: int
+    rescheduled: int
+
+
+@dataclass(frozen=True)
+class ExportSummary:
+    tasks: int
+    events: int
+
+
+def read_jsonl(lines: Iterable[str]) -> Iterator[dict[str, Any]]:
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+
+def read_csv(lines: Iterable[str]) -> Iterator[dict[str, Any]]:
+    reader = csv.DictReader(lines)
+    kind = "event" if "grade" in (reader.fieldnames or ()) else "task"
+    for row in reader:
+        record: dict[str, Any] = {k: (v if v != "" else None) for k, v in row.items()}
+        record["type"] = kind
+        if kind == "task":
+            record["tags"] = [t for t in (record.get("tags") or "").split(",") if t.strip()]
+        yield record
+
+
+def import_records(
+    conn: sqlite3.Connection,
+    records: Iterable[dict[str, Any]],
+    *,
+    now: datetime,
+    horizon_days: int,
+    approximate: bool = False,
+    batch_size: int = IMPORT_BATCH_ROWS,
+) -> ImportSummary:
+    """Insert ``records`` in transactions of ``batch_size``, then reschedule
+    the tasks the import added or gave events to.
+
+    Tasks whose id already exists are skipped. Raises ValueError naming the
+    record on bad input; batches committed before it stay imported.
+    """
+    now_epoch = to_epoch_seconds(now)
+    tasks: list[tuple] = []
+    task_tags: list[tuple[bytes, str]] = []
+    events: list[tuple] = []
+    counts = {"tasks": 0, "skipped_tasks": 0, "events": 0, "tags": 0}
+    touched: set[int] = set()
+
+    def flush() -> None:
+        if not tasks and not events:
+            return
+        with conn:
+            conn.execute("BEGIN")
+            with db.bulk_load(conn):
+                touched.update(_insert_tasks(conn, tasks, task_tags, now_epoch, counts))
+                touched.update(_insert_events(conn, events, counts))
+        for buffer in (tasks, task_tags, events):
+            buffer.clear()
+
+    for n, record in enumerate(records, 1):
+        try:
+            kind = record.get("type")
+            if kind == "task":
+                task = _task_params(record, now_epoch)
+                tasks.append(task)
+                task_tags.extend((task[0], name) for name in _tag_names(record.get("tags")))
+            elif kind == "event":
+                events.append(_event_params(record))
+            else:
+                raise ValueError(f"unknown record type: {kind!r}")
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"record {n}: {e}") from None
+        if len(tasks) + len(events) >= batch_size:
+            flush()
+    flush()
+
+    with conn:
+        rescheduled = recalculate_all(
+            conn, now=now, horizon_days=horizon_days, approximate=approximate, task_ids=sorted(touched)
+        )
+    return ImportSummary(rescheduled=rescheduled, **counts)
+
+
+def _task_params(record: dict[str, Any], now_epoch: int) -> tuple:
+    title = str(record.get("title") or "").strip()
+    if not title:
+        raise ValueError("task without a title")
+    archived_at = _epoch(record.get("archived_at"))
+    status = "archived" if archived_at is not None else record.get("status") or "due"
+    if status not in ("due", "waiting", "archived"):
+        raise ValueError(f"invalid status: {status}")
+    if status == "archived" and archived_at is None:
+        archived_at = now_epoch
+    created_at = _epoch(record.get("created_at")) or now_epoch
+    return (
+        public_id_from_text(str(record["id"])) if record.get("id") else new_public_id(),
+        title,
+        str(record.get("note") or ""),
+        status,
+        created_at,
+        _epoch(record.get("updated_at")) or created_at,
+        _epoch(record.get("next_review_at")),
+        archived_at,
+    )
+
+
+def _tag_names(tags: Any) -> list[str]:
+    if not tags:
+        return []
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    names = list(dict.fromkeys(n for n in (normalize_tag(str(t)) for t in tags) if n))
+    if len(names) > MAX_TAGS_PER_TASK:
+        raise ValueError(f"more than {MAX_TAGS_PER_TASK} tags")
+    return names
+
+
+def _event_params(record: dict[str, Any]) -> tuple:
+    task_id = record.get("task_id")
+    if not task_id:
+        raise ValueError("event without a task_id")
+    grade = record.get("grade")
+    if grade not in VALID_GRADES:
+        raise ValueError(f"invalid grade: {grade}")
+    completed_at = _epoch(record.get("completed_at"))
+    if completed_at is None:
+        raise ValueError("event without completed_at")
+    return (public_id_from_text(str(task_id)), completed_at, grade)
+
+
+def _epoch(value: Any) -> int | None:
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    text = str(value).strip()
+    if text.lstrip("-").isdigit():
+        return int(text)
+    dt = datetime.fromisoformat(text)
+    return to_epoch_seconds(dt if dt.tzinfo is not None else dt.replace(tzinfo=UTC))
+
+
+def _insert_tasks(
+    conn: sqlite3.Connection,
+    tasks: list[tuple],
+    task_tags: list[tuple[bytes, str]],
+    now_epoch: int,
+    counts: dict[str, int],
+) -> list[int]:
+    """Returns the ids of the tasks inserted."""
+    if not tasks:
+        return []
+    existing = set(task_ids_for(conn, (t[0] for t in tasks)))
+    if existing:
+        tasks = [t for t in tasks if t[0] not in existing]
+        task_tags = [m for m in task_tags if m[0] not in existing]
+    cur = conn.executemany(
+        """
+        INSERT OR IGNORE INTO tasks(public_id, title, note, status, created_at, updated_at, next_review_at, deleted_at)
+        VALUES(?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        tasks,
+    )
+    counts["tasks"] += cur.rowcount
+    counts["skipped_tasks"] += len(existing) + len(tasks) - cur.rowcount
+    inserted = list(task_ids_for(conn, (t[0] for t in tasks)).values())
+    if not task_tags:
+        return inserted
+    cur = conn.executemany(
+        "INSERT INTO task_tags(name, created_at) VALUES(?, ?) ON CONFLICT(name) DO NOTHING",
+        [(name, now_epoch) for name in dict.fromkeys(name for _task, name in task_tags)],
+    )
+    counts["tags"] += cur.rowcount
+    conn.executemany(
+        """
+        INSERT OR IGNORE INTO task_tag_map(task_id, tag_id)
+        SELECT t.id, g.id FROM tasks t, task_tags g WHERE t.public_id = ? AND g.name = ?
+        """,
+        task_tags,
+    )
+    return inserted
+
+
+def _insert_events(conn: sqlite3.Connection, events: list[tuple], counts: dict[str, int]) -> list[int]:
+    """Returns the ids of the tasks that got new events."""
+    if not events:
+        return []
+    task_ids = task_ids_for(conn, (e[0] for e in events))
+    missing = next((e[0] for e in events if e[0] not in task_ids), None)
+    if missing is not None:
+        raise ValueError(f"event for unknown task: {missing.hex()}")
+    # New rows get ids above the current largest one.
+    floor = conn.execute("SELECT COALESCE(MAX(id), 0) FROM completion_events").fetchone()[0]
+    cur = conn.executemany(
+        """
+        INSERT INTO completion_events(task_id, completed_at, grade)
+        SELECT :task_id, :completed_at, :grade
+        WHERE NOT EXISTS (
+            SELECT 1 FROM completion_events
+            WHERE task_id = :task_id AND completed_at = :completed_at AND grade = :grade
+        )
+        """,
+        ({"task_id": task_ids[p], "completed_at": at, "grade": grade} for p, at, grade in events),
+    )
+    counts["events"] += cur.rowcount
+    changed = [
+        row[0]
+        for row in conn.execute(
+            "SELECT DISTINCT task_id FROM completion_events WHERE id > ? ORDER BY task_id", (floor,)
+        )
+    ]
+    rebuild_activation_state(conn, task_ids=changed)
+    return changed
+
+
+def export_jsonl(conn: sqlite3.Connection, out: TextIO) -> ExportSummary:
+    def write(record: dict[str, Any]) -> None:
+        out.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+        out.write("\n")
+
+    return _export(conn, write, write)
+
+
+def export_csv(conn: sqlite3.Connection, tasks_out: TextIO, events_out: TextIO) -> ExportSummary:
+    task_writer = csv.DictWriter(tasks_out, fieldnames=TASK_FIELDS, extrasaction="ignore")
+    event_writer = csv.DictWriter(events_out, fieldnames=EVENT_FIELDS, extrasaction="ignore")
+    task_writer.writeheader()
+    event_writer.writeheader()
+
+    def write_task(record: dict[str, Any]) -> None:
+        task_writer.writerow({**record, "tags": _CSV_TAG_SEPARATOR.join(record["tags"])})
+
+    return _export(conn, write_task, event_writer.writerow)
+
+
+def _export(
+    conn: sqlite3.Connection,
+    write_task: Callable[[dict[str, Any]], object],
+    write_event: Callable[[dict[str, Any]], object],
+) -> ExportSummary:
+    # One snapshot, so events never refer to a task the export missed.
+    with db.read_snapshot(conn):
+        tasks = events = 0
+        for row in conn.execute(
+            """
+            SELECT lower(hex(t.public_id)), t.title, t.note, t.status, t.created_at, t.updated_at, t.next_review_at,
+                   t.deleted_at,
+                   (
+                       SELECT json_group_array(name)
+                       FROM (
+                           SELECT g.name
+                           FROM task_tag_map m
+                           JOIN task_tags g ON g.id = m.tag_id
+                           WHERE m.task_id = t.id
+                           ORDER BY g.name
+                       )
+                   )
+            FROM tasks t
+            WHERE t.purged_at IS NULL
+            ORDER BY t.rowid
+            """
+        ):
+            write_task({"type": "task", **dict(zip(TASK_FIELDS[:-1], row)), "tags": json.loads(row[8])})
+            tasks += 1
+        for row in conn.execute(
+            """
+            SELECT lower(hex(t.public_id)), ce.completed_at, ce.grade
+            FROM completion_events ce
+            JOIN tasks t ON t.id = ce.task_id
+            WHERE t.purged_at IS NULL
+            ORDER BY ce.task_id, ce.completed_at
+            """
+        ):
+            write_event({"type": "event", **dict(zip(EVENT_FIELDS, row))})
+            events += 1
+    return ExportSummary(tasks=tasks, events=events)
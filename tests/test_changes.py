@@ -0,0 +1,43 @@
+"""export_changes snapshots and the caller's transaction."""
+
+from __future__ import annotations
+
+import io
+import json
+from datetime import UTC, datetime
+
+import pytest
+
+from taskmaster import db
+from taskmaster.changes import export_changes
+from taskmaster.repository import create_task
+
+NOW = datetime(2026, 3, 14, 9, 26, tzinfo=UTC)
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = db.connect(tmp_path / "t.db")
+    db.migrate(conn)
+    with conn:
+        create_task(conn, title="committed", note="", now=NOW)
+    yield conn
+    conn.close()
+
+
+def test_export_changes_reads_and_ends_its_own_snapshot(conn) -> None:
+    out = io.StringIO()
+    summary = export_changes(conn, out)
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert summary.upserts == 1
+    assert lines[1][:2] == ["tasks", "u"] and "committed" in lines[1][2]
+    assert not conn.in_transaction
+
+
+def test_export_changes_refuses_an_open_transaction_and_keeps_its_writes(conn) -> None:
+    create_task(conn, title="pending", note="", now=NOW)
+    with pytest.raises(RuntimeError):
+        export_changes(conn, io.StringIO())
+    assert conn.in_transaction
+    conn.commit()
+    assert [r[0] for r in conn.execute("SELECT title FROM tasks ORDER BY id")] == ["committed", "pending"]
@@ -0,0 +1,81 @@
+"""The CLI's exit codes and JSON error contract."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from taskmaster.cli import main
+
+
+@pytest.fixture(autouse=True)
+def _home(tmp_path, monkeypatch) -> None:
+    # Keep the app's settings and default DB out of the real home.
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / ".config"))
+    monkeypatch.delenv("TASKMASTER_DB", raising=False)
+
+
+def _error(capsys) -> str:
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    return json.loads(captured.err)["error"]
+
+
+def test_import_of_missing_file_is_a_json_error(tmp_path, capsys) -> None:
+    missing = tmp_path / "nosuch.jsonl"
+    assert main(["--db", str(tmp_path / "t.db"), "import", str(missing)]) == 1
+    assert str(missing) in _error(capsys)
+
+
+def test_unopenable_db_is_a_json_error(tmp_path, capsys) -> None:
+    not_a_db = tmp_path / "garbage.db"
+    not_a_db.write_bytes(b"this is not a database" * 100)
+    assert main(["--db", str(not_a_db), "stats"]) == 1
+    assert "not a database" in _error(capsys)
+
+
+def test_db_path_under_a_file_is_a_json_error(tmp_path, capsys) -> None:
+    (tmp_path / "file").write_text("")
+    assert main(["--db", str(tmp_path / "file" / "t.db"), "stats"]) == 1
+    assert _error(capsys)
+
+
+def test_export_to_unwritable_path_is_a_json_error(tmp_path, capsys) -> None:
+    db_path = str(tmp_path / "t.db")
+    assert main(["--db", db_path, "add", "hello"]) == 0
+    capsys.readouterr()
+    assert main(["--db", db_path, "export", str(tmp_path / "no" / "such" / "dir" / "out.jsonl")]) == 1
+    assert "out.jsonl" in _error(capsys)
+    assert main(["--db", db_path, "export", str(tmp_path / "out.csv"), "--events-out", str(tmp_path)]) == 1
+    assert _error(capsys)
+
+
+def test_csv_import_with_missing_events_file_is_a_json_error(tmp_path, capsys) -> None:
+    db_path = str(tmp_path / "t.db")
+    tasks_csv = tmp_path / "tasks.csv"
+    tasks_csv.write_text("id,title\nab12,hello\n", encoding="utf-8")
+    assert main(["--db", db_path, "import", str(tasks_csv), str(tmp_path / "events.csv")]) == 1
+    assert "events.csv" in _error(capsys)
+    # The tasks were still in the unflushed batch.
+    assert main(["--db", db_path, "list"]) == 0
+    assert json.loads(capsys.readouterr().out) == []
+
+
+def _run(capsys, *argv: str):
+    code = main(list(argv))
+    captured = capsys.readouterr()
+    return code, json.loads(captured.out or captured.err)
+
+
+def test_complete_only_accepts_due_tasks(tmp_path, capsys) -> None:
+    db_path = str(tmp_path / "t.db")
+    _code, task = _run(capsys, "--db", db_path, "add", "hello")
+    code, done = _run(capsys, "--db", db_path, "complete", task["id"], "--grade", "good")
+    assert code == 0 and done["status"] == "waiting" and done["review_count"] == 1
+
+    code, err = _run(capsys, "--db", db_path, "complete", task["id"])
+    assert code == 1 and err == {"error": f"task is not due: {task['id']}"}
+    _code, [waiting] = _run(capsys, "--db", db_path, "list", "--view", "waiting")
+    assert waiting["review_count"] == 1 and waiting["next_review_at"] == done["next_review_at"]
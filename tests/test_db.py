@@ -0,0 +1,68 @@
+"""Upgrading a v1 DB with data through every migration step."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+import uuid
+
+from taskmaster import db
+from taskmaster.constants import SCHEMA_VERSION
+
+UUID_ID = "0b6c1f0e-8a52-4c4f-b6b4-2a6f3f8e1d10"
+
+
+def _v1_db(path):
+    conn = db.connect(path)
+    db.migrate(conn, target=1)
+    with conn:
+        conn.executemany(
+            "INSERT INTO tasks(id, title, note, status, created_at, updated_at, next_review_at)"
+            " VALUES (?, ?, '', 'waiting', 0, 0, 9000)",
+            [(UUID_ID, "with uuid"), ("legacy-7", "foreign id")],
+        )
+        conn.executemany(
+            "INSERT INTO completion_events(id, task_id, completed_at, grade) VALUES (?, ?, ?, 'good')",
+            [(f"e{t}", UUID_ID, t) for t in (100, 200, 300, 400, 500)],
+        )
+        conn.executemany(
+            "INSERT INTO task_tags(id, name, created_at) VALUES (?, ?, 0)", [("g1", "work"), ("g2", "home")]
+        )
+        conn.executemany(
+            "INSERT INTO task_tag_map(task_id, tag_id) VALUES (?, ?)",
+            [(UUID_ID, "g1"), (UUID_ID, "g2"), ("legacy-7", "g1")],
+        )
+    return conn
+
+
+def test_v1_upgrade_backfills_every_step(tmp_path) -> None:
+    conn = _v1_db(tmp_path / "t.db")
+    assert db.migrate(conn, chunk_rows=1) == SCHEMA_VERSION
+
+    rows = {
+        row[0]: row[1:]
+        for row in conn.execute(
+            "SELECT title, public_id, act_recent, act_tail_count, act_first_at, last_grade,"
+            " last_completed_at, review_count, tags_text FROM tasks"
+        )
+    }
+    assert rows["with uuid"] == (uuid.UUID(UUID_ID).bytes, "500,400,300", 2, 100, "good", 500, 5, "home, work")
+    legacy_id = uuid.uuid5(uuid.UUID("6f1f3a52-2d8e-4c1b-9a57-0c3e5d7b8a21"), "legacy-7").bytes
+    assert rows["foreign id"] == (legacy_id, "", 0, None, None, None, 0, "work")
+    assert dict(conn.execute("SELECT name, task_count FROM task_tags")) == {"work": 2, "home": 1}
+    matches = conn.execute("SELECT title FROM tasks_fts WHERE tasks_fts MATCH 'uuid'").fetchall()
+    assert [row[0] for row in matches] == ["with uuid"]
+    conn.close()
+
+
+def test_migrate_runs_no_repository_code(tmp_path) -> None:
+    # Steps are frozen, so an upgrade must not depend on today's repository.
+    _v1_db(tmp_path / "t.db").close()
+    script = (
+        "import sys\n"
+        "from pathlib import Path\n"
+        "from taskmaster import db\n"
+        f"db.migrate(db.connect(Path({str(tmp_path / 't.db')!r})))\n"
+        "assert 'taskmaster.repository' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", script], check=True)
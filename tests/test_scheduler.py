@@ -0,0 +1,196 @@
+"""The fast solvers against find_next_review, the reference bisection.
+
+Every case must land on the same minute. The random cases include ones
+clamped by the 1-minute gap (low targets, events just before now) and by
+max_search_days (high targets, short caps).
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from taskmaster.constants import DEFAULT_DECAY_D, DEFAULT_NOISE_S, DEFAULT_TAU, GRADE_P_TARGET
+from taskmaster.scheduler import (
+    ActivationState,
+    approx_history_sum,
+    find_next_review,
+    find_next_reviews_batch,
+    recall_prob,
+    solve_next_review,
+    solve_next_review_from_state,
+)
+from taskmaster.timeutil import ceil_to_minute, ensure_min_gap, to_epoch_seconds
+
+NOW = datetime(2026, 3, 14, 9, 26, 53, tzinfo=UTC)
+PARAMS = {"d": DEFAULT_DECAY_D, "tau": DEFAULT_TAU, "s": DEFAULT_NOISE_S}
+CASES = 400
+
+
+def _random_case(rnd: random.Random) -> dict:
+    now = NOW + timedelta(seconds=rnd.randrange(0, 400 * 86400))
+    kind = rnd.random()
+    if kind < 0.15:
+        # Events seconds before now and a low target: clamped by the 1-minute gap.
+        ages = [rnd.uniform(0, 120) for _ in range(rnd.randint(1, 5))]
+        p_target = rnd.uniform(0.001, 0.3)
+    else:
+        ages = [rnd.uniform(0, 3 * 365) * 86400 for _ in range(rnd.randint(1, 40))]
+        p_target = rnd.choice([*GRADE_P_TARGET.values(), rnd.uniform(0.01, 0.999), rnd.uniform(0.99, 0.99999)])
+    max_search_days = rnd.choice([365.0, 365.0, 30.0, 3.0, 0.25])
+    history = sorted(now - timedelta(seconds=int(age)) for age in ages)
+    return {
+        "history": history,
+        "now": now,
+        "p_target": float(p_target),
+        "horizon_days": rnd.randint(1, 365),
+        "max_search_days": max_search_days,
+    }
+
+
+def _cases(seed: int) -> list[dict]:
+    rnd = random.Random(seed)
+    return [_random_case(rnd) for _ in range(CASES)]
+
+
+def _reference(case: dict) -> datetime:
+    return find_next_review(
+        case["history"],
+        case["now"],
+        p_target=case["p_target"],
+        horizon_days=case["horizon_days"],
+        max_search_days=case["max_search_days"],
+        **PARAMS,
+    )
+
+
+def _reference_from_state(state: ActivationState, case: dict, *, iters: int = 40) -> datetime:
+    # find_next_review's bisection, on the approximate history sum.
+    now = case["now"]
+    t_target = now + timedelta(days=case["horizon_days"])
+    hist_sum = approx_history_sum(state, to_epoch_seconds(t_target), PARAMS["d"])
+    lo, hi = 0.0, case["max_search_days"]
+    for _ in range(iters):
+        mid = (lo + hi) / 2.0
+        candidate = ensure_min_gap(now + timedelta(days=mid), now, min_seconds=60)
+        delta = max((t_target - candidate).total_seconds() / 86400.0, 60.0 / 86400.0)
+        p = recall_prob(math.log(hist_sum + delta ** (-PARAMS["d"])), PARAMS["tau"], PARAMS["s"])
+        if p >= case["p_target"]:
+            hi = mid
+        else:
+            lo = mid
+    return ceil_to_minute(ensure_min_gap(now + timedelta(days=hi), now, min_seconds=60))
+
+
+def _state(history: list[datetime], keep: int) -> ActivationState:
+    state = ActivationState()
+    for t in history:
+        state = state.with_event(to_epoch_seconds(t), keep=keep)
+    return state
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_solve_next_review_matches_bisection(seed: int) -> None:
+    for case in _cases(seed):
+        got = solve_next_review(
+            case["history"],
+            case["now"],
+            p_target=case["p_target"],
+            horizon_days=case["horizon_days"],
+            max_search_days=case["max_search_days"],
+            **PARAMS,
+        )
+        assert got == _reference(case), case
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_solve_from_full_state_matches_bisection(seed: int) -> None:
+    # With every event kept exactly the state is the history itself.
+    for case in _cases(seed):
+        got = solve_next_review_from_state(
+            _state(case["history"], keep=len(case["history"])),
+            case["now"],
+            p_target=case["p_target"],
+            horizon_days=case["horizon_days"],
+            max_search_days=case["max_search_days"],
+            **PARAMS,
+        )
+        assert got == _reference(case), case
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_solve_from_compact_state_matches_bisection(seed: int) -> None:
+    for case in _cases(seed):
+        state = _state(case["history"], keep=3)
+        got = solve_next_review_from_state(
+            state,
+            case["now"],
+            p_target=case["p_target"],
+            horizon_days=case["horizon_days"],
+            max_search_days=case["max_search_days"],
+            **PARAMS,
+        )
+        assert got == _reference_from_state(state, case), case
+
+
+def _batch_args(cases: list[dict], *, keep: int | None) -> dict:
+    events, offsets, tail_counts, first_epochs = [], [0], [], []
+    for case in cases:
+        state = _state(case["history"], keep=keep or len(case["history"]))
+        events.extend(state.recent)
+        offsets.append(len(events))
+        tail_counts.append(state.tail_count)
+        first_epochs.append(state.first_at)
+    args = {
+        "event_epochs": events,
+        "offsets": offsets,
+        "now_epochs": [to_epoch_seconds(c["now"]) for c in cases],
+        "p_targets": [c["p_target"] for c in cases],
+    }
+    if keep is not None:
+        args.update(tail_counts=tail_counts, first_epochs=first_epochs)
+    return args
+
+
+def _by_cap_and_horizon(cases: list[dict]) -> dict[tuple[float, int], list[dict]]:
+    # The batch takes one max_search_days and horizon for all of its tasks.
+    groups: dict[tuple[float, int], list[dict]] = {}
+    for case in cases:
+        case = {**case, "horizon_days": case["horizon_days"] % 4 * 100 + 1}
+        groups.setdefault((case["max_search_days"], case["horizon_days"]), []).append(case)
+    return groups
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_batch_matches_bisection(seed: int) -> None:
+    for (max_search_days, horizon_days), cases in _by_cap_and_horizon(_cases(seed)).items():
+        got = find_next_reviews_batch(
+            **_batch_args(cases, keep=None),
+            horizon_days=horizon_days,
+            max_search_days=max_search_days,
+            **PARAMS,
+        )
+        assert got.tolist() == [to_epoch_seconds(_reference(c)) for c in cases]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_batch_with_compact_state_matches_bisection(seed: int) -> None:
+    for (max_search_days, horizon_days), cases in _by_cap_and_horizon(_cases(seed)).items():
+        got = find_next_reviews_batch(
+            **_batch_args(cases, keep=3),
+            horizon_days=horizon_days,
+            max_search_days=max_search_days,
+            **PARAMS,
+        )
+        expected = [to_epoch_seconds(_reference_from_state(_state(c["history"], keep=3), c)) for c in cases]
+        assert got.tolist() == expected
+
+
+def test_clamped_cases_are_covered() -> None:
+    cases = [c for seed in range(3) for c in _cases(seed)]
+    results = [(c, _reference(c)) for c in cases]
+    assert any(r == ceil_to_minute(c["now"] + timedelta(minutes=1)) for c, r in results)
+    assert any(r >= c["now"] + timedelta(days=c["max_search_days"]) for c, r in results)
@@ -0,0 +1,46 @@
+"""Export snapshots and the caller's transaction."""
+
+from __future__ import annotations
+
+import io
+from datetime import UTC, datetime
+
+import pytest
+
+from taskmaster import db
+from taskmaster.repository import create_task
+from taskmaster.transfer import export_csv, export_jsonl, read_jsonl
+
+NOW = datetime(2026, 3, 14, 9, 26, tzinfo=UTC)
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = db.connect(tmp_path / "t.db")
+    db.migrate(conn)
+    with conn:
+        create_task(conn, title="committed", note="", now=NOW)
+    yield conn
+    conn.close()
+
+
+def _titles(conn) -> list[str]:
+    return [r[0] for r in conn.execute("SELECT title FROM tasks ORDER BY id")]
+
+
+def test_export_reads_and_ends_its_own_snapshot(conn) -> None:
+    out = io.StringIO()
+    assert export_jsonl(conn, out).tasks == 1
+    assert [r["title"] for r in read_jsonl(io.StringIO(out.getvalue())) if r["type"] == "task"] == ["committed"]
+    assert not conn.in_transaction
+
+
+@pytest.mark.parametrize("export", [export_jsonl, lambda c, out: export_csv(c, out, io.StringIO())])
+def test_export_refuses_an_open_transaction_and_keeps_its_writes(conn, export) -> None:
+    create_task(conn, title="pending", note="", now=NOW)
+    assert conn.in_transaction
+    with pytest.raises(RuntimeError):
+        export(conn, io.StringIO())
+    assert conn.in_transaction
+    conn.commit()
+    assert _titles(conn) == ["committed", "pending"]